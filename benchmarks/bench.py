@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from contextlib import nullcontext
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable
+import pandas as pd
+
+from src.batch import run_batch
+from src.config import CFG
+from src.fitcache import FIT_CACHE
+from src.features import make_lag_features
+from src.io import load_excel, warm_cache
+from src.models.arima import forecast_arima_recursive
+from src.models.nn import forecast_nn_recursive
+from src.models.var import forecast_var_recursive
+from src.telemetry import TRACER
+
+from .synthetic import DATE_COL, TARGET_COL, synthetic_levels, write_workbook
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+NN_PARAMS = {"hidden_layer_sizes": (8,), "activation": "relu", "alpha": 1e-3, "learning_rate_init": 1e-3}
+
+# ---------- Benchmarks ----------
+# Each setup gets (levels, origins, workdir) and returns the zero-argument
+# callable to time; setup work (writing workbooks, building features) is not timed.
+
+def _workbook(levels, workdir) -> Path:
+    path = workdir / f"bench_{len(levels)}x{levels.shape[1]}.xlsx"
+    return path if path.exists() else write_workbook(levels, path)
+
+def _setup_load_excel_parse(levels, origins, workdir) -> Callable:
+    path = _workbook(levels, workdir)
+    return lambda: load_excel(path, DATE_COL, use_cache=False)
+
+def _setup_load_excel_cached(levels, origins, workdir) -> Callable:
+    path = _workbook(levels, workdir)
+    warm_cache(path, DATE_COL, cache_dir=workdir / "cache")
+    return lambda: load_excel(path, DATE_COL, use_cache=True, cache_dir=workdir / "cache")
+
+def _setup_make_lag_features(levels, origins, workdir) -> Callable:
+    return lambda: make_lag_features(levels, TARGET_COL, levels.columns[1], lags=4)
+
+def _setup_arima(levels, origins, workdir) -> Callable:
+    y = levels[TARGET_COL]
+    return lambda: forecast_arima_recursive(y.iloc[:-origins], y.iloc[-origins:], (1, 1, 1),
+                                            refit_every=1, backend="serial")
+
+def _var_setup(method: str):
+    def setup(levels, origins, workdir) -> Callable:
+        test_idx = levels.index[-origins:]
+        return lambda: forecast_var_recursive(levels, levels.index[-origins - 1], test_idx, 2, TARGET_COL,
+                                              method=method, backend="serial")
+    return setup
+
+def _setup_nn(levels, origins, workdir) -> Callable:
+    X, y = make_lag_features(levels, TARGET_COL, levels.columns[1], lags=4)
+    X_tr, y_tr, X_te, y_te = X.iloc[:-origins], y.iloc[:-origins], X.iloc[-origins:], y.iloc[-origins:]
+    return lambda: forecast_nn_recursive(X_tr, y_tr, X_te, y_te, NN_PARAMS, random_state=0,
+                                         mode="refit", backend="serial")
+
+def _batch_setup(vectorized: bool):
+    # the target against every other column; the last `origins` observations are the test sample
+    def setup(levels, origins, workdir) -> Callable:
+        path = _workbook(levels, workdir)
+        cfg = replace(CFG, data_path=path, date_col=DATE_COL, target_col=TARGET_COL, x_col=levels.columns[1],
+                      cache_dir=workdir / "cache", outputs_dir=workdir / "batch_out",
+                      train_ratio=1.0 - origins / len(levels), analysis_end=levels.index[-1])
+        warm_cache(path, DATE_COL, cache_dir=cfg.cache_dir)
+        return lambda: run_batch(models=("arima", "var"), cfg=cfg, backend="serial", vectorized=vectorized)
+    return setup
+
+BENCHMARKS: dict[str, Callable] = {
+    "load_excel_parse": _setup_load_excel_parse,
+    "load_excel_cached": _setup_load_excel_cached,
+    "make_lag_features": _setup_make_lag_features,
+    "forecast_arima_recursive": _setup_arima,
+    "forecast_var_recursive_ols": _var_setup("ols"),
+    "forecast_var_recursive_rls": _var_setup("rls"),
+    "forecast_nn_recursive": _setup_nn,
+    "batch_pairs": _batch_setup(False),
+    "batch_pairs_vectorized": _batch_setup(True),
+}
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _versions() -> dict:
+    import numpy, sklearn, statsmodels
+    return {"python": platform.python_version(), "numpy": numpy.__version__, "pandas": pd.__version__,
+            "scikit-learn": sklearn.__version__, "statsmodels": statsmodels.__version__}
+
+def run_suite(
+    sizes=DEFAULT_SIZES,
+    width: int = 2,
+    origins: int = 5,
+    repeat: int = 3,
+    stages=None,
+    workdir=None,
+) -> dict:
+    """
+    Time every benchmark stage on synthetic series of each length in
+    `sizes` (`width` columns, the last `origins` observations forecast
+    recursively). Each stage keeps its fastest of `repeat` runs, with the
+    CPU time, peak RSS and model-fit count of that run; the fit cache is
+    cleared before every run. Returns {"meta": ..., "results": [...]}.
+    """
+    stages = list(BENCHMARKS) if stages is None else list(stages)
+    unknown = set(stages) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark stages {sorted(unknown)}; expected some of {list(BENCHMARKS)}.")
+    if width < 2:
+        raise ValueError("width must be >= 2 (a target and at least one predictor).")
+
+    results = []
+    with tempfile.TemporaryDirectory() if workdir is None else nullcontext(workdir) as tmp:
+        tmp = Path(tmp)
+        for n_obs in sizes:
+            levels = synthetic_levels(n_obs, width=width, seed=n_obs)
+            for stage in stages:
+                fn = BENCHMARKS[stage](levels, origins, tmp)
+                best = None
+                for _ in range(repeat):
+                    FIT_CACHE.clear()
+                    TRACER.reset()
+                    with TRACER.span(stage, cat="benchmark") as span:
+                        fn()
+                    if best is None or span["wall_seconds"] < best["wall_seconds"]:
+                        best = span
+                results.append({
+                    "stage": stage, "n_obs": n_obs, "width": width, "origins": origins,
+                    "seconds": best["wall_seconds"], "cpu_seconds": best["cpu_seconds"],
+                    "peak_rss_mb": best["peak_rss_mb"], "fits": best["counts"].get("fits", 0),
+                })
+                print(f"{stage:<28} n={n_obs:<7} {best['wall_seconds']:.4f}s", file=sys.stderr)
+    TRACER.reset()
+
+    meta = {
+        "commit": _git_commit(),
+        "created_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "versions": _versions(),
+        "params": {"sizes": list(sizes), "width": width, "origins": origins, "repeat": repeat, "stages": stages},
+    }
+    return {"meta": meta, "results": results}
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.25, min_seconds: float = 0.01) -> pd.DataFrame:
+    """
+    Join two result files on (stage, n_obs, width, origins). A stage counts
+    as regressed when it is more than `threshold` (relative) and
+    `min_seconds` (absolute, to ignore timer noise) slower than baseline.
+    """
+    keys = ["stage", "n_obs", "width", "origins"]
+    old = pd.DataFrame(baseline["results"])[keys + ["seconds"]]
+    new = pd.DataFrame(current["results"])[keys + ["seconds"]]
+    table = old.merge(new, on=keys, suffixes=("_baseline", "_current"))
+    table["ratio"] = table["seconds_current"] / table["seconds_baseline"]
+    table["regressed"] = (table["ratio"] > 1.0 + threshold) & (
+        table["seconds_current"] - table["seconds_baseline"] > min_seconds
+    )
+    return table
+
+def _read(path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+def _write(result: dict, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return path
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench",
+                                     description="Scaling benchmarks on synthetic series.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run the suite and save the results as JSON.")
+    p_run.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                       help="Comma-separated series lengths (e.g. 100,1000,10000,100000).")
+    p_run.add_argument("--width", type=int, default=2, help="Number of series (target + predictors).")
+    p_run.add_argument("--origins", type=int, default=5, help="Recursive forecast origins per stage.")
+    p_run.add_argument("--repeat", type=int, default=3)
+    p_run.add_argument("--stages", default=None, help=f"Comma-separated subset of {','.join(BENCHMARKS)}.")
+    p_run.add_argument("--out", default=None, help="Output file (default: benchmarks/results/<commit>.json).")
+    p_run.add_argument("--save-baseline", action="store_true", help="Also store the results as the baseline.")
+
+    p_cmp = sub.add_parser("compare", help="Compare two result files.")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.25)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        result = run_suite(
+            sizes=[int(s) for s in args.sizes.split(",")],
+            width=args.width,
+            origins=args.origins,
+            repeat=args.repeat,
+            stages=None if args.stages is None else [s.strip() for s in args.stages.split(",")],
+        )
+        out = args.out or RESULTS_DIR / f"{result['meta']['commit'] or 'results'}.json"
+        print(f"Results: {_write(result, out)}")
+        if args.save_baseline:
+            print(f"Baseline: {_write(result, BASELINE_PATH)}")
+    else:
+        table = compare_results(_read(args.baseline), _read(args.current), threshold=args.threshold)
+        print(table.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+        if table["regressed"].any():
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
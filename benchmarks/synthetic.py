@@ -0,0 +1,36 @@
+from __future__ import annotations
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+TARGET_COL = "y"
+DATE_COL = "date"
+
+def synthetic_levels(n_obs: int, width: int = 2, phi: float = 0.5, seed: int = 0) -> pd.DataFrame:
+    """
+    `width` integrated series of length `n_obs` on a daily date index: the
+    first differences follow a stable VAR(1) (AR(1) when width=1) with
+    coefficient `phi` on the own lag and small spillovers. Columns are
+    `y` (target) and `x1`..`x{width-1}` (predictors).
+    """
+    rng = np.random.default_rng(seed)
+    A = np.full((width, width), 0.1 / max(width - 1, 1))
+    np.fill_diagonal(A, phi)
+    shocks = rng.normal(size=(n_obs, width))
+    diffs = np.empty((n_obs, width))
+    diffs[0] = shocks[0]
+    for t in range(1, n_obs):
+        diffs[t] = diffs[t - 1] @ A.T + shocks[t]
+
+    columns = [TARGET_COL] + [f"x{i}" for i in range(1, width)]
+    index = pd.date_range("1900-01-01", periods=n_obs, freq="D", name=DATE_COL)
+    return pd.DataFrame(100.0 + np.cumsum(diffs, axis=0), index=index, columns=columns)
+
+def write_workbook(levels: pd.DataFrame, path) -> Path:
+    """Write `levels` in the layout `load_excel` expects (sheets data_y and data_x)."""
+    path = Path(path)
+    frame = levels.reset_index()
+    with pd.ExcelWriter(path) as writer:
+        frame[[DATE_COL, TARGET_COL]].to_excel(writer, sheet_name="data_y", index=False)
+        frame.drop(columns=TARGET_COL).to_excel(writer, sheet_name="data_x", index=False)
+    return path
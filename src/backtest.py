@@ -0,0 +1,115 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from typing import Callable, Iterable
+import numpy as np
+
+from .checkpoint import BacktestCheckpoint, CheckpointDir, task_digest
+from .config import CFG
+from .telemetry import TRACER
+
+BACKENDS = ("serial", "thread", "process")
+WINDOWS = ("expanding", "rolling", "exponential")
+
+def resolve_window(window=None, size=None, halflife=None) -> tuple[str, int, float]:
+    """Window policy arguments with Config defaults for the ones left as None."""
+    window = CFG.window if window is None else window
+    size = CFG.window_size if size is None else size
+    halflife = CFG.window_halflife if halflife is None else halflife
+    if window not in WINDOWS:
+        raise ValueError(f"Unknown window policy {window!r}; expected one of {WINDOWS}.")
+    if window == "rolling" and size < 1:
+        raise ValueError("window_size must be >= 1.")
+    if window == "exponential" and halflife <= 0:
+        raise ValueError("window_halflife must be > 0.")
+    return window, size, halflife
+
+def forgetting_factor(halflife: float) -> float:
+    """Per-step weight decay whose weights halve every `halflife` observations."""
+    return 0.5 ** (1.0 / halflife)
+
+def window_start(n: int, window: str, size: int) -> int:
+    """First row of an n-row history that a fit uses (rolling keeps the last `size`)."""
+    return max(n - size, 0) if window == "rolling" else 0
+
+def exponential_weights(n: int, halflife: float) -> np.ndarray:
+    """Observation weights for an n-row history, oldest first; the newest row gets 1."""
+    return forgetting_factor(halflife) ** np.arange(n - 1, -1, -1, dtype=float)
+
+def _traced(fit_one: Callable, name: str, task):
+    """Run one task inside a "fit" span; the span travels back with the result."""
+    with TRACER.capture() as spans:
+        with TRACER.span(name, cat="fit"):
+            result = fit_one(task)
+    return result, spans
+
+def run_backtest(
+    fit_one: Callable,
+    tasks: Iterable,
+    backend: str | None = None,
+    max_workers: int | None = None,
+    checkpoint=None,
+) -> list:
+    """
+    Run independent per-origin fit tasks and return their results in task order.
+
+    Each task must carry everything its origin needs (history up to t-1 and
+    the features for t), so origins can be fitted in any order or in parallel.
+    For the "process" backend `fit_one` must be a module-level function and
+    the tasks must be picklable.
+
+    Every task runs in its own telemetry span (named after `fit_one`), which
+    is attached to the caller's current span whatever the backend.
+
+    `checkpoint` is a directory for an append-only log of completed tasks
+    (see `BacktestCheckpoint`); tasks already in the log are not rerun, and
+    logs of older code versions are pruned once every task has finished.
+    A `CheckpointDir(path, resume=False)` records the tasks without reusing any.
+    None uses `outputs/checkpoints` when Config.backtest_checkpoint is on,
+    False disables it. Results must then be JSON-serializable.
+    """
+    backend = CFG.backtest_backend if backend is None else backend
+    max_workers = CFG.backtest_workers if max_workers is None else max_workers
+    if checkpoint is None:
+        checkpoint = CFG.outputs_dir / "checkpoints" if CFG.backtest_checkpoint else False
+    tasks = list(tasks)
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backtest backend {backend!r}; expected one of {BACKENDS}.")
+
+    results = [None] * len(tasks)
+    pending = list(range(len(tasks)))
+    writer = None
+    with ExitStack() as stack:
+        if checkpoint is not False:
+            if not isinstance(checkpoint, CheckpointDir):
+                checkpoint = CheckpointDir(checkpoint)
+            ckpt = BacktestCheckpoint(checkpoint.path, fit_one)
+            done = ckpt.load()
+            digests = [task_digest(task) for task in tasks]
+            if checkpoint.resume:
+                pending = [i for i, digest in enumerate(digests) if digest not in done]
+                for i, digest in enumerate(digests):
+                    if digest in done:
+                        results[i] = done[digest]
+                TRACER.count("resumed", len(tasks) - len(pending))
+            writer = stack.enter_context(ckpt.writer(durable=checkpoint.resume))
+
+        traced = partial(_traced, fit_one, fit_one.__name__.lstrip("_"))
+        if backend == "serial" or len(pending) <= 1:
+            outputs = (traced(tasks[i]) for i in pending)
+        else:
+            executor_cls = ThreadPoolExecutor if backend == "thread" else ProcessPoolExecutor
+            ex = stack.enter_context(executor_cls(max_workers=max_workers))
+            # Executor.map yields results in submission order.
+            outputs = ex.map(traced, [tasks[i] for i in pending])
+
+        for i, (result, spans) in zip(pending, outputs):
+            TRACER.adopt(spans)
+            results[i] = result
+            if writer is not None and digests[i] not in done:
+                writer.append(i, digests[i], result)
+        if checkpoint is not False:
+            ckpt.prune_stale()
+    return results
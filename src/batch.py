@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import time
+from dataclasses import replace
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .backtest import run_backtest
+from .config import CFG, Config
+from .io import load_excel, build_master, select_pair, train_test_split_index, write_columnar
+from .pipeline import (
+    MODELS, parse_models, stage_features, stage_nn_select, stage_nn_forecast,
+    stage_arima_select, stage_arima_forecast, stage_var_select, stage_var_forecast,
+)
+
+def enumerate_pairs(df_x: pd.DataFrame, spec_path=None, cfg: Config = CFG) -> list[tuple[str, str]]:
+    """
+    (target_col, x_col) pairs to forecast: read from a spec file (CSV with
+    `target_col,x_col` columns, or a JSON list of such objects), otherwise
+    the configured target against every predictor in `data_x`.
+    """
+    if spec_path is None:
+        return [(cfg.target_col, c) for c in df_x.columns if c != cfg.date_col]
+
+    spec_path = Path(spec_path)
+    if spec_path.suffix == ".json":
+        spec = pd.DataFrame(json.loads(spec_path.read_text(encoding="utf-8")))
+    else:
+        spec = pd.read_csv(spec_path)
+    if "target_col" not in spec:
+        spec["target_col"] = cfg.target_col
+    return list(spec[["target_col", "x_col"]].itertuples(index=False, name=None))
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(name)).strip("._-")[:60] or "col"
+
+def pair_dirname(target_col: str, x_col: str) -> str:
+    """
+    Directory name of a pair's forecasts: both column names reduced to
+    path-safe characters, plus a hash of the original names so pairs that
+    differ only in the removed characters (or in case) never share one.
+    """
+    digest = hashlib.sha256(f"{target_col}\0{x_col}".encode()).hexdigest()[:8]
+    return f"{_slug(target_col)}__{_slug(x_col)}-{digest}"
+
+def run_pair(task) -> dict:
+    """
+    Backtest the selected models for one (target, x) pair; errors are
+    reported, not raised. Models in `precomputed` (model -> forecast and
+    rmse, see `batched_forecasts`) are taken from there.
+    """
+    df_pair_level, cfg, models, precomputed = task
+    rmse_rows, forecasts = [], pd.DataFrame(index=df_pair_level.index[:0])
+    start = time.perf_counter()
+    try:
+        data = {
+            "df_pair_level": df_pair_level,
+            "split": train_test_split_index(df_pair_level, cfg.train_ratio),
+        }
+        test_idx = data["split"]["test_idx"]
+        forecasts = pd.DataFrame({"actual_level": df_pair_level.loc[test_idx, cfg.target_col]})
+
+        if "arima" in models:
+            arima = precomputed.get("arima") or stage_arima_forecast(cfg, data, stage_arima_select(cfg, data))
+            forecasts["arima_forecast"] = arima["forecast"].reindex(test_idx)
+            rmse_rows.append(("ARIMA", arima["rmse"]))
+        if "var" in models:
+            var = precomputed.get("var") or stage_var_forecast(cfg, data, stage_var_select(cfg, data))
+            forecasts["var_forecast"] = var["forecast"].reindex(test_idx)
+            rmse_rows.append(("VAR", var["rmse"]))
+        if "nn" in models:
+            features = stage_features(cfg, data)
+            nn = stage_nn_forecast(cfg, data, features, stage_nn_select(cfg, features))
+            forecasts["nn_forecast"] = nn["forecast_level"].reindex(test_idx)
+            rmse_rows.append(("Neural Network", nn["rmse"]))
+        status, error = "ok", None
+    except Exception as exc:
+        status, error = "failed", repr(exc)
+
+    return {
+        "target_col": cfg.target_col,
+        "x_col": cfg.x_col,
+        "n_obs": len(df_pair_level),
+        "rmse": rmse_rows,
+        "forecasts": forecasts,
+        "seconds": time.perf_counter() - start + precomputed.get("seconds", 0.0),
+        "status": status,
+        "error": error,
+    }
+
+# Below this many distinct target series the batched ARIMA fit (a NumPy Kalman filter stepping
+# through time) is slower than statsmodels' per-series fits; measured crossover ~4 series.
+ARIMA_BATCH_MIN_SERIES = 4
+
+def batched_forecasts(tasks, models) -> list[dict]:
+    """
+    ARIMA and VAR forecasts for pairs that share a date index (and so a
+    train/test split), batched across pairs instead of fitted pair by pair:
+
+    - ARIMA: pairs sharing a target are forecast once. With at least
+      ARIMA_BATCH_MIN_SERIES distinct targets the orders come from
+      `search_arima_order_batched` and the recursive fits from
+      `forecast_arima_batched`, one batch per selected order; fewer
+      targets each run the per-pair statsmodels stages once.
+    - VAR: lags from `select_var_lag_batched`, recursive OLS fits from
+      `forecast_var_batched`, one batch per selected lag (not for the
+      "exponential" window, which needs observation weights).
+
+    Returns, per task, {model: {"forecast", "rmse"}, "seconds": share of the batch time}.
+    """
+    from .eval import rmse
+    from .models.arima import forecast_arima_batched, search_arima_order_batched
+    from .models.var import forecast_var_batched, select_var_lag_batched
+
+    start = time.perf_counter()
+    cfg = tasks[0][1]
+    df0 = tasks[0][0]
+    split = train_test_split_index(df0, cfg.train_ratio)
+    n_train, test_idx = split["n_train"], split["test_idx"]
+    out = [{} for _ in tasks]
+    actual = [df.loc[test_idx, c.target_col].to_numpy() for df, c, *_ in tasks]
+
+    def record(model, i, forecast):
+        forecast = pd.Series(forecast, index=test_idx, name=f"{model}_forecast")
+        out[i][model] = {"forecast": forecast, "rmse": rmse(actual[i], forecast.values)}
+
+    # pairs sharing a target (on this index) have the same ARIMA forecasts
+    targets = {}
+    for i, (df, c, *_) in enumerate(tasks):
+        targets.setdefault(df[c.target_col].to_numpy().tobytes(), []).append(i)
+    groups = list(targets.values())
+    if "arima" in models and len(groups) >= ARIMA_BATCH_MIN_SERIES:
+        levels = pd.DataFrame({k: tasks[ix[0]][0][tasks[ix[0]][1].target_col].to_numpy()
+                               for k, ix in enumerate(groups)}, index=df0.index)
+        orders, _ = search_arima_order_batched(levels.iloc[:n_train], p_max=cfg.arima_p_max, q_max=cfg.arima_q_max)
+        for order in set(orders.values()):
+            cols = [k for k, o in orders.items() if o == order]
+            fc = forecast_arima_batched(levels[cols], n_train, order, refit_every=cfg.arima_refit_every,
+                                        window=cfg.window, window_size=cfg.window_size,
+                                        window_halflife=cfg.window_halflife)
+            for k in cols:
+                for i in groups[k]:
+                    record("arima", i, fc[k].to_numpy())
+    elif "arima" in models:
+        for ix in groups:
+            df, c = tasks[ix[0]][:2]
+            data = {"df_pair_level": df, "split": split}
+            arima = stage_arima_forecast(c, data, stage_arima_select(c, data))
+            for i in ix:
+                record("arima", i, arima["forecast"].to_numpy())
+
+    if "var" in models and cfg.window != "exponential":
+        panel = np.stack([df[[c.target_col, c.x_col]].to_numpy(dtype=float) for df, c, *_ in tasks])
+        lags, _ = select_var_lag_batched(panel[:, :n_train], maxlags=8)
+        for lag in np.unique(lags):
+            rows = np.flatnonzero(lags == lag)
+            fc = forecast_var_batched(panel[rows], n_train, int(lag), window=cfg.window,
+                                      window_size=cfg.window_size)
+            for j, i in enumerate(rows):
+                record("var", i, fc[:, j])
+
+    share = (time.perf_counter() - start) / len(tasks)
+    for res in out:
+        res["seconds"] = share
+    return out
+
+def _precompute(tasks, models) -> None:
+    """Fill each task's precomputed forecasts with `batched_forecasts` per group of pairs on one date index."""
+    groups = {}
+    for task in tasks:
+        groups.setdefault(task[0].index.to_numpy().tobytes(), []).append(task)
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        try:
+            results = batched_forecasts(group, models)
+        except (ValueError, np.linalg.LinAlgError) as exc:
+            print(f"Batched fits failed for {len(group)} pairs ({exc!r}); fitting them one by one.")
+            continue
+        for task, res in zip(group, results):
+            task[3].update(res)
+
+def run_batch(
+    spec_path=None,
+    models=MODELS,
+    cfg: Config = CFG,
+    backend: str | None = None,
+    max_workers: int | None = None,
+    limit: int | None = None,
+    vectorized: bool | None = None,
+) -> pd.DataFrame:
+    """
+    Load the workbook once, backtest every pair on a worker pool and write
+    outputs/batch/rmse.csv (one row per pair and model) plus per-pair
+    forecasts as columnar directories under outputs/batch/forecasts/
+    (named by `pair_dirname`, with the column names in their schema.json).
+    With `vectorized` (default Config.batch_vectorized) ARIMA and VAR of
+    pairs on a common date index are fitted together (`batched_forecasts`)
+    before the pool runs the rest.
+    """
+    vectorized = cfg.batch_vectorized if vectorized is None else vectorized
+    outdir = cfg.outputs_dir / "batch"
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    df_y, df_x = load_excel(cfg.data_path, cfg.date_col, use_cache=cfg.data_cache,
+                            cache_dir=cfg.cache_dir, analysis_end=cfg.analysis_end)
+    pairs = enumerate_pairs(df_x, spec_path, cfg)[:limit]
+
+    # pairs run in parallel, so each pair's own backtests and searches stay serial, and
+    # they log no origins (concurrent workers would append to one checkpoint file)
+    inner = replace(cfg, backtest_backend="serial", arima_search_workers=1, nn_search_n_jobs=1,
+                    backtest_checkpoint=False)
+    masters = {}
+    tasks, invalid = [], []
+    for target_col, x_col in pairs:
+        try:
+            if target_col not in masters:
+                masters[target_col] = build_master(df_y, df_x, cfg.date_col, target_col, cfg.analysis_end)
+            df_pair_level = select_pair(masters[target_col], target_col, x_col)
+        except KeyError as exc:
+            invalid.append({
+                "target_col": target_col, "x_col": x_col, "n_obs": 0, "rmse": [],
+                "forecasts": pd.DataFrame(), "seconds": 0.0, "status": "failed", "error": repr(exc),
+            })
+            continue
+        tasks.append((df_pair_level, replace(inner, target_col=target_col, x_col=x_col), tuple(models), {}))
+    if vectorized and {"arima", "var"} & set(models):
+        _precompute(tasks, models)
+
+    results = run_backtest(
+        run_pair, tasks,
+        backend=cfg.batch_backend if backend is None else backend,
+        max_workers=cfg.batch_workers if max_workers is None else max_workers,
+        checkpoint=False,
+    ) + invalid
+
+    rows = []
+    for res in results:
+        base = {k: res[k] for k in ("target_col", "x_col", "n_obs", "seconds", "status", "error")}
+        if res["rmse"]:
+            rows.extend({**base, "model": model, "rmse": value} for model, value in res["rmse"])
+        else:
+            rows.append({**base, "model": None, "rmse": float("nan")})
+
+        if res["status"] == "ok":
+            fc = res["forecasts"].rename_axis(cfg.date_col).reset_index()
+            write_columnar(fc, outdir / "forecasts" / pair_dirname(res["target_col"], res["x_col"]),
+                           meta={"target_col": res["target_col"], "x_col": res["x_col"]})
+
+    rmse_table = pd.DataFrame(rows)
+    rmse_table.to_csv(outdir / "rmse.csv", index=False)
+    return rmse_table
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.batch", description="Forecast many target/predictor pairs.")
+    parser.add_argument("--spec", default=None, help="CSV/JSON file with target_col,x_col pairs (default: all of data_x).")
+    parser.add_argument("--models", default=",".join(MODELS), help="Comma-separated subset of arima,var,nn.")
+    parser.add_argument("--backend", default=None, choices=["serial", "thread", "process"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None, help="Only the first N pairs.")
+    parser.add_argument("--vectorized", action="store_true", default=None,
+                        help="Batch ARIMA/VAR fits across pairs on a common date index.")
+    args = parser.parse_args(argv)
+
+    try:
+        models = parse_models(args.models)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    table = run_batch(args.spec, models, backend=args.backend, max_workers=args.workers, limit=args.limit,
+                      vectorized=args.vectorized)
+    n_failed = int((table.drop_duplicates(["target_col", "x_col"])["status"] != "ok").sum())
+    print(f"Batch finished: {table[['target_col', 'x_col']].drop_duplicates().shape[0]} pairs, {n_failed} failed.")
+    print(f"- {CFG.outputs_dir / 'batch' / 'rmse.csv'}")
+
+if __name__ == "__main__":
+    main()
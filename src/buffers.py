@@ -0,0 +1,90 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from .config import CFG
+
+class HistoryBuffer:
+    """
+    Growable (X, y) history backed by preallocated NumPy arrays.
+
+    Appending a row is amortized O(features): capacity doubles when full
+    instead of copying the whole history on every step as `pd.concat` does.
+    `X` and `y` are zero-copy views of the first `len(self)` rows; a view
+    taken earlier stays valid (it keeps the old block alive if the buffer
+    grows). Dates are kept only as a side index for reconstructing frames.
+    """
+
+    def __init__(self, n_features: int, capacity: int = 64, dtype=None):
+        self.dtype = np.dtype(CFG.history_dtype if dtype is None else dtype)
+        capacity = max(int(capacity), 1)
+        self._X = np.empty((capacity, n_features), dtype=self.dtype)
+        self._y = np.empty(capacity, dtype=self.dtype)
+        self._dates: list = []
+        self._n = 0
+
+    @classmethod
+    def from_frame(cls, X: pd.DataFrame, y: pd.Series, capacity: int | None = None, dtype=None) -> "HistoryBuffer":
+        buf = cls(X.shape[1], capacity=max(capacity or 0, 2 * len(X)), dtype=dtype)
+        buf.extend(X.to_numpy(), y.to_numpy(), dates=X.index)
+        return buf
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def capacity(self) -> int:
+        return len(self._y)
+
+    @property
+    def X(self) -> np.ndarray:
+        return self._X[: self._n]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._y[: self._n]
+
+    @property
+    def dates(self) -> pd.Index:
+        return pd.Index(self._dates)
+
+    def _reserve(self, n_rows: int) -> None:
+        if n_rows <= self.capacity:
+            return
+        new_cap = self.capacity
+        while new_cap < n_rows:
+            new_cap *= 2
+        X_new = np.empty((new_cap, self._X.shape[1]), dtype=self.dtype)
+        y_new = np.empty(new_cap, dtype=self.dtype)
+        X_new[: self._n] = self.X
+        y_new[: self._n] = self.y
+        self._X, self._y = X_new, y_new
+
+    def append(self, x_row, y_value, date=None) -> None:
+        self._reserve(self._n + 1)
+        self._X[self._n] = x_row
+        self._y[self._n] = y_value
+        self._dates.append(date)
+        self._n += 1
+
+    def truncate(self, n_rows: int) -> None:
+        """Drop every row after the first `n_rows` (the storage is kept)."""
+        self._n = min(self._n, n_rows)
+        del self._dates[self._n:]
+
+    def extend(self, X, y, dates=None) -> None:
+        X = np.asarray(X)
+        n_new = len(X)
+        self._reserve(self._n + n_new)
+        self._X[self._n : self._n + n_new] = X
+        self._y[self._n : self._n + n_new] = np.asarray(y)
+        self._dates.extend(dates if dates is not None else [None] * n_new)
+        self._n += n_new
+
+    def to_frame(self, columns=None) -> tuple[pd.DataFrame, pd.Series]:
+        """Rebuild (X, y) pandas objects indexed by the stored dates (copies)."""
+        index = self.dates
+        return (
+            pd.DataFrame(self.X.copy(), index=index, columns=columns),
+            pd.Series(self.y.copy(), index=index),
+        )
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+def task_digest(task) -> str:
+    """Content hash of one backtest task (history, features, params...)."""
+    return hashlib.sha256(pickle.dumps(task, protocol=4)).hexdigest()[:24]
+
+def run_fingerprint(fit_one: Callable) -> str:
+    """Hash of the fit function and the source of its module: code changes start a new file."""
+    module = sys.modules[fit_one.__module__]
+    h = hashlib.sha256(f"{fit_one.__module__}.{fit_one.__qualname__}".encode())
+    h.update(Path(inspect.getfile(module)).read_bytes())
+    return h.hexdigest()[:16]
+
+@dataclass(frozen=True)
+class CheckpointDir:
+    """
+    A checkpoint directory for run_backtest. With resume=False finished
+    tasks are only recorded (for a later incremental run), never reused,
+    and lines are not fsynced since no crash recovery depends on them.
+    """
+
+    path: Path
+    resume: bool = True
+
+class BacktestCheckpoint:
+    """
+    Append-only JSON-lines log of completed backtest tasks for one fit
+    function, stored as `<dir>/<fit name>-<run fingerprint>.jsonl`. Each
+    line holds a task's index, content digest and (JSON-serializable)
+    result, and is flushed and fsynced as soon as the task completes, so a
+    killed run loses at most the task in flight. Tasks are matched by
+    digest, so a resumed run reuses exactly the origins whose inputs are
+    unchanged. Logs of older fingerprints for the same function are removed
+    by `prune_stale` once a run has completed, so an interrupted run never
+    loses the log it would resume from.
+    """
+
+    def __init__(self, directory, fit_one: Callable):
+        self.directory = Path(directory)
+        self.name = fit_one.__name__.lstrip("_")
+        self.fingerprint = run_fingerprint(fit_one)
+        self.path = self.directory / f"{self.name}-{self.fingerprint}.jsonl"
+
+    def load(self) -> dict[str, Any]:
+        """Completed results by task digest (a torn last line from a crash is ignored)."""
+        done = {}
+        if not self.path.exists():
+            return done
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "digest" in record:
+                    done[record["digest"]] = record["result"]
+        return done
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        new = not self.path.exists()
+        fh = self.path.open("a", encoding="utf-8")
+        if new:
+            fh.write(json.dumps({"fit": self.name, "fingerprint": self.fingerprint}) + "\n")
+        return fh
+
+    def prune_stale(self) -> None:
+        """Remove the logs of other fingerprints of this fit function."""
+        for stale in self.directory.glob(f"{self.name}-*.jsonl"):
+            if stale != self.path:
+                stale.unlink(missing_ok=True)
+
+    def writer(self, durable: bool = True) -> "_CheckpointWriter":
+        return _CheckpointWriter(self, durable)
+
+class _CheckpointWriter:
+    def __init__(self, checkpoint: BacktestCheckpoint, durable: bool = True):
+        self.checkpoint = checkpoint
+        self.durable = durable
+        self._fh = None
+
+    def __enter__(self):
+        self._fh = self.checkpoint._open()
+        return self
+
+    def append(self, index: int, digest: str, result: Any) -> None:
+        self._fh.write(json.dumps({"index": index, "digest": digest, "result": result}) + "\n")
+        self._fh.flush()
+        if self.durable:
+            os.fsync(self._fh.fileno())
+
+    def __exit__(self, *exc):
+        self._fh.close()
+        return False
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import types
+import typing
+from dataclasses import fields, replace
+from pathlib import Path
+import pandas as pd
+
+from .config import CFG, Config
+
+# Keep this module light: it is what `python -m src` imports before anything
+# else, so model, plotting and report modules are only imported by the
+# stages (or subcommands) that use them.
+
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off"}
+
+def _convert(text: str, tp, default):
+    """Parse `text` as type `tp` (an annotation; `default` disambiguates bare tuples)."""
+    args = typing.get_args(tp)
+    if isinstance(tp, types.UnionType) or typing.get_origin(tp) is typing.Union:
+        if text.lower() == "none" and type(None) in args:
+            return None
+        (inner,) = [a for a in args if a is not type(None)]
+        return _convert(text, inner, default)
+    if tp is bool:
+        if text.lower() in _TRUE:
+            return True
+        if text.lower() in _FALSE:
+            return False
+        raise ValueError(f"expected a boolean, got {text!r}")
+    if typing.get_origin(tp) is tuple or tp is tuple:
+        item = args[0] if args else (type(default[0]) if default else str)
+        return tuple(_convert(part.strip(), item, None) for part in text.split(",") if part.strip())
+    if tp is pd.Timestamp:
+        return pd.Timestamp(text)
+    if tp in (int, float, str, Path):
+        return tp(text)
+    raise ValueError(f"cannot parse a value of type {tp!r}")
+
+def parse_override(text: str) -> tuple[str, object]:
+    """'field=value' -> (field, value converted to the Config field's type)."""
+    name, sep, value = text.partition("=")
+    name = name.strip()
+    known = {f.name: f for f in fields(Config)}
+    if not sep or name not in known:
+        raise ValueError(f"Invalid override {text!r}; expected field=value with field one of {sorted(known)}.")
+    field = known[name]
+    try:
+        return name, _convert(value.strip(), field.type, getattr(CFG, name))
+    except ValueError as exc:
+        raise ValueError(f"Invalid value for {name}: {exc}") from exc
+
+def apply_overrides(cfg: Config, overrides) -> Config:
+    """A copy of `cfg` with the 'field=value' overrides applied (later ones win)."""
+    return replace(cfg, **dict(parse_override(o) for o in overrides))
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src", description="Import forecasting pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run the forecasting pipeline.")
+    p_run.add_argument("--models", default="arima,var,nn", help="Comma-separated subset of arima,var,nn.")
+    p_run.add_argument("--skip-report", action="store_true", help="Skip the plot and the HTML report.")
+    p_run.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE",
+                       help="Override a Config field, e.g. --set var_method=rls (repeatable).")
+    p_run.add_argument("--no-cache", action="store_true", help="Recompute every stage.")
+    p_run.add_argument("--incremental", action="store_true",
+                       help="Only forecast origins that are new or revised since the last run.")
+
+    p_fc = sub.add_parser("forecast", help="1-step forecast from the model registry (fit and register on a miss).")
+    p_fc.add_argument("--models", default="arima,var,nn", help="Comma-separated subset of arima,var,nn.")
+    p_fc.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE",
+                      help="Override a Config field (repeatable).")
+
+    p_serve = sub.add_parser("serve", help="Serve 1-step forecasts over HTTP with the models kept in memory.")
+    p_serve.add_argument("--models", default="arima,var,nn", help="Comma-separated subset of arima,var,nn.")
+    p_serve.add_argument("--host", default=None, help=f"Bind address (default {CFG.serve_host}).")
+    p_serve.add_argument("--port", type=int, default=None, help=f"Port (default {CFG.serve_port}).")
+    p_serve.add_argument("--coalesce-ms", type=float, default=None,
+                         help=f"Batch forecasts arriving within this window (default {CFG.serve_coalesce_ms}).")
+    p_serve.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE",
+                         help="Override a Config field (repeatable).")
+
+    # the other entry points keep their own argument parsers
+    for name, help_ in (("batch", "Forecast many target/predictor pairs (see src.batch)."),
+                        ("io", "Data ingestion utilities (see src.io).")):
+        sub.add_parser(name, help=help_, add_help=False).add_argument("rest", nargs=argparse.REMAINDER)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        from .pipeline import parse_models, run_all
+
+        try:
+            models = parse_models(args.models)
+            cfg = apply_overrides(CFG, args.set)
+        except ValueError as exc:
+            parser.error(str(exc))
+        if args.no_cache:
+            cfg = replace(cfg, stage_cache=False)
+        if args.incremental:
+            from .incremental import run_incremental
+            run_incremental(cfg, models=models)
+        else:
+            run_all(cfg, models=models, skip_report=args.skip_report)
+        print("Pipeline finished.")
+    elif args.command == "forecast":
+        from .pipeline import parse_models
+        from .registry import forecast_from_registry
+
+        try:
+            models = parse_models(args.models)
+            cfg = apply_overrides(CFG, args.set)
+        except ValueError as exc:
+            parser.error(str(exc))
+        print(json.dumps(forecast_from_registry(cfg, models), indent=2))
+    elif args.command == "serve":
+        from .pipeline import parse_models
+        from .serve import serve
+
+        try:
+            models = parse_models(args.models)
+            cfg = apply_overrides(CFG, args.set)
+        except ValueError as exc:
+            parser.error(str(exc))
+        serve(cfg, models, host=args.host, port=args.port, coalesce_ms=args.coalesce_ms)
+    elif args.command == "batch":
+        from .batch import main as batch_main
+        batch_main(args.rest)
+    else:
+        from .io import main as io_main
+        io_main(args.rest)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -8,6 +8,21 @@ class Config:
     project_root: Path = Path(__file__).resolve().parents[1]
     data_path: Path = project_root / "data" / "data.xlsx"
     outputs_dir: Path = project_root / "outputs"
+    cache_dir: Path = outputs_dir / ".cache"
+
+    # Ingestion: parse the workbook once into a columnar cache keyed by its hash
+    data_cache: bool = True
+
+    # Pipeline: reuse stage outputs under cache_dir/stages when their inputs are unchanged
+    stage_cache: bool = True
+
+    # Telemetry: timings.json / trace.json are always written; profile these stages too
+    profile_stages: tuple[str, ...] = ()  # stage names, or ("*",) for every computed stage
+    profiler: str = "cprofile"  # "cprofile" (outputs/profiles/<stage>.prof) or "pyinstrument" (.html)
+
+    # Fitted statsmodels results shared by order selection and forecasting (LRU)
+    fit_cache_size: int = 256
+    fit_cache_persist: bool = False  # also pickle fits under cache_dir/fits
 
     # Columns
     date_col: str = "date"
@@ -21,7 +36,66 @@ class Config:
     # Features
     lags: int = 4
 
+    # Recursive history buffers ("float64" or "float32")
+    history_dtype: str = "float64"
+
     # Reproducibility
     random_state: int = 42
 
+    # Backtest execution ("serial", "thread" or "process")
+    backtest_backend: str = "serial"
+    backtest_workers: int | None = None  # None = executor default (CPU count)
+    backtest_checkpoint: bool = False  # resume backtests from their logged origins (see pipeline._checkpoint_dir)
+
+    # Estimation window of every recursive forecaster: "expanding" (all history),
+    # "rolling" (last window_size observations) or "exponential" (weights halve every window_halflife steps)
+    window: str = "expanding"
+    window_size: int = 40
+    window_halflife: float = 20.0
+
+    # Batch mode: pairs run on this backend (their own backtests stay serial)
+    batch_backend: str = "process"
+    batch_workers: int | None = None
+    # pairs on a common date index get their ARIMA/VAR selection and fits batched across pairs
+    batch_vectorized: bool = False
+
+    # Forecast service (python -m src serve): forecasts arriving within serve_coalesce_ms share one prediction
+    serve_host: str = "127.0.0.1"
+    serve_port: int = 8765
+    serve_coalesce_ms: float = 2.0
+
+    # ARIMA order search: "grid" (every candidate) or "stepwise" (neighbours of the best only,
+    # so it may miss the grid's best order), across processes
+    arima_p_max: int = 2
+    arima_q_max: int = 2
+    arima_search: str = "grid"
+    arima_search_workers: int = 1
+    arima_fit_timeout: float | None = None  # seconds per candidate fit
+
+    # ARIMA: re-estimate every k origins (1 = full refit, 0 = estimate once)
+    arima_refit_every: int = 1
+    arima_refit_tradeoff: tuple[int, ...] = ()  # e.g. (1, 4, 0) to report timing/RMSE drift per k
+
+    # VAR: "ols" refits statsmodels at every origin, "rls" uses rank-one updates
+    var_method: str = "ols"
+
+    # NN hyperparameter search: "grid" (exhaustive) or "halving" (successive halving on max_iter)
+    nn_search: str = "grid"
+    nn_search_grid: str = "default"  # key of models.nn.PARAM_GRIDS ("default" or "wide")
+    nn_search_min_iter: int = 100
+    nn_search_max_iter: int = 3000
+    nn_search_factor: int = 2
+    nn_search_n_jobs: int | None = -1
+
+    # NN: "refit" trains from scratch per origin, "warm" fine-tunes the previous weights
+    nn_mode: str = "refit"
+    nn_warm_max_iter: int = 200
+    nn_full_retrain_every: int = 0  # 0 = only the first origin trains from scratch
+    nn_compare_modes: bool = False  # also run the other mode and record the deltas
+    # Refit mode with nn_ensemble_seeds > 1 averages MLPs seeded random_state, random_state + 1, ...
+    # trained in parallel on nn_ensemble_backend (workers read the history from shared memory)
+    nn_ensemble_seeds: int = 1
+    nn_ensemble_backend: str = "process"
+    nn_ensemble_workers: int | None = None
+
 CFG = Config()
@@ -1,34 +1,47 @@
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-from sklearn.metrics import mean_squared_error
 
 def rmse(y_true, y_pred) -> float:
-    return float(np.sqrt(mean_squared_error(y_true, y_pred)))
+    # plain NumPy: importing sklearn.metrics just for this costs ~1s of startup
+    err = np.asarray(y_true, dtype=float) - np.asarray(y_pred, dtype=float)
+    return float(np.sqrt(np.mean(err ** 2)))
 
 def reconstruct_levels_from_diffs(
     df_pair_level: pd.DataFrame,
     target_col: str,
     dates: pd.Index,
-    preds_diff: list[float],
-) -> tuple[pd.Series, pd.Series]:
+    preds_diff,
+    columns=None,
+) -> tuple[pd.Series | pd.DataFrame, pd.Series]:
     """
     Reconstruct level forecasts from 1-step diff predictions:
     yhat_t(level) = y_{t-1}(level) + yhat_t(diff)
+    The date index is aligned once and all levels are computed in one
+    NumPy operation. `preds_diff` may be 1-D (one path) or 2-D with one
+    row per date and one column per path (models, seeds, ...).
     Returns:
-      pred_levels: Series indexed by dates
+      pred_levels: Series indexed by dates (DataFrame for 2-D input)
       actual_levels: Series indexed by dates
     """
-    pred_levels = []
-    actual_levels = []
+    dates = pd.Index(dates)
+    levels = df_pair_level[target_col].to_numpy(dtype=float)
+    pos = df_pair_level.index.get_indexer(dates)
+    if (pos < 0).any():
+        raise KeyError(f"Dates not in df_pair_level index: {list(dates[pos < 0])}")
+    if (pos == 0).any():
+        raise ValueError("Cannot reconstruct a level for the first date (no previous level).")
 
-    for i, dt in enumerate(dates):
-        loc = df_pair_level.index.get_loc(dt)
-        prev_level = df_pair_level[target_col].iloc[loc - 1]
-        pred_lvl = prev_level + preds_diff[i]
-        pred_levels.append(pred_lvl)
-        actual_levels.append(df_pair_level.loc[dt, target_col])
+    diffs = np.asarray(preds_diff, dtype=float)
+    if diffs.shape[0] != len(dates):
+        raise ValueError("preds_diff must have one row per date.")
 
-    pred_s = pd.Series(pred_levels, index=dates, name="pred_level")
-    act_s = pd.Series(actual_levels, index=dates, name="actual_level")
-    return pred_s, act_s
+    prev = levels[pos - 1]
+    pred = (prev[:, None] + diffs) if diffs.ndim == 2 else prev + diffs
+
+    if pred.ndim == 2:
+        pred_out = pd.DataFrame(pred, index=dates, columns=columns)
+    else:
+        pred_out = pd.Series(pred, index=dates, name="pred_level")
+    act_s = pd.Series(levels[pos], index=dates, name="actual_level")
+    return pred_out, act_s
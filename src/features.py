@@ -1,8 +1,55 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from .config import CFG
 
-def make_lag_features(df_pair_level: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+def lag_matrix(values: np.ndarray, lags: int) -> np.ndarray:
+    """
+    Lag-stacked design matrix in one strided pass.
+    values: (n, k) array -> (n - lags, lags * k) contiguous array whose row i
+    belongs to time t = i + lags and column (l - 1) * k + j holds values[t - l, j].
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, None]
+    n, k = values.shape
+    if n <= lags:
+        return np.empty((0, lags * k), dtype=values.dtype)
+    # windows[s, j, w] = values[s + w, j]; the window starting at t - lags holds lags l = lags - w
+    windows = sliding_window_view(values[:-1], lags, axis=0)
+    return np.ascontiguousarray(windows[:, :, ::-1].transpose(0, 2, 1)).reshape(n - lags, lags * k)
+
+def lag_column_names(names, lags: int):
+    """Yield `<name>_lag<l>` in lag_matrix column order."""
+    for l in range(1, lags + 1):
+        for name in names:
+            yield f"{name}_lag{l}"
+
+def lagged_design(
+    frame: pd.DataFrame,
+    target: pd.Series,
+    lags: int,
+) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Lag every column of `frame` 1..lags and align with `target`; rows with
+    any missing value are dropped (same result as shift + dropna).
+    """
+    X = lag_matrix(frame.to_numpy(dtype=float), lags)
+    y = target.to_numpy(dtype=float)[lags:]
+    keep = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+    index = frame.index[lags:][keep]
+
+    X_feat = pd.DataFrame(X[keep], index=index, columns=list(lag_column_names(frame.columns, lags)))
+    y_target = pd.Series(y[keep], index=index, name=target.name)
+    return X_feat, y_target
+
+def make_lag_features(
+    df_pair_level: pd.DataFrame,
+    target_col: str = CFG.target_col,
+    x_col: str = CFG.x_col,
+    lags: int = CFG.lags,
+) -> tuple[pd.DataFrame, pd.Series]:
     """
     Create features:
     - dy = diff(target)
@@ -12,26 +59,12 @@ def make_lag_features(df_pair_level: pd.DataFrame) -> tuple[pd.DataFrame, pd.Ser
       X_feat: DataFrame of lagged features
       y_target: Series of target_diff aligned with X_feat
     """
-    target_col, x_col = CFG.target_col, CFG.x_col
-    lags = CFG.lags
-
-    df_trans = df_pair_level.copy()
-    df_trans["dy"] = df_trans[target_col].diff()
-    df_trans["x"] = df_trans[x_col]
-    df_trans = df_trans.dropna()
-
-    data = pd.DataFrame(index=df_trans.index)
-    data["target_diff"] = df_trans["dy"]
+    df_trans = pd.DataFrame({
+        "dy": df_pair_level[target_col].diff(),
+        "x": df_pair_level[x_col],
+    }).dropna()
 
-    for l in range(1, lags + 1):
-        data[f"dy_lag{l}"] = df_trans["dy"].shift(l)
-        data[f"x_lag{l}"] = df_trans["x"].shift(l)
-
-    data = data.dropna()
-    X_feat = data.drop(columns=["target_diff"])
-    y_target = data["target_diff"]
-
-    return X_feat, y_target
+    return lagged_design(df_trans, df_trans["dy"].rename("target_diff"), lags)
 
 def split_features_target(
     X_feat: pd.DataFrame,
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+import numpy as np
+
+from .config import CFG
+from .telemetry import TRACER
+
+def series_fingerprint(data) -> str:
+    """Hash of the values (and shape) of a series / frame / array."""
+    values = np.ascontiguousarray(np.asarray(data, dtype=float))
+    h = hashlib.sha256(str(values.shape).encode())
+    h.update(values.tobytes())
+    return h.hexdigest()
+
+class FitCache:
+    """
+    Bounded LRU cache of fitted statsmodels results keyed by
+    (series fingerprint, model class, order), shared by order selection and
+    the recursive forecasters so the same model on the same data is fitted
+    once. With `persist_dir` set, fits are also pickled to disk and reused
+    across runs. `hits` / `misses` count lookups.
+    """
+
+    def __init__(self, maxsize: int = 256, persist_dir=None):
+        self.maxsize = maxsize
+        self.persist_dir = None if persist_dir is None else Path(persist_dir)
+        self._store: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(data, model: str, order) -> str:
+        return hashlib.sha256(f"{series_fingerprint(data)}|{model}|{tuple(np.atleast_1d(order))}".encode()).hexdigest()[:32]
+
+    def _put(self, key: str, result: Any) -> None:
+        with self._lock:
+            self._store[key] = result
+            self._store.move_to_end(key)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+
+    def get_or_fit(self, data, model: str, order, fit: Callable[[], Any]) -> Any:
+        """Return the cached fit for (data, model, order), calling `fit()` on a miss."""
+        key = self.key(data, model, order)
+        with self._lock:
+            if key in self._store:
+                self._store.move_to_end(key)
+                self.hits += 1
+                TRACER.count("fit_cache_hits")
+                return self._store[key]
+
+        path = None if self.persist_dir is None else self.persist_dir / f"{key}.pkl"
+        if path is not None and path.exists():
+            with path.open("rb") as fh:
+                result = pickle.load(fh)
+            with self._lock:
+                self.hits += 1
+            TRACER.count("fit_cache_hits")
+            self._put(key, result)
+            return result
+
+        result = fit()
+        TRACER.count("fits")
+        with self._lock:
+            self.misses += 1
+        self._store_fit(key, result)
+        return result
+
+    def put(self, data, model: str, order, result: Any) -> None:
+        """Store a fit made elsewhere (e.g. in a worker process) as if `get_or_fit` had made it."""
+        self._store_fit(self.key(data, model, order), result)
+
+    def _store_fit(self, key: str, result: Any) -> None:
+        self._put(key, result)
+        path = None if self.persist_dir is None else self.persist_dir / f"{key}.pkl"
+        if path is not None and not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with tmp.open("wb") as fh:
+                pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._store), "maxsize": self.maxsize}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self.hits = 0
+            self.misses = 0
+
+FIT_CACHE = FitCache(
+    maxsize=CFG.fit_cache_size,
+    persist_dir=CFG.cache_dir / "fits" if CFG.fit_cache_persist else None,
+)
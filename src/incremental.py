@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .config import CFG, Config
+from .io import data_fingerprint, read_columnar, write_columnar
+from .pipeline import (
+    MODELS, config_key, parse_models, run_all, write_forecast_outputs,
+    stage_data, stage_features, stage_nn_forecast, stage_arima_forecast, stage_var_forecast,
+)
+from .telemetry import TRACER
+
+# ---------- Snapshot of the last run ----------
+
+def _snapshot_dir(cfg: Config):
+    return cfg.outputs_dir / "snapshot"
+
+def save_snapshot(cfg: Config, data: dict, models, selections: dict, logs: dict) -> None:
+    """
+    Record what a run forecast from: the (target, x) levels, the data
+    fingerprint, the train/test cutoff, the selected order/lag/params and
+    where each model's backtest logged its origins (None if nowhere).
+    """
+    snap = _snapshot_dir(cfg)
+    write_columnar(data["df_pair_level"].reset_index(), snap / "levels")
+    meta = {
+        "data_fingerprint": data_fingerprint(cfg.data_path, cfg.cache_dir),
+        "config_key": config_key(cfg, models),
+        "models": list(models),
+        "cutoff_date": str(data["split"]["cutoff_date"].date()),
+        "last_date": str(data["df_pair_level"].index[-1].date()),
+        "selections": selections,
+        "logs": {m: None if logs.get(m) is None else str(logs[m]) for m in models},
+    }
+    (snap / "snapshot.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+def load_snapshot(cfg: Config = CFG) -> tuple[dict, pd.DataFrame] | None:
+    snap = _snapshot_dir(cfg)
+    if not (snap / "snapshot.json").exists():
+        return None
+    meta = json.loads((snap / "snapshot.json").read_text(encoding="utf-8"))
+    levels = read_columnar(snap / "levels").set_index(cfg.date_col)
+    return meta, levels
+
+def diff_levels(old: pd.DataFrame, new: pd.DataFrame) -> dict:
+    """
+    Compare two level frames on their date index: dates appended after the
+    old last date, old dates whose values changed (revised) or vanished
+    (removed), and the first date from which anything differs.
+    """
+    common = old.index.intersection(new.index)
+    a = old.loc[common, new.columns].to_numpy(dtype=float)
+    b = new.loc[common].to_numpy(dtype=float)
+    changed = ~((a == b) | (np.isnan(a) & np.isnan(b))).all(axis=1)
+
+    added = new.index.difference(old.index)
+    appended = added[added > old.index[-1]]
+    # a date inserted inside the old range changes every later history, like a revision
+    revised = common[changed].union(added[added <= old.index[-1]])
+    removed = old.index.difference(new.index)
+    firsts = [idx.min() for idx in (appended, revised, removed) if len(idx)]
+    return {
+        "appended": list(appended),
+        "revised": list(revised),
+        "removed": list(removed),
+        "first_changed": min(firsts) if firsts else None,
+    }
+
+def pinned_split(df_pair_level: pd.DataFrame, cutoff_date) -> dict:
+    """Same fields as io.train_test_split_index, with the cutoff fixed instead of a train ratio."""
+    index = df_pair_level.index
+    n_train = int(index.get_indexer([pd.Timestamp(cutoff_date)])[0]) + 1
+    if n_train <= 0:
+        raise KeyError(f"Cutoff date {cutoff_date} is not in the data.")
+    train_idx, test_idx = index[:n_train], index[n_train:]
+    return {
+        "n_total": len(index),
+        "n_train": n_train,
+        "train_idx": train_idx,
+        "test_idx": test_idx,
+        "cutoff_date": train_idx[-1],
+        "test_start": test_idx[0],
+        "test_end": test_idx[-1],
+    }
+
+# ---------- Incremental run ----------
+
+def _selections(meta: dict) -> dict:
+    sel = meta["selections"]
+    # JSON turns tuples into lists; restore them so checkpointed tasks hash the same
+    nn_params = None if sel["nn_params"] is None else {
+        k: tuple(v) if isinstance(v, list) else v for k, v in sel["nn_params"].items()
+    }
+    return {
+        "arima_select": None if sel["arima_order"] is None else {"order": tuple(sel["arima_order"])},
+        "var_select": sel["var_lag"],
+        "nn_select": None if nn_params is None else {"params": nn_params},
+    }
+
+def _full_run_reason(meta, cfg: Config, models, diff) -> str | None:
+    if meta is None:
+        return "no snapshot of a previous run"
+    if meta["config_key"] != config_key(cfg, meta["models"]) or not set(models) <= set(meta["models"]):
+        return "the model selection config or the models differ from the snapshot"
+    logs = meta.get("logs") or {}
+    if not all(logs.get(m) and Path(logs[m]).is_dir() for m in meta["models"]):
+        return "no per-origin logs of a previous run"
+    if diff["removed"]:
+        return f"{len(diff['removed'])} dates were removed"
+    if diff["first_changed"] is not None and diff["first_changed"] <= pd.Timestamp(meta["cutoff_date"]):
+        return f"data revised in the training range (from {diff['first_changed'].date()})"
+    return None
+
+def run_incremental(cfg: Config = CFG, models=MODELS) -> dict:
+    """
+    Bring forecasts.csv / rmse.csv up to date with a new data vintage
+    without rerunning history. The new levels are diffed against the last
+    run's snapshot; the train/test cutoff and the model selections are
+    kept, and each model's recursive forecast runs with backtest
+    checkpointing, so only origins whose inputs changed (new quarters, or
+    origins at or after a revised point) are estimated; the others come
+    from the logs the last run's forecast stages wrote (see
+    pipeline._checkpoint_dir). Anything that would change
+    the selections (no snapshot, removed dates, revisions up to the
+    cutoff, another config) or a missing log falls back to a full
+    `run_all`. `models` must be among the snapshot's, and every snapshot
+    model is updated so that the rewritten outputs keep all their columns.
+    Plot, report and metadata.json are left to the next full run.
+    """
+    models = parse_models(models)
+    cfg = replace(cfg, backtest_checkpoint=True)
+    cfg.outputs_dir.mkdir(parents=True, exist_ok=True)
+    snapshot = load_snapshot(cfg)
+    meta, old_levels = snapshot if snapshot is not None else (None, None)
+
+    new = stage_data(cfg)
+    new_levels = new["df_pair_level"]
+    diff = None if old_levels is None else diff_levels(old_levels, new_levels)
+
+    reason = _full_run_reason(meta, cfg, models, diff)
+    if reason is not None:
+        print(f"Full run: {reason}.")
+        # keep the models of the previous outputs as well
+        run_all(cfg, models=models if meta is None else parse_models(set(models) | set(meta["models"])))
+        return {"mode": "full", "reason": reason}
+
+    summary = {
+        "mode": "incremental",
+        "appended": [str(d.date()) for d in diff["appended"]],
+        "revised": [str(d.date()) for d in diff["revised"]],
+        "models": {},
+    }
+    if diff["first_changed"] is None:
+        print(f"Data unchanged since the last run (up to {meta['last_date']}); nothing to do.")
+        return summary
+
+    data = {**new, "split": pinned_split(new_levels, meta["cutoff_date"])}
+    selections = _selections(meta)
+    logs = meta["logs"]
+    TRACER.reset()
+    results = {}
+    for m in meta["models"]:
+        with TRACER.span(f"{m}_forecast", cat="stage") as span:
+            if m == "nn":
+                features = stage_features(cfg, data)
+                results[m] = stage_nn_forecast(cfg, data, features, selections["nn_select"], log_dir=logs[m])
+            elif m == "arima":
+                results[m] = stage_arima_forecast(cfg, data, selections["arima_select"], log_dir=logs[m])
+            else:
+                results[m] = stage_var_forecast(cfg, data, selections["var_select"], log_dir=logs[m])
+        n_origins = len(data["split"]["test_idx"])
+        summary["models"][m] = {"origins": n_origins, "reused": span["counts"].get("resumed", 0),
+                                "seconds": span["wall_seconds"]}
+
+    write_forecast_outputs(cfg, data, results)
+    save_snapshot(cfg, data, meta["models"], meta["selections"], logs)
+
+    print(f"Incremental run: {len(diff['appended'])} new and {len(diff['revised'])} revised dates "
+          f"(first change {diff['first_changed'].date()})")
+    for m, row in summary["models"].items():
+        print(f"- {m}: {row['origins']} origins, {row['reused']} reused from checkpoints ({row['seconds']:.2f}s)")
+    print("Updated outputs/forecasts.csv and outputs/rmse.csv")
+    return summary
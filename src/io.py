@@ -1,22 +1,203 @@
 from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
 import pandas as pd
 from .config import CFG
 
-def load_excel(path=CFG.data_path, date_col=CFG.date_col) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Load raw data from Excel sheets `data_y` and `data_x`."""
-    df_y = pd.read_excel(path, sheet_name="data_y")
-    df_x = pd.read_excel(path, sheet_name="data_x")
+SHEETS = ("data_y", "data_x")
 
-    df_y[date_col] = pd.to_datetime(df_y[date_col])
-    df_x[date_col] = pd.to_datetime(df_x[date_col])
+def write_columnar(df: pd.DataFrame, dirpath, meta: dict | None = None) -> None:
+    """
+    Store a frame as one .npy file per column plus a JSON schema (index is
+    dropped). `meta` (JSON-serializable) is kept in the schema under "meta".
+    """
+    dirpath = Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+    schema = []
+    for i, col in enumerate(df.columns):
+        values = df[col].to_numpy()
+        pickled = values.dtype == object
+        np.save(dirpath / f"{i}.npy", values, allow_pickle=pickled)
+        schema.append({"name": col, "file": f"{i}.npy", "pickled": pickled})
+    doc = {"columns": schema, "n_rows": len(df)}
+    if meta is not None:
+        doc["meta"] = meta
+    (dirpath / "schema.json").write_text(json.dumps(doc), encoding="utf-8")
+
+def read_columnar(dirpath, columns=None) -> pd.DataFrame:
+    """Load a frame written by write_columnar; numeric columns are memory-mapped."""
+    dirpath = Path(dirpath)
+    schema = json.loads((dirpath / "schema.json").read_text(encoding="utf-8"))
+    wanted = None if columns is None else set(columns)
+    data = {}
+    for col in schema["columns"]:
+        if wanted is not None and col["name"] not in wanted:
+            continue
+        if col["pickled"]:
+            data[col["name"]] = np.load(dirpath / col["file"], allow_pickle=True)
+        else:
+            data[col["name"]] = np.load(dirpath / col["file"], mmap_mode="r")
+    # copy=False keeps the memory-mapped columns as the frame's data
+    return pd.DataFrame(data, index=pd.RangeIndex(schema["n_rows"]), copy=False)
+
+def _workbook_digest(path: Path, entries_dir: Path) -> tuple[str, int]:
+    """
+    SHA-256 and mtime of the workbook. The hash is reused from the last
+    entry when size and mtime are unchanged, so a warm load does not
+    re-read the workbook.
+    """
+    stat = path.stat()
+    index_path = entries_dir / "index.json"
+    index = json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() else {}
+
+    if index.get("size") == stat.st_size and index.get("mtime_ns") == stat.st_mtime_ns:
+        digest = index["sha256"]
+    else:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        entries_dir.mkdir(parents=True, exist_ok=True)
+        tmp = entries_dir / f".index-{os.getpid()}.json"
+        tmp.write_text(
+            json.dumps({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, index_path)
+    return digest, stat.st_mtime_ns
+
+def _workbook_key(path: Path, entries_dir: Path) -> str:
+    """Cache key from the workbook's content hash and mtime."""
+    digest, mtime_ns = _workbook_digest(path, entries_dir)
+    return f"{digest[:16]}-{mtime_ns}"
+
+def _entries_dir(path: Path, cache_dir) -> Path:
+    """Cache directory of one workbook, keyed by its resolved path (same-named workbooks don't collide)."""
+    path_hash = hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:12]
+    cache_dir = Path(CFG.cache_dir if cache_dir is None else cache_dir)
+    return cache_dir / "data" / f"{path.stem}-{path_hash}"
+
+def data_fingerprint(path=CFG.data_path, cache_dir=None) -> str:
+    """Content hash of the workbook (independent of mtime)."""
+    path = Path(path)
+    return _workbook_digest(path, _entries_dir(path, cache_dir))[0]
+
+def warm_cache(path=CFG.data_path, date_col=CFG.date_col, cache_dir=None) -> Path:
+    """
+    Convert the workbook's sheets to the columnar cache (if stale) and
+    return the entry dir. Safe for concurrent processes: each one writes
+    its own tmp dir and publishes it with an atomic rename; the loser of a
+    race keeps the winner's (identical) entry.
+    """
+    path = Path(path)
+    entries_dir = _entries_dir(path, cache_dir)
+    entry = entries_dir / _workbook_key(path, entries_dir)
+    if (entry / "complete").exists():
+        return entry
+
+    tmp = entries_dir / f".tmp-{entry.name}-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    for sheet in SHEETS:
+        df = pd.read_excel(path, sheet_name=sheet)
+        df[date_col] = pd.to_datetime(df[date_col])
+        write_columnar(df, tmp / sheet)
+    (tmp / "complete").touch()
+
+    try:
+        tmp.rename(entry)
+    except OSError:
+        # another process published this key first
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not (entry / "complete").exists():
+            raise
+
+    # only now drop stale entries of this workbook (other processes' tmp dirs are left alone)
+    for old in entries_dir.iterdir():
+        if old.is_dir() and old != entry and not old.name.startswith(".tmp-"):
+            shutil.rmtree(old, ignore_errors=True)
+    return entry
+
+def required_columns(
+    target_col: str = CFG.target_col,
+    x_col: str | None = CFG.x_col,
+    extra=(),
+) -> list[str]:
+    """Columns the configured models read (target, predictor and e.g. bonus candidates)."""
+    cols = [target_col] + ([x_col] if x_col else []) + list(extra)
+    return list(dict.fromkeys(cols))
+
+def load_excel(
+    path=CFG.data_path,
+    date_col=CFG.date_col,
+    use_cache: bool | None = None,
+    cache_dir=None,
+    columns=None,
+    analysis_end=None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load raw data from Excel sheets `data_y` and `data_x`.
+    With the cache enabled (Config.data_cache) the sheets are parsed once into
+    a columnar cache under Config.cache_dir and memory-mapped afterwards.
+
+    `columns` pushes a projection down to the reader: each sheet keeps only
+    the date column and the requested columns it contains. `analysis_end`
+    drops rows after that date before anything is merged.
+    """
+    use_cache = CFG.data_cache if use_cache is None else use_cache
+    wanted = None if columns is None else {date_col, *columns}
+
+    if use_cache:
+        entry = warm_cache(path, date_col, cache_dir)
+        sheets = [read_columnar(entry / sheet, columns=wanted) for sheet in SHEETS]
+    else:
+        usecols = None if wanted is None else (lambda c: c in wanted)
+        sheets = [pd.read_excel(path, sheet_name=sheet, usecols=usecols) for sheet in SHEETS]
+        for df in sheets:
+            df[date_col] = pd.to_datetime(df[date_col])
+
+    if analysis_end is not None:
+        sheets = [df[df[date_col] <= analysis_end].reset_index(drop=True) for df in sheets]
+
+    df_y, df_x = sheets
     return df_y, df_x
 
-def build_master(df_y: pd.DataFrame, df_x: pd.DataFrame) -> pd.DataFrame:
-    """Merge target sheet and predictors sheet on date; return indexed master frame."""
-    date_col = CFG.date_col
-    target_col = CFG.target_col
+def measure_load(trace_memory: bool = True, **load_kwargs) -> tuple[tuple[pd.DataFrame, pd.DataFrame], dict]:
+    """
+    Run load_excel and return its frames with wall time and peak traced
+    memory. tracemalloc slows a cold parse about 3x, so the pipeline passes
+    trace_memory=False (peak_mb is then None); `profile-load` traces.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        df_y, df_x = load_excel(**load_kwargs)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    stats = {
+        "seconds": seconds,
+        "peak_mb": None if peak is None else peak / 2**20,
+        "n_columns": df_y.shape[1] + df_x.shape[1],
+        "n_rows": len(df_y),
+    }
+    return (df_y, df_x), stats
 
-    df_y = df_y[df_y[date_col] <= CFG.analysis_end].copy()
+def build_master(
+    df_y: pd.DataFrame,
+    df_x: pd.DataFrame,
+    date_col: str = CFG.date_col,
+    target_col: str = CFG.target_col,
+    analysis_end: pd.Timestamp = CFG.analysis_end,
+) -> pd.DataFrame:
+    """Merge target sheet and predictors sheet on date; return indexed master frame."""
+    df_y = df_y[df_y[date_col] <= analysis_end].copy()
 
     df_master = pd.merge(
         df_y[[date_col, target_col]],
@@ -28,16 +209,20 @@ def build_master(df_y: pd.DataFrame, df_x: pd.DataFrame) -> pd.DataFrame:
     df_master = df_master.set_index(date_col).sort_index()
     return df_master
 
-def select_pair(df_master: pd.DataFrame) -> pd.DataFrame:
+def select_pair(
+    df_master: pd.DataFrame,
+    target_col: str = CFG.target_col,
+    x_col: str = CFG.x_col,
+) -> pd.DataFrame:
     """Extract main pair (target, x) in levels; drop NA."""
-    pair = df_master[[CFG.target_col, CFG.x_col]].dropna().copy()
+    pair = df_master[[target_col, x_col]].dropna().copy()
     pair = pair.sort_index()
     return pair
 
-def train_test_split_index(df_pair_level: pd.DataFrame) -> dict:
+def train_test_split_index(df_pair_level: pd.DataFrame, train_ratio: float = CFG.train_ratio) -> dict:
     """Compute train/test split indices using CFG.train_ratio (chronological split)."""
     n_total = len(df_pair_level)
-    n_train = int(n_total * CFG.train_ratio)
+    n_train = int(n_total * train_ratio)
 
     train_idx = df_pair_level.index[:n_train]
     test_idx = df_pair_level.index[n_train:]
@@ -55,3 +240,30 @@ def train_test_split_index(df_pair_level: pd.DataFrame) -> dict:
         "test_start": test_start,
         "test_end": test_end,
     }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.io", description="Data ingestion utilities.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm = sub.add_parser("warm-cache", help="Convert the workbook to the columnar cache.")
+    warm.add_argument("--path", default=str(CFG.data_path))
+    prof = sub.add_parser("profile-load", help="Compare full vs projected loads (time, peak memory).")
+    prof.add_argument("--path", default=str(CFG.data_path))
+    prof.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "warm-cache":
+        print(f"Cache ready: {warm_cache(args.path)}")
+    elif args.command == "profile-load":
+        use_cache = not args.no_cache
+        if use_cache:
+            warm_cache(args.path)
+        _, full = measure_load(path=args.path, use_cache=use_cache)
+        _, projected = measure_load(
+            path=args.path, use_cache=use_cache,
+            columns=required_columns(), analysis_end=CFG.analysis_end,
+        )
+        print(pd.DataFrame({"full": full, "projected": projected}).T.to_string())
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,594 @@
 from __future__ import annotations
+import multiprocessing as mp
+import time
+import numpy as np
 import pandas as pd
 from statsmodels.tsa.arima.model import ARIMA
 
+from ..backtest import forgetting_factor, resolve_window, run_backtest, window_start
+from ..config import CFG
+from ..fitcache import FIT_CACHE
+from ..telemetry import TRACER
+
+def fit_arima(history, order):
+    """ARIMA(order) fit on `history`, memoized in the shared fit cache."""
+    history = np.asarray(history, dtype=float)
+    return FIT_CACHE.get_or_fit(history, "ARIMA", order, lambda: ARIMA(history, order=order).fit())
+
+def _fit_order(task) -> dict:
+    """
+    Fit one candidate order and return its IC row (never raises). With
+    `return_fit` (in a worker process) the row also carries the fit under
+    "fit", for the parent to put in its own fit cache.
+    """
+    y, order, return_fit = task
+    start = time.perf_counter()
+    try:
+        m = fit_arima(y, order)
+        row = {
+            "p": order[0], "d": order[1], "q": order[2],
+            "bic": float(m.bic), "aic": float(m.aic), "llf": float(m.llf),
+            "nobs_effective": int(m.nobs_effective),
+            "seconds": time.perf_counter() - start, "status": "ok", "error": None,
+        }
+        if return_fit:
+            row["fit"] = m
+        return row
+    except Exception as exc:
+        return {
+            "p": order[0], "d": order[1], "q": order[2],
+            "bic": np.nan, "aic": np.nan, "llf": np.nan, "nobs_effective": None,
+            "seconds": time.perf_counter() - start, "status": "failed", "error": repr(exc),
+        }
+
+def _skipped_row(order, status: str) -> dict:
+    return {
+        "p": order[0], "d": order[1], "q": order[2],
+        "bic": np.nan, "aic": np.nan, "llf": np.nan, "nobs_effective": None,
+        "seconds": 0.0, "status": status, "error": None,
+    }
+
+def _warm_worker(_) -> None:
+    """No-op task: unpickling it imports this module (and statsmodels) in the worker."""
+    return None
+
+class _CandidatePool:
+    """
+    Process pool for order candidates. Workers are warmed before any budget
+    starts counting, and the pool is replaced when a candidate overruns its
+    budget so a stuck fit cannot block later waves.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(workers, 1)
+        self._pool = None
+
+    def get(self):
+        if self._pool is None:
+            self._pool = mp.get_context("spawn").Pool(processes=self.workers)
+            self._pool.map(_warm_worker, range(self.workers))
+        return self._pool
+
+    def kill(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+def _run_wave(y, orders, pool: _CandidatePool | None, timeout: float | None) -> list[dict]:
+    """
+    Fit a wave of candidates, inline when there is no pool. With a pool at
+    most `pool.workers` candidates run at once, and a candidate still running
+    `timeout` seconds after it started is recorded as "timeout".
+    """
+    if pool is None:
+        return [_fit_order((y, order, False)) for order in orders]
+
+    rows = []
+    for i in range(0, len(orders), pool.workers):
+        chunk = orders[i : i + pool.workers]
+        workers = pool.get()
+        pending = [(order, workers.apply_async(_fit_order, ((y, order, True),))) for order in chunk]
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        overran = False
+        for order, res in pending:
+            remaining = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+            try:
+                row = res.get(timeout=remaining)
+                # the fit ran in a worker process, out of reach of this process' counters and
+                # cache: keep it here too, so the forecasts reuse it as after a serial search
+                TRACER.count("fits")
+                if "fit" in row:
+                    FIT_CACHE.put(y, "ARIMA", order, row.pop("fit"))
+                rows.append(row)
+            except mp.TimeoutError:
+                row = _skipped_row(order, "timeout")
+                row["seconds"] = float(timeout)
+                rows.append(row)
+                overran = True
+        if overran:
+            pool.kill()
+    return rows
+
+def search_arima_order(
+    train_y_level: pd.Series,
+    p_max: int = 2,
+    q_max: int = 2,
+    method: str = "grid",
+    workers: int = 1,
+    timeout: float | None = None,
+) -> tuple[tuple[int, int, int], pd.DataFrame]:
+    """
+    ARIMA(p,1,q) order search by BIC over p=0..p_max, q=0..q_max.
+
+    method="grid" fits every candidate, smallest p+q first.
+    method="stepwise" is the pruned search: it starts from a few small
+    orders and only visits the p/q neighbours of the current best until no
+    neighbour improves. It is a heuristic, not a bound: it can stop at a
+    local BIC minimum and return another order than the full grid.
+
+    Candidates run across `workers` processes, each with a `timeout`-second
+    budget. Returns the best order and the IC table (bic, aic, llf, fit
+    seconds and status: ok / failed / timeout / not_visited).
+    """
+    y = np.asarray(train_y_level, dtype=float)
+    grid = [(p, 1, q) for p in range(p_max + 1) for q in range(q_max + 1)]
+    rows: dict[tuple, dict] = {}
+    pool = _CandidatePool(workers) if (workers > 1 or timeout is not None) else None
+    try:
+        _search(y, grid, rows, method, pool, timeout, p_max, q_max)
+    finally:
+        if pool is not None:
+            pool.kill()
+
+    table = pd.DataFrame([rows[o] for o in grid])
+    ok = table[table["status"] == "ok"]
+    if ok.empty:
+        raise RuntimeError("ARIMA order search failed for all candidate orders.")
+
+    best_row = ok.loc[ok["bic"].idxmin()]
+    best_order = (int(best_row["p"]), 1, int(best_row["q"]))
+    return best_order, table
+
+def _search(y, grid, rows: dict, method: str, pool, timeout, p_max: int, q_max: int) -> None:
+    """Fill `rows` (order -> IC row) following the grid or stepwise strategy."""
+    if method == "grid":
+        # cheap fits first, so a time budget is spent on the small orders
+        for row in _run_wave(y, sorted(grid, key=lambda o: o[0] + o[2]), pool, timeout):
+            rows[(row["p"], 1, row["q"])] = row
+    elif method == "stepwise":
+        start = [(min(2, p_max), 1, min(2, q_max)), (0, 1, 0), (min(1, p_max), 1, 0), (0, 1, min(1, q_max))]
+        wave = list(dict.fromkeys(start))
+        while wave:
+            for row in _run_wave(y, wave, pool, timeout):
+                rows[(row["p"], 1, row["q"])] = row
+            ok = [r for r in rows.values() if r["status"] == "ok"]
+            if not ok:
+                break
+            best = min(ok, key=lambda r: r["bic"])
+            bp, bq = best["p"], best["q"]
+            wave = [
+                (p, 1, q)
+                for p, q in [(bp + dp, bq + dq) for dp in (-1, 0, 1) for dq in (-1, 0, 1)]
+                if 0 <= p <= p_max and 0 <= q <= q_max and (p, 1, q) not in rows
+            ]
+        for order in grid:
+            rows.setdefault(order, _skipped_row(order, "not_visited"))
+    else:
+        raise ValueError(f"Unknown ARIMA search method {method!r}; expected 'grid' or 'stepwise'.")
+
 def select_arima_order(train_y_level: pd.Series, p_max=2, q_max=2) -> tuple[int, int, int]:
     """
     Grid search ARIMA(p,1,q) over p=0..p_max, q=0..q_max; choose by BIC.
     """
-    ic_table = []
+    best_order, _ = search_arima_order(train_y_level, p_max=p_max, q_max=q_max)
+    return best_order
+
+def _constrain_stationary(x: np.ndarray) -> np.ndarray:
+    """
+    Vectorized statsmodels `constrain_stationary_univariate`: map rows of
+    unconstrained values (N, k) to stationary AR coefficients through
+    partial autocorrelations (Monahan 1984).
+    """
+    r = x / np.sqrt(1.0 + x**2)
+    y = np.zeros_like(r)
+    for k in range(r.shape[1]):
+        prev = y.copy()
+        for i in range(k):
+            y[:, i] = prev[:, i] + r[:, k] * prev[:, k - i - 1]
+        y[:, k] = r[:, k]
+    return -y
+
+def _unconstrain_stationary(c: np.ndarray) -> np.ndarray:
+    """Inverse of `_constrain_stationary` (partial autocorrelations clipped inside +-0.95)."""
+    n = c.shape[1]
+    y = -c.copy()
+    for k in range(n - 1, 0, -1):
+        rk = np.clip(y[:, k], -0.95, 0.95)
+        prev = y.copy()
+        for i in range(k):
+            y[:, i] = (prev[:, i] - rk * prev[:, k - i - 1]) / (1.0 - rk**2)
+        y[:, k] = rk
+    r = np.clip(y, -0.95, 0.95)
+    return r / np.sqrt(1.0 - r**2)
+
+def _arma_concentrated_llf(dy: np.ndarray, ar: np.ndarray, ma: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Exact Gaussian log-likelihood of ARMA(p,q) for N aligned series at once,
+    with sigma2 concentrated out. `dy` is (N, T), `ar` (N, p), `ma` (N, q).
+    Runs one Kalman filter over the stacked state spaces (Harvey form,
+    stationary initialization). Returns (llf, sigma2, forecast of the next
+    difference), each of shape (N,).
+    """
+    n, T = dy.shape
+    p, q = ar.shape[1], ma.shape[1]
+    r = max(p, q + 1)
+
+    Tm = np.zeros((n, r, r))
+    Tm[:, :p, 0] = ar
+    Tm[:, np.arange(r - 1), np.arange(1, r)] = 1.0
+    R = np.zeros((n, r))
+    R[:, 0] = 1.0
+    R[:, 1 : q + 1] = ma
+    RR = R[:, :, None] * R[:, None, :]
+
+    # stationary initial covariance: vec(P) = (I - T (x) T)^-1 vec(RR')
+    kron = (Tm[:, :, None, :, None] * Tm[:, None, :, None, :]).reshape(n, r * r, r * r)
+    P = np.linalg.solve(np.eye(r * r) - kron, RR.reshape(n, r * r, 1)).reshape(n, r, r)
+    a = np.zeros((n, r))
+
+    sum_logf = np.zeros(n)
+    sum_v2f = np.zeros(n)
+    for t in range(T):
+        F = P[:, 0, 0]
+        v = dy[:, t] - a[:, 0]
+        PZ = P[:, :, 0]
+        sum_logf += np.log(F)
+        sum_v2f += v**2 / F
+        a = a + PZ * (v / F)[:, None]
+        P = P - PZ[:, :, None] * PZ[:, None, :] / F[:, None, None]
+        a = np.einsum("nij,nj->ni", Tm, a)
+        P = Tm @ P @ Tm.transpose(0, 2, 1) + RR
+
+    sigma2 = sum_v2f / T
+    llf = -0.5 * T * (np.log(2.0 * np.pi) + 1.0 + np.log(sigma2)) - 0.5 * sum_logf
+    return llf, sigma2, a[:, 0]
+
+def _batched_ols(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Per-row least squares for stacked designs X (N, T, k) and targets y (N, T)."""
+    Xt = X.transpose(0, 2, 1)
+    return np.linalg.solve(Xt @ X + 1e-8 * np.eye(X.shape[2]), Xt @ y[:, :, None])[:, :, 0]
+
+def _lags(x: np.ndarray, lags: int, start: int) -> np.ndarray:
+    """Stack x[:, t-1], ..., x[:, t-lags] for t = start..T-1 into (N, T-start, lags)."""
+    n, T = x.shape
+    if lags == 0:
+        return np.zeros((n, T - start, 0))
+    return np.stack([x[:, start - l : T - l] for l in range(1, lags + 1)], axis=2)
+
+def _hannan_rissanen_start(dy: np.ndarray, p: int, q: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hannan-Rissanen start values for every row of `dy`: a long AR fit gives
+    innovation estimates, then dy_t is regressed on its own p lags and q
+    lagged innovations.
+    """
+    n, T = dy.shape
+    if p + q == 0:
+        return np.zeros((n, 0)), np.zeros((n, 0))
+    m = min(max(p, q) + 4, T // 4)
+    resid = np.zeros_like(dy)
+    if q:
+        resid[:, m:] = dy[:, m:] - np.einsum("ntk,nk->nt", _lags(dy, m, m), _batched_ols(_lags(dy, m, m), dy[:, m:]))
+    start = m + q if q else p
+    X = np.concatenate([_lags(dy, p, start), _lags(resid, q, start)], axis=2)
+    coef = _batched_ols(X, dy[:, start:])
+    return coef[:, :p], coef[:, p:]
+
+def _batched_bfgs(fun, x0: np.ndarray, maxiter: int, gtol: float, ftol: float = 1e-10) -> np.ndarray:
+    """
+    Minimize N independent objectives at once. `fun(x, rows)` maps points
+    (len(rows), k) for the given rows to their (len(rows),) values. Each row
+    keeps its own BFGS inverse Hessian and backtracking line search;
+    gradients come from central differences in which every row's j-th
+    coordinate is perturbed in the same evaluation. Converged rows drop out,
+    so late iterations only evaluate the stragglers.
+    """
+    n, k = x0.shape
+
+    def value(x, rows):
+        f = fun(x, rows)
+        return np.where(np.isfinite(f), f, np.inf)
+
+    def grad(x, rows):
+        g = np.empty_like(x)
+        for j in range(k):
+            h = 1e-6 * np.maximum(np.abs(x[:, j]), 1.0)
+            up, down = x.copy(), x.copy()
+            up[:, j] += h
+            down[:, j] -= h
+            g[:, j] = (fun(up, rows) - fun(down, rows)) / (2.0 * h)
+        return g
+
+    all_rows = np.arange(n)
+    x = x0.copy()
+    f, g = value(x, all_rows), grad(x, all_rows)
+    H = np.broadcast_to(np.eye(k), (n, k, k)).copy()
+    active = np.abs(g).max(axis=1) > gtol
+    for _ in range(maxiter):
+        rows = np.flatnonzero(active)
+        if rows.size == 0:
+            break
+        xa, fa, ga, Ha = x[rows], f[rows], g[rows], H[rows]
+
+        d = -np.einsum("nij,nj->ni", Ha, ga)
+        slope = (ga * d).sum(axis=1)
+        uphill = slope >= 0
+        Ha[uphill] = np.eye(k)
+        d[uphill] = -ga[uphill]
+        slope[uphill] = -(ga[uphill] ** 2).sum(axis=1)
+
+        step = np.ones(rows.size)
+        x_new, f_new = xa.copy(), fa.copy()
+        pending = np.ones(rows.size, dtype=bool)
+        for _ in range(30):
+            trial = xa + step[:, None] * d
+            f_trial = value(trial, rows)
+            ok = pending & (f_trial <= fa + 1e-4 * step * slope)
+            x_new[ok], f_new[ok] = trial[ok], f_trial[ok]
+            pending &= ~ok
+            if not pending.any():
+                break
+            step[pending] *= 0.5
+
+        g_new = grad(x_new, rows)
+        s, yv = x_new - xa, g_new - ga
+        sy = (s * yv).sum(axis=1)
+        upd = sy > 1e-12
+        if upd.any():
+            rho = 1.0 / sy[upd]
+            V = np.eye(k) - rho[:, None, None] * s[upd][:, :, None] * yv[upd][:, None, :]
+            Ha[upd] = V @ Ha[upd] @ V.transpose(0, 2, 1) + rho[:, None, None] * s[upd][:, :, None] * s[upd][:, None, :]
+
+        # a failed line search means the row is as converged as finite differences allow
+        done = pending | (np.abs(fa - f_new) <= ftol * np.maximum(np.abs(fa), 1.0)) | (np.abs(g_new).max(axis=1) <= gtol)
+        x[rows], f[rows], g[rows], H[rows] = x_new, f_new, g_new, Ha
+        active[rows[done]] = False
+    return x
+
+def fit_arima_batched(levels, order, maxiter: int = 200) -> pd.DataFrame:
+    """
+    Fit the same ARIMA(p,1,q) to N aligned level series at once.
+
+    `levels` is a DataFrame (one column per series) or a (T, N) array. The
+    model is ARMA(p,q) on first differences without constant, like
+    `ARIMA(y, order=(p, 1, q))`. All likelihoods are evaluated as one
+    stacked Kalman filter, and a batched BFGS works on the same
+    stationarity/invertibility transform as statsmodels, starting from
+    Hannan-Rissanen estimates. One optimizer step costs a fixed number of
+    batched likelihood evaluations whatever N is.
+
+    The likelihood is the exact ARMA likelihood of the differences (what
+    SARIMAX reports on them); statsmodels' levels model differs by ~1e-4
+    through its diffuse level initialization. Over-parameterized orders can
+    have several local optima, so those may settle on a different one.
+
+    Returns one row per series with statsmodels-style parameter names
+    (ar.L1.., ma.L1.., sigma2) plus llf, aic, bic and nobs_effective.
+    """
+    frame = levels if isinstance(levels, pd.DataFrame) else pd.DataFrame(np.asarray(levels, dtype=float))
+    p, d, q = order
+    if d != 1:
+        raise ValueError("fit_arima_batched only supports d=1.")
+    dy = np.diff(frame.to_numpy(dtype=float), axis=0).T
+    if not np.isfinite(dy).all():
+        raise ValueError("Series must be aligned and free of missing values.")
+    T = dy.shape[1]
+
+    def unpack(x):
+        return _constrain_stationary(x[:, :p]), -_constrain_stationary(x[:, p:])
+
+    def objective(x, rows):
+        with np.errstate(all="ignore"):
+            llf, _, _ = _arma_concentrated_llf(dy[rows], *unpack(x))
+        return -llf / T
+
+    ar0, ma0 = _hannan_rissanen_start(dy, p, q)
+    x = np.hstack([_unconstrain_stationary(ar0), _unconstrain_stationary(-ma0)])
+    if p + q:
+        x = _batched_bfgs(objective, x, maxiter=maxiter, gtol=1e-6)
+
+    ar, ma = unpack(x)
+    llf, sigma2, _ = _arma_concentrated_llf(dy, ar, ma)
+    k_params = p + q + 1
+    out = pd.DataFrame(
+        np.hstack([ar, ma, sigma2[:, None]]),
+        index=frame.columns,
+        columns=[f"ar.L{i}" for i in range(1, p + 1)] + [f"ma.L{i}" for i in range(1, q + 1)] + ["sigma2"],
+    )
+    out["llf"] = llf
+    out["aic"] = -2.0 * llf + 2.0 * k_params
+    out["bic"] = -2.0 * llf + np.log(T) * k_params
+    out["nobs_effective"] = T
+    return out
+
+def search_arima_order_batched(
+    levels: pd.DataFrame,
+    p_max: int = 2,
+    q_max: int = 2,
+) -> tuple[dict, pd.DataFrame]:
+    """
+    BIC order search like `search_arima_order`, for every column of `levels`
+    at once: each candidate order is fitted to all series with
+    `fit_arima_batched`. Returns {column: best order} and the long IC table
+    (one row per series and candidate).
+    """
+    rows = []
     for p in range(p_max + 1):
         for q in range(q_max + 1):
-            try:
-                m = ARIMA(train_y_level, order=(p, 1, q)).fit()
-                ic_table.append(((p, 1, q), float(m.bic)))
-            except Exception:
-                continue
+            fit = fit_arima_batched(levels, (p, 1, q))
+            rows.append(pd.DataFrame({
+                "series": fit.index, "p": p, "d": 1, "q": q,
+                "bic": fit["bic"].to_numpy(), "aic": fit["aic"].to_numpy(), "llf": fit["llf"].to_numpy(),
+                "nobs_effective": fit["nobs_effective"].to_numpy(),
+            }))
 
-    if not ic_table:
-        raise RuntimeError("ARIMA grid search failed for all candidate orders.")
+    table = pd.concat(rows, ignore_index=True)
+    best = table.loc[table.groupby("series", sort=False)["bic"].idxmin()]
+    orders = {s: (int(p), 1, int(q)) for s, p, q in best[["series", "p", "q"]].itertuples(index=False, name=None)}
+    return orders, table
 
-    best_order = sorted(ic_table, key=lambda x: x[1])[0][0]
-    return best_order
+def estimation_window(window, window_size, window_halflife) -> tuple[str, int]:
+    """Window policy for ARIMA estimation: "exponential" becomes a rolling window of its effective size."""
+    window, window_size, window_halflife = resolve_window(window, window_size, window_halflife)
+    if window == "exponential":
+        window, window_size = "rolling", int(np.ceil(1.0 / (1.0 - forgetting_factor(window_halflife))))
+    return window, window_size
 
-def forecast_arima_recursive(train_y_level: pd.Series, test_y_level: pd.Series, order) -> pd.Series:
+def forecast_arima_batched(
+    levels: pd.DataFrame,
+    n_train: int,
+    order,
+    refit_every: int | None = None,
+    window: str | None = None,
+    window_size: int | None = None,
+    window_halflife: float | None = None,
+) -> pd.DataFrame:
     """
-    Recursive 1-step forecast in levels with re-fitting each step.
+    `forecast_arima_recursive` for every column of `levels` (aligned level
+    series; the first `n_train` rows are the training sample) with the
+    same order. Parameters are estimated with `fit_arima_batched` for all
+    series at once every `refit_every` origins, and each origin's 1-step
+    forecast is one batched Kalman filter pass over its estimation window.
+    Returns level forecasts, one column per series, indexed by the test dates.
     """
-    history = list(train_y_level.values)
-    preds = []
+    refit_every = CFG.arima_refit_every if refit_every is None else refit_every
+    if refit_every < 0:
+        raise ValueError("refit_every must be >= 0.")
+    window, window_size = estimation_window(window, window_size, window_halflife)
+    p, _, q = order
+
+    y = levels.to_numpy(dtype=float).T
+    dy = np.diff(y, axis=1)
+    n_test = y.shape[1] - n_train
+    preds = np.empty((n_test, y.shape[0]))
+    for t in range(n_test):
+        end = n_train + t
+        start = window_start(end, window, window_size)
+        if t == 0 or (refit_every > 0 and t % refit_every == 0):
+            fit = fit_arima_batched(levels.iloc[start:end], order)
+            ar = fit[[f"ar.L{i}" for i in range(1, p + 1)]].to_numpy()
+            ma = fit[[f"ma.L{i}" for i in range(1, q + 1)]].to_numpy()
+        # diffs of the levels start..end-1
+        _, _, next_diff = _arma_concentrated_llf(dy[:, start : end - 1], ar, ma)
+        preds[t] = y[:, end - 1] + next_diff
+    return pd.DataFrame(preds, index=levels.index[n_train:], columns=levels.columns)
+
+def _arima_fit_block(task) -> list[tuple[float, float]]:
+    """
+    Fit ARIMA once on the history before a block of origins, then filter
+    through the block: each later origin costs one Kalman update via
+    `extend` instead of a new MLE. Returns (forecast, seconds) per origin.
+    """
+    history, block_obs, order = task
+    out = []
+
+    start = time.perf_counter()
+    res = fit_arima(history, order)
+    for j, obs in enumerate(block_obs):
+        if j > 0:
+            start = time.perf_counter()
+            res = res.extend(block_obs[j - 1 : j])
+        out.append((float(res.forecast()[0]), time.perf_counter() - start))
+
+    return out
 
-    for t in range(len(test_y_level)):
-        model = ARIMA(history, order=order).fit()
-        preds.append(float(model.forecast()[0]))
-        history.append(float(test_y_level.iloc[t]))
+def forecast_arima_recursive(
+    train_y_level: pd.Series,
+    test_y_level: pd.Series,
+    order,
+    refit_every: int | None = None,
+    backend: str | None = None,
+    max_workers: int | None = None,
+    checkpoint=None,
+    window: str | None = None,
+    window_size: int | None = None,
+    window_halflife: float | None = None,
+) -> pd.Series:
+    """
+    Recursive 1-step forecast in levels.
+
+    refit_every=1 re-estimates ARIMA at every origin (full refit). With k > 1
+    parameters are re-estimated every k origins and the observations in
+    between are pushed through the fitted state space; k=0 estimates once on
+    the training sample. Blocks are independent and run on the backtest backend.
+    Per-origin wall times are kept in `result.attrs["step_seconds"]`.
+    Blocks already in the `checkpoint` log (see run_backtest) are not refitted.
+
+    Each estimation sees the history allowed by the window policy, as a
+    view of the full series: all of it ("expanding") or the last
+    `window_size` observations ("rolling"). ARIMA's likelihood takes no
+    observation weights, so "exponential" uses a rolling window of the
+    effective sample size of the weights, 1 / (1 - forgetting factor).
+    """
+    refit_every = CFG.arima_refit_every if refit_every is None else refit_every
+    if refit_every < 0:
+        raise ValueError("refit_every must be >= 0.")
+    window, window_size = estimation_window(window, window_size, window_halflife)
+
+    y_all = np.concatenate([train_y_level.values, test_y_level.values]).astype(float)
+    n_train = len(train_y_level)
+    n_test = len(test_y_level)
+    block = n_test if refit_every == 0 else refit_every
+
+    tasks = [
+        (y_all[window_start(n_train + t0, window, window_size) : n_train + t0],
+         y_all[n_train + t0 : n_train + min(t0 + block, n_test)], order)
+        for t0 in range(0, n_test, max(block, 1))
+    ]
+    blocks = run_backtest(_arima_fit_block, tasks, backend=backend, max_workers=max_workers, checkpoint=checkpoint)
+    steps = [step for b in blocks for step in b]
+
+    out = pd.Series([p for p, _ in steps], index=test_y_level.index, name="arima_forecast")
+    out.attrs["step_seconds"] = [sec for _, sec in steps]
+    return out
+
+def arima_refit_tradeoff(
+    train_y_level: pd.Series,
+    test_y_level: pd.Series,
+    order,
+    refit_every=(1, 4, 0),
+    backend: str | None = None,
+    max_workers: int | None = None,
+    window: str | None = None,
+    window_size: int | None = None,
+    window_halflife: float | None = None,
+    checkpoint=None,
+) -> pd.DataFrame:
+    """
+    Run forecast_arima_recursive for each refit interval and report per-step
+    timing plus RMSE drift against the full-refit (k=1) forecasts. Blocks in
+    the `checkpoint` log are reused, e.g. the main k=1 backtest's.
+    """
+    ks = [1] + [k for k in refit_every if k != 1]
+    rows = []
+    full = None
+    for k in ks:
+        fc = forecast_arima_recursive(
+            train_y_level, test_y_level, order, refit_every=k, backend=backend, max_workers=max_workers,
+            window=window, window_size=window_size, window_halflife=window_halflife, checkpoint=checkpoint,
+        )
+        step_seconds = np.asarray(fc.attrs["step_seconds"])
+        if full is None:
+            full = fc
+        rows.append({
+            "refit_every": k,
+            "total_seconds": float(step_seconds.sum()),
+            "mean_step_seconds": float(step_seconds.mean()),
+            "max_step_seconds": float(step_seconds.max()),
+            "rmse": float(np.sqrt(np.mean((test_y_level.values - fc.values) ** 2))),
+            "rmse_vs_full_refit": float(np.sqrt(np.mean((full.values - fc.values) ** 2))),
+        })
 
-    return pd.Series(preds, index=test_y_level.index, name="arima_forecast")
+    table = pd.DataFrame(rows)
+    table["rmse_drift"] = table["rmse"] - table.loc[0, "rmse"]
+    return table
@@ -1,7 +1,11 @@
 from __future__ import annotations
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.neural_network import MLPRegressor
+
+from .nn import _nn_fit_predict
+from ..backtest import run_backtest
+from ..features import lagged_design
+from ..buffers import HistoryBuffer
+from ..scaling import StreamingStandardizer
 
 def bonus_trim_fill_dataset(
     df_master: pd.DataFrame,
@@ -19,25 +23,14 @@ def bonus_trim_fill_dataset(
     return df_b
 
 def bonus_features(df_b: pd.DataFrame, target_col: str, cols_to_use: list[str], lags: int = 4) -> tuple[pd.DataFrame, pd.Series]:
-    df_b = df_b.copy()
-    df_b["dy"] = df_b[target_col].diff()
-
-    data_b = pd.DataFrame(index=df_b.index)
-    data_b["target_diff"] = df_b["dy"]
+    dy = df_b[target_col].diff()
 
-    for l in range(1, lags + 1):
-        data_b[f"dy_lag{l}"] = df_b["dy"].shift(l)
-        for c in cols_to_use:
-            if df_b[c].mean() > 50:
-                feat = df_b[c].diff().shift(l)
-            else:
-                feat = df_b[c].shift(l)
-            data_b[f"{c}_lag{l}"] = feat
+    # predictors in levels above 50 enter as diffs
+    trans = {"dy": dy}
+    for c in cols_to_use:
+        trans[c] = df_b[c].diff() if df_b[c].mean() > 50 else df_b[c]
 
-    data_b = data_b.dropna()
-    X_b = data_b.drop(columns=["target_diff"])
-    y_b = data_b["target_diff"]
-    return X_b, y_b
+    return lagged_design(pd.DataFrame(trans, index=df_b.index), dy.rename("target_diff"), lags)
 
 def bonus_forecast_nn_recursive(
     X_tr: pd.DataFrame,
@@ -46,25 +39,21 @@ def bonus_forecast_nn_recursive(
     y_all: pd.Series,
     b_params: dict,
     random_state: int,
+    dtype=None,
+    backend: str | None = None,
+    max_workers: int | None = None,
 ) -> list[float]:
-    preds = []
-    history_X = X_tr.copy()
-    history_y = y_tr.copy()
-
-    for date in X_te.index:
-        scaler = StandardScaler()
-        h_X_scaled = scaler.fit_transform(history_X)
-
-        model = MLPRegressor(**b_params, max_iter=3000, random_state=random_state)
-        model.fit(h_X_scaled, history_y)
+    history = HistoryBuffer.from_frame(X_tr, y_tr, capacity=len(X_tr) + len(X_te), dtype=dtype)
+    X_curr = X_te.to_numpy(dtype=history.dtype)
 
-        curr = X_te.loc[[date]]
-        curr_sc = scaler.transform(curr)
-        pred = float(model.predict(curr_sc)[0])
-        preds.append(pred)
+    scaler = StreamingStandardizer().fit(history.X)
 
+    tasks = []
+    for i, date in enumerate(X_te.index):
+        tasks.append((history.X, history.y, X_curr[i : i + 1], scaler.snapshot(), b_params, 3000, random_state, None))
+        # test rows join the history only once their target is realized
         if date in y_all.index:
-            history_X = pd.concat([history_X, curr])
-            history_y = pd.concat([history_y, y_all.loc[[date]]])
+            history.append(X_curr[i], y_all.loc[date], date)
+            scaler.update(X_curr[i])
 
-    return preds
+    return run_backtest(_nn_fit_predict, tasks, backend=backend, max_workers=max_workers)
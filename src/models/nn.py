@@ -1,40 +1,187 @@
 from __future__ import annotations
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
 from sklearn.neural_network import MLPRegressor
 from sklearn.model_selection import TimeSeriesSplit, GridSearchCV
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
 
 import warnings
 from sklearn.exceptions import ConvergenceWarning
+from threadpoolctl import threadpool_limits
 warnings.filterwarnings("ignore", category=ConvergenceWarning)
 
-def select_nn_params(X_train: pd.DataFrame, y_train: pd.Series, random_state: int) -> dict:
-    """
-    Grid search on training set with time-series CV.
-    Returns best_params dict.
-    """
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
+from ..backtest import exponential_weights, resolve_window, run_backtest, window_start
+from ..buffers import HistoryBuffer
+from ..config import CFG
+from ..scaling import StreamingStandardizer
+from ..telemetry import TRACER
 
-    param_grid = {
+PARAM_GRIDS = {
+    "default": {
         "hidden_layer_sizes": [(5,), (10,)],
         "activation": ["relu", "tanh"],
         "alpha": [0.01],
         "learning_rate_init": [0.005, 0.01],
-    }
+    },
+    # wider grid, meant for the budgeted (successive-halving) search
+    "wide": {
+        "hidden_layer_sizes": [(3,), (5,), (10,), (20,), (5, 5), (10, 5)],
+        "activation": ["relu", "tanh"],
+        "alpha": [0.0001, 0.001, 0.01, 0.1],
+        "learning_rate_init": [0.001, 0.005, 0.01],
+    },
+}
 
-    mlp = MLPRegressor(max_iter=3000, random_state=random_state)
+def search_nn_params(
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    random_state: int,
+    method: str = "grid",
+    grid: str = "default",
+    min_iter: int = 100,
+    max_iter: int = 3000,
+    factor: int = 2,
+    n_jobs: int | None = -1,
+) -> tuple[dict, pd.DataFrame]:
+    """
+    Hyperparameter search on the training set with time-series CV
+    (TimeSeriesSplit, 3 folds).
+
+    method="grid" trains every candidate with max_iter iterations.
+    method="halving" runs successive halving on the iteration budget: all
+    candidates start with min_iter iterations, the best 1/factor survive
+    each round and get factor times more iterations, up to max_iter.
+    Returns best_params and the search trace (one row per candidate and round).
+    """
+    scaler = StreamingStandardizer()
+    X_train_scaled = scaler.fit_transform(X_train)
+
+    param_grid = PARAM_GRIDS[grid]
     tscv = TimeSeriesSplit(n_splits=3)
 
-    grid = GridSearchCV(
-        mlp,
-        param_grid,
-        cv=tscv,
-        scoring="neg_mean_squared_error",
-        n_jobs=-1
-    )
-    grid.fit(X_train_scaled, y_train)
-    return dict(grid.best_params_)
+    if method == "grid":
+        search = GridSearchCV(
+            MLPRegressor(max_iter=max_iter, random_state=random_state),
+            param_grid,
+            cv=tscv,
+            scoring="neg_mean_squared_error",
+            n_jobs=n_jobs
+        )
+    elif method == "halving":
+        search = HalvingGridSearchCV(
+            MLPRegressor(random_state=random_state),
+            param_grid,
+            cv=tscv,
+            scoring="neg_mean_squared_error",
+            resource="max_iter",
+            min_resources=min_iter,
+            max_resources=max_iter,
+            factor=factor,
+            aggressive_elimination=True,
+            refit=False,
+            n_jobs=n_jobs,
+        )
+    else:
+        raise ValueError(f"Unknown NN search method {method!r}; expected 'grid' or 'halving'.")
+
+    search.fit(X_train_scaled, y_train)
+
+    results = pd.DataFrame(search.cv_results_)
+    # CV fits run in joblib workers; count them here (plus the grid search's final refit)
+    TRACER.count("fits", len(results) * tscv.n_splits + (method == "grid"))
+    trace = pd.DataFrame({
+        "round": results["iter"] if "iter" in results else 0,
+        "max_iter": results["n_resources"] if "n_resources" in results else max_iter,
+        "params": results["params"].map(lambda p: {k: v for k, v in p.items() if k != "max_iter"}),
+        "mean_test_score": results["mean_test_score"],
+        "mean_fit_time": results["mean_fit_time"],
+    })
+    best_params = {k: v for k, v in search.best_params_.items() if k != "max_iter"}
+    return best_params, trace
+
+def select_nn_params(X_train: pd.DataFrame, y_train: pd.Series, random_state: int) -> dict:
+    """
+    Grid search on training set with time-series CV.
+    Returns best_params dict.
+    """
+    best_params, _ = search_nn_params(X_train, y_train, random_state)
+    return best_params
+
+def _nn_fit_predict(task) -> float:
+    """
+    Standardize one origin's history with the scaler statistics of that
+    history, fit the MLP and predict the next diff.
+    """
+    hist_X, hist_y, curr_X, scaler_rec, params, max_iter, random_state, sample_weight = task
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+
+    hist_X_scaled = scaler_rec.transform(hist_X)
+
+    model = MLPRegressor(**params, max_iter=max_iter, random_state=random_state)
+    model.fit(hist_X_scaled, hist_y, sample_weight=sample_weight)
+    TRACER.count("fits")
+
+    curr_X_scaled = scaler_rec.transform(curr_X)
+    return float(model.predict(curr_X_scaled)[0])
+
+def _windowed_history(history: HistoryBuffer, X_new, y_new, new_dates, window: str, size: int, halflife: float):
+    """
+    For each origin yield zero-copy views of the history rows its fit uses
+    under the window policy, the streaming scaler fitted on exactly those
+    rows (advanced, and for rolling windows downdated, in O(features) per
+    step; exponential weighting keeps the expanding scaler) and the sample
+    weights (None unless exponential). The origin's realized row joins the
+    history after the consumer is done with it.
+    """
+    scaler_rec = StreamingStandardizer().fit(history.X[window_start(len(history), window, size):])
+    for i in range(len(X_new)):
+        start = window_start(len(history), window, size)
+        weights = exponential_weights(len(history), halflife) if window == "exponential" else None
+        yield history.X[start:], history.y[start:], scaler_rec, weights
+
+        history.append(X_new[i], y_new[i], new_dates[i])
+        scaler_rec.update(X_new[i])
+        if window == "rolling" and len(history) > size:
+            scaler_rec.downdate(history.X[len(history) - size - 1])
+
+def _nn_warm_recursive(
+    history: HistoryBuffer,
+    X_new: np.ndarray,
+    y_new: np.ndarray,
+    new_dates,
+    params: dict,
+    random_state: int,
+    warm_max_iter: int,
+    full_retrain_every: int,
+    window: tuple = ("expanding", 0, 1.0),
+) -> list[float]:
+    """
+    Sequential warm-start loop: the first origin (and every
+    `full_retrain_every`-th origin, if > 0) trains from random init; the
+    others continue from the previous weights for at most `warm_max_iter`
+    epochs on the grown history.
+    """
+    preds = []
+    model = None
+    windows = _windowed_history(history, X_new, y_new, new_dates, *window)
+    for i, (hist_X, hist_y, scaler_rec, weights) in enumerate(windows):
+        hist_X_scaled = scaler_rec.transform(hist_X)
+
+        cold = model is None or (full_retrain_every > 0 and i % full_retrain_every == 0)
+        with TRACER.span("nn_warm_step", cat="fit", cold=cold):
+            if cold:
+                model = MLPRegressor(**params, max_iter=5000, random_state=random_state)
+            else:
+                model.set_params(warm_start=True, max_iter=warm_max_iter)
+            model.fit(hist_X_scaled, hist_y, sample_weight=weights)
+            TRACER.count("fits")
+
+        curr_X_scaled = scaler_rec.transform(X_new[i : i + 1])
+        preds.append(float(model.predict(curr_X_scaled)[0]))
+
+    return preds
 
 def forecast_nn_recursive(
     X_train_init: pd.DataFrame,
@@ -42,31 +189,150 @@ def forecast_nn_recursive(
     X_test: pd.DataFrame,
     y_test: pd.Series,
     best_params: dict,
-    random_state: int
+    random_state: int,
+    mode: str | None = None,
+    warm_max_iter: int | None = None,
+    full_retrain_every: int | None = None,
+    dtype=None,
+    backend: str | None = None,
+    max_workers: int | None = None,
+    checkpoint=None,
+    window: str | None = None,
+    window_size: int | None = None,
+    window_halflife: float | None = None,
 ) -> list[float]:
     """
     Recursive 1-step ahead forecasts for diffs with re-estimation each step.
-    Standardize each step using only history.
+    Standardize each step using only history (streaming scaler, O(features) per step).
+    mode="refit" trains a fresh MLP per origin (independent tasks on the
+    backtest backend); mode="warm" carries the weights forward and
+    fine-tunes them, which is sequential by construction.
+    In refit mode `checkpoint` lets run_backtest log finished origins and
+    resume from them; warm mode carries weights and always runs in full.
+    Each fit sees the history allowed by the window policy (see
+    `_windowed_history`); "exponential" down-weights old rows through the
+    MLP's sample weights.
     Returns list of predicted diffs.
     """
-    preds_diff = []
-    history_X = X_train_init.copy()
-    history_y = y_train_init.copy()
+    mode = CFG.nn_mode if mode is None else mode
+    warm_max_iter = CFG.nn_warm_max_iter if warm_max_iter is None else warm_max_iter
+    full_retrain_every = CFG.nn_full_retrain_every if full_retrain_every is None else full_retrain_every
+    window = resolve_window(window, window_size, window_halflife)
+
+    history = HistoryBuffer.from_frame(
+        X_train_init, y_train_init, capacity=len(X_train_init) + len(X_test), dtype=dtype
+    )
+    X_new = X_test.to_numpy(dtype=history.dtype)
+    y_new = y_test.to_numpy(dtype=history.dtype)
+
+    if mode == "warm":
+        return _nn_warm_recursive(
+            history, X_new, y_new, X_test.index, best_params, random_state,
+            warm_max_iter=warm_max_iter, full_retrain_every=full_retrain_every, window=window,
+        )
+    if mode != "refit":
+        raise ValueError(f"Unknown NN mode {mode!r}; expected 'refit' or 'warm'.")
+
+    # each task gets zero-copy views of the history before its origin (no
+    # peeking) and a snapshot of the streaming scaler fitted on exactly that history
+    tasks = []
+    windows = _windowed_history(history, X_new, y_new, X_test.index, *window)
+    for i, (hist_X, hist_y, scaler_rec, weights) in enumerate(windows):
+        tasks.append((hist_X, hist_y, X_new[i : i + 1], scaler_rec.snapshot(),
+                      best_params, 5000, random_state, weights))
+
+    return run_backtest(_nn_fit_predict, tasks, backend=backend, max_workers=max_workers, checkpoint=checkpoint)
+
+def _nn_shared_fit_predict(task) -> float:
+    """
+    `_nn_fit_predict` for one (origin, seed) whose history rows [start, end)
+    and current row `end` are read from the shared [X | y] matrix instead
+    of being pickled into the task.
+    """
+    shared, start, end, scaler_rec, params, max_iter, random_state, halflife = task
+    shm = SharedMemory(name=shared["name"])
+    try:
+        data = np.ndarray(shared["shape"], dtype=shared["dtype"], buffer=shm.buf)
+        X, y = data[:, :-1], data[:, -1]
+        weights = None if halflife is None else exponential_weights(end - start, halflife)
+        # one BLAS thread per fit: the parallelism is across (origin, seed) tasks
+        with threadpool_limits(limits=1):
+            return _nn_fit_predict((X[start:end], y[start:end], X[end : end + 1], scaler_rec,
+                                    params, max_iter, random_state, weights))
+    finally:
+        data = X = y = None
+        try:
+            shm.close()
+        except BufferError:
+            # a traceback still holds views into the block; the mapping is freed with it
+            pass
+
+def forecast_nn_ensemble(
+    X_train_init: pd.DataFrame,
+    y_train_init: pd.Series,
+    X_test: pd.DataFrame,
+    y_test: pd.Series,
+    best_params: dict,
+    seeds,
+    dtype=None,
+    backend: str = "process",
+    max_workers: int | None = None,
+    window: str | None = None,
+    window_size: int | None = None,
+    window_halflife: float | None = None,
+) -> pd.DataFrame:
+    """
+    Refit-mode recursive forecasts averaged over several MLP seeds.
 
-    for i in range(len(X_test)):
-        scaler_rec = StandardScaler()
-        hist_X_scaled = scaler_rec.fit_transform(history_X)
+    The training and test rows are copied once into a shared-memory
+    [X | y] matrix; each (origin, seed) fit is a task on the backtest
+    backend that carries only its row range, the scaler snapshot and the
+    seed, and workers read their history from the shared block, so K seeds
+    cost K times the fits but not K pickled copies of the history. `seeds`
+    is a list of random states. Returns predicted diffs per origin: the
+    seed mean ("mean"), their standard deviation ("std") and one column
+    per seed. Tasks name a temporary shared block, so there is no
+    checkpointing.
+    """
+    seeds = list(seeds)
+    if not seeds:
+        raise ValueError("seeds must not be empty.")
+    window = resolve_window(window, window_size, window_halflife)
+
+    history = HistoryBuffer.from_frame(
+        X_train_init, y_train_init, capacity=len(X_train_init) + len(X_test), dtype=dtype
+    )
+    X_new = X_test.to_numpy(dtype=history.dtype)
+    y_new = y_test.to_numpy(dtype=history.dtype)
+    n_train = len(history)
+    shape = (n_train + len(X_new), history.X.shape[1] + 1)
 
-        model = MLPRegressor(**best_params, max_iter=5000, random_state=random_state)
-        model.fit(hist_X_scaled, history_y)
+    shm = SharedMemory(create=True, size=max(int(np.prod(shape)) * history.dtype.itemsize, 1))
+    shared_rows = None
+    try:
+        shared_rows = np.ndarray(shape, dtype=history.dtype, buffer=shm.buf)
+        shared_rows[:n_train, :-1], shared_rows[:n_train, -1] = history.X, history.y
+        shared_rows[n_train:, :-1], shared_rows[n_train:, -1] = X_new, y_new
+        shared = {"name": shm.name, "shape": shape, "dtype": history.dtype.str}
+        halflife = window[2] if window[0] == "exponential" else None
 
-        curr_X = X_test.iloc[[i]]
-        curr_X_scaled = scaler_rec.transform(curr_X)
-        pred = float(model.predict(curr_X_scaled)[0])
-        preds_diff.append(pred)
+        tasks = []
+        windows = _windowed_history(history, X_new, y_new, X_test.index, *window)
+        for i, (hist_X, _, scaler_rec, _) in enumerate(windows):
+            end = n_train + i
+            snapshot = scaler_rec.snapshot()
+            tasks.extend((shared, end - len(hist_X), end, snapshot, best_params, 5000, seed, halflife)
+                         for seed in seeds)
 
-        # update with realized diff (no peeking beyond current)
-        history_X = pd.concat([history_X, curr_X])
-        history_y = pd.concat([history_y, y_test.iloc[[i]]])
+        preds = run_backtest(_nn_shared_fit_predict, tasks, backend=backend, max_workers=max_workers,
+                             checkpoint=False)
+    finally:
+        shared_rows = None
+        shm.close()
+        shm.unlink()
 
-    return preds_diff
+    per_seed = np.asarray(preds, dtype=float).reshape(len(X_new), len(seeds))
+    out = pd.DataFrame(per_seed, index=X_test.index, columns=[f"seed_{seed}" for seed in seeds])
+    out.insert(0, "std", per_seed.std(axis=1, ddof=1) if len(seeds) > 1 else 0.0)
+    out.insert(0, "mean", per_seed.mean(axis=1))
+    return out
@@ -1,48 +1,302 @@
 from __future__ import annotations
+from collections import deque
+import numpy as np
 import pandas as pd
-from statsmodels.tsa.api import VAR
+from statsmodels.tsa.vector_ar.var_model import VAR
+
+from ..backtest import forgetting_factor, resolve_window, run_backtest, window_start
+from ..config import CFG
+from ..fitcache import FIT_CACHE
+
+def fit_var(diff_data: pd.DataFrame, lags: int):
+    """VAR(lags) fit on differenced data, memoized in the shared fit cache."""
+    return FIT_CACHE.get_or_fit(diff_data, "VAR", lags, lambda: VAR(diff_data).fit(lags))
 
 def select_var_lag(train_pair_level: pd.DataFrame, maxlags=8) -> int:
     """
     Select VAR lag using BIC on differenced training data.
+
+    As in statsmodels' `VAR.select_order`, every lag p is estimated on the
+    same sample (the first maxlags - p diffs are skipped), but through the
+    shared fit cache: the maxlags fit is the one the first backtest origin
+    makes when that lag is selected, and reruns reuse every persisted fit.
     """
     train_diff = train_pair_level.diff().dropna()
-    model_var = VAR(train_diff)
-    lag_selection = model_var.select_order(maxlags=maxlags)
-    selected_lag = lag_selection.selected_orders["bic"]
-    if selected_lag is None:
-        # fallback
-        selected_lag = 1
-    return int(selected_lag)
+    bic = [fit_var(train_diff.iloc[maxlags - p:], p).bic for p in range(maxlags + 1)]
+    return int(np.nanargmin(bic))
+
+class RecursiveVAR:
+    """
+    VAR(p) with constant, estimated by OLS on the lag-stacked design
+    z_t = [1, y_{t-1}, ..., y_{t-p}] and kept up to date with rank-one
+    (Sherman-Morrison) updates, so adding an observation costs O((1+kp)^2)
+    regardless of history length. Coefficients are laid out like
+    statsmodels' `VARResults.params` (const, L1.*, L2.*, ...).
+
+    With `window` set, the oldest design row is downdated whenever the
+    window is full, giving rolling-window OLS instead of expanding. With
+    `forgetting` < 1 every earlier row is down-weighted by that factor per
+    step (exponentially weighted least squares, also in the initial fit).
+    """
+
+    def __init__(self, lags: int, window: int | None = None, forgetting: float = 1.0):
+        if lags < 1:
+            raise ValueError("lags must be >= 1.")
+        if window is not None and window <= lags:
+            raise ValueError("window must be larger than lags.")
+        if not 0.0 < forgetting <= 1.0:
+            raise ValueError("forgetting must be in (0, 1].")
+        if window is not None and forgetting < 1.0:
+            raise ValueError("use either a rolling window or a forgetting factor, not both.")
+        self.lags = lags
+        self.window = window
+        self.forgetting = forgetting
+
+    def _design_row(self, recent: np.ndarray) -> np.ndarray:
+        # recent holds the last `lags` observations, oldest first
+        return np.concatenate([[1.0], recent[::-1].ravel()])
+
+    def fit(self, y: np.ndarray) -> "RecursiveVAR":
+        """Batch OLS on the initial sample (rows = time, columns = variables)."""
+        y = np.asarray(y, dtype=float)
+        if self.window is not None:
+            y = y[-(self.window + self.lags):]
+        p = self.lags
+        n_obs, self.k = y.shape
+        if n_obs - p < 1 + self.k * p:
+            raise ValueError("Not enough observations to estimate the VAR.")
+
+        Z = np.hstack([np.ones((n_obs - p, 1))] + [y[p - l : n_obs - l] for l in range(1, p + 1)])
+        Y = y[p:]
+        w = self.forgetting ** np.arange(len(Y) - 1, -1, -1, dtype=float)
+        self.P_ = np.linalg.inv((Z * w[:, None]).T @ Z)
+        self.params_ = self.P_ @ (Z * w[:, None]).T @ Y
+
+        self._recent = deque(y[-p:], maxlen=p)
+        self._rows = deque(zip(Z, Y)) if self.window is not None else None
+        return self
+
+    def _rank_one(self, z: np.ndarray, y: np.ndarray, sign: float, lam: float = 1.0) -> None:
+        # P = (lam * Z'WZ + sign * z z')^-1 via Sherman-Morrison
+        Pz = self.P_ @ z
+        gain = Pz / (lam + sign * (z @ Pz))
+        self.params_ += sign * np.outer(gain, y - z @ self.params_)
+        self.P_ = (self.P_ - sign * np.outer(gain, Pz)) / lam
+
+    def update(self, y_new: np.ndarray) -> None:
+        """Add one observation (and drop the oldest one when the window is full)."""
+        y_new = np.asarray(y_new, dtype=float)
+        z = self._design_row(np.asarray(self._recent))
+        self._rank_one(z, y_new, +1.0, self.forgetting)
+
+        if self._rows is not None:
+            self._rows.append((z, y_new))
+            if len(self._rows) > self.window:
+                z_old, y_old = self._rows.popleft()
+                self._rank_one(z_old, y_old, -1.0)
+
+        self._recent.append(y_new)
+
+    def forecast(self) -> np.ndarray:
+        """1-step-ahead forecast from the current state."""
+        return self._design_row(np.asarray(self._recent)) @ self.params_
+
+    def export_state(self) -> dict[str, np.ndarray]:
+        """Arrays that `restore_state` needs to continue updating (e.g. to save the model)."""
+        state = {"params": self.params_, "P": self.P_, "recent": np.asarray(self._recent)}
+        if self._rows is not None:
+            state["rows_z"] = np.array([z for z, _ in self._rows])
+            state["rows_y"] = np.array([y for _, y in self._rows])
+        return state
+
+    def restore_state(self, state: dict[str, np.ndarray]) -> "RecursiveVAR":
+        """Resume from `export_state()` output instead of fitting; lags, window and forgetting come from __init__."""
+        self.params_, self.P_ = np.array(state["params"], dtype=float), np.array(state["P"], dtype=float)
+        self.k = self.params_.shape[1]
+        self._recent = deque(np.array(state["recent"], dtype=float), maxlen=self.lags)
+        self._rows = None
+        if self.window is not None:
+            self._rows = deque(zip(np.array(state["rows_z"]), np.array(state["rows_y"])))
+        return self
+
+def _var_fit_predict(task) -> float:
+    """Fit VAR on one origin's differenced history and return the level forecast."""
+    diff_upto, selected_lag, target_pos, prev_val, forgetting = task
+    if forgetting < 1.0:
+        # statsmodels' VAR takes no observation weights: weighted least squares directly
+        fc_diff = RecursiveVAR(selected_lag, forgetting=forgetting).fit(diff_upto).forecast()
+    else:
+        res = fit_var(diff_upto, selected_lag)
+        fc_diff = res.forecast(diff_upto.values[-selected_lag:], steps=1)[0]
+    return prev_val + float(fc_diff[target_pos])
+
+def forecast_var_rls(
+    df_pair_level: pd.DataFrame,
+    test_idx: pd.Index,
+    selected_lag: int,
+    target_col: str,
+    window: int | None = None,
+    forgetting: float = 1.0,
+) -> pd.Series:
+    """
+    Recursive 1-step VAR forecasts on diffs using RecursiveVAR: the model is
+    estimated once on the diffs before the first origin and then updated with
+    one rank-one step per realized diff, so the backtest is linear in length.
+    `window` (rolling) and `forgetting` (exponential) are passed to RecursiveVAR.
+    """
+    levels = df_pair_level.to_numpy(dtype=float)
+    diffs = np.diff(levels, axis=0)  # diffs[i] = level[i+1] - level[i]
+    target_pos = list(df_pair_level.columns).index(target_col)
+    positions = df_pair_level.index.get_indexer(test_idx)
+
+    # origin at level position p uses diffs[: p - 1] (data up to p-1)
+    n_seen = positions[0] - 1
+    model = RecursiveVAR(selected_lag, window=window, forgetting=forgetting).fit(diffs[:n_seen])
+
+    preds = []
+    for pos in positions:
+        while n_seen < pos - 1:
+            model.update(diffs[n_seen])
+            n_seen += 1
+        preds.append(levels[pos - 1, target_pos] + float(model.forecast()[target_pos]))
+
+    return pd.Series(preds, index=test_idx, name="var_forecast")
 
 def forecast_var_recursive(
     df_pair_level: pd.DataFrame,
     train_end,
     test_idx: pd.Index,
     selected_lag: int,
-    target_col: str
+    target_col: str,
+    method: str | None = None,
+    backend: str | None = None,
+    max_workers: int | None = None,
+    checkpoint=None,
+    window: str | None = None,
+    window_size: int | None = None,
+    window_halflife: float | None = None,
 ) -> pd.Series:
     """
     Recursive 1-step forecast in levels via VAR on diffs, then reconstruct target level.
+    method="ols" refits statsmodels' VAR at every origin; method="rls" uses
+    the recursive least-squares engine (same OLS coefficients, O(1) per step).
+    The window policy picks the diffs each fit sees: all of them, the last
+    `window_size` (a view of the diffs, computed once) or all of them
+    exponentially down-weighted with half-life `window_halflife`.
     """
-    preds = []
+    method = CFG.var_method if method is None else method
+    window, window_size, window_halflife = resolve_window(window, window_size, window_halflife)
+    forgetting = forgetting_factor(window_halflife) if window == "exponential" else 1.0
+    if method == "rls":
+        # a window of `window_size` diffs holds window_size - lags design rows
+        return forecast_var_rls(df_pair_level.dropna(), test_idx, selected_lag, target_col,
+                                window=window_size - selected_lag if window == "rolling" else None,
+                                forgetting=forgetting)
+    if method != "ols":
+        raise ValueError(f"Unknown VAR method {method!r}; expected 'ols' or 'rls'.")
+
+    pair = df_pair_level.dropna()
+    diffs = pair.diff().iloc[1:]
+    target_pos = list(pair.columns).index(target_col)
+    levels = pair[target_col].to_numpy(dtype=float)
 
+    tasks = []
     for dt in test_idx:
-        prev_dt_idx = df_pair_level.index.get_loc(dt) - 1
-        prev_dt = df_pair_level.index[prev_dt_idx]
+        # diffs up to the origin's previous date: pair rows 0..pos-1 give diff rows 0..pos-2
+        pos = pair.index.get_loc(dt)
+        end = pos - 1
+        diff_upto = diffs.iloc[window_start(end, window, window_size) : end]
+        tasks.append((diff_upto, selected_lag, target_pos, float(levels[pos - 1]), forgetting))
 
-        pair_upto = df_pair_level.loc[:prev_dt].dropna()
-        diff_upto = pair_upto.diff().dropna()
+    preds = run_backtest(_var_fit_predict, tasks, backend=backend, max_workers=max_workers, checkpoint=checkpoint)
 
-        model = VAR(diff_upto)
-        res = model.fit(selected_lag)
+    return pd.Series(preds, index=test_idx, name="var_forecast")
 
-        fc_diff = res.forecast(diff_upto.values[-selected_lag:], steps=1)[0]
+def _as_panel(panels) -> np.ndarray:
+    """Stack aligned (T, k) frames/arrays into an (N, T, k) float array."""
+    if isinstance(panels, np.ndarray):
+        return np.asarray(panels, dtype=float)
+    return np.stack([np.asarray(p, dtype=float) for p in panels])
+
+def fit_var_batched(diff_panel, lags: int, offset: int = 0) -> dict:
+    """
+    OLS VAR(lags) with constant for N aligned systems at once.
 
-        target_pos = list(diff_upto.columns).index(target_col)
-        prev_val = float(pair_upto.loc[prev_dt, target_col])
-        yhat = prev_val + float(fc_diff[target_pos])
+    `diff_panel` is (N, T, k) (or a list of N equally shaped frames) of
+    differenced data; the first `offset` rows are skipped, as in statsmodels'
+    lag-order selection. The normal equations of all systems are solved as
+    one stacked `np.linalg.solve`. Returns params (N, 1 + k*lags, k) laid
+    out like `VARResults.params`, sigma_u (df-corrected), sigma_u_mle, nobs
+    and the statsmodels information criteria (aic, bic, hqic) per system.
+    """
+    y = _as_panel(diff_panel)[:, offset:]
+    n, T, k = y.shape
+    nobs = T - lags
+    if nobs - (1 + k * lags) < 1:
+        raise ValueError("Not enough observations to estimate the VAR.")
 
-        preds.append(yhat)
+    Z = np.concatenate([np.ones((n, nobs, 1))] + [y[:, lags - l : T - l] for l in range(1, lags + 1)], axis=2)
+    Y = y[:, lags:]
+    Zt = Z.transpose(0, 2, 1)
+    params = np.linalg.solve(Zt @ Z, Zt @ Y)
+    resid = Y - Z @ params
+    sse = resid.transpose(0, 2, 1) @ resid
+    df_resid = nobs - (k * lags + 1)
 
-    return pd.Series(preds, index=test_idx, name="var_forecast")
+    sigma_u_mle = sse / nobs
+    _, ld = np.linalg.slogdet(sigma_u_mle)
+    free_params = lags * k**2 + k
+    return {
+        "params": params,
+        "sigma_u": sse / df_resid,
+        "sigma_u_mle": sigma_u_mle,
+        "nobs": nobs,
+        "aic": ld + (2.0 / nobs) * free_params,
+        "bic": ld + (np.log(nobs) / nobs) * free_params,
+        "hqic": ld + (2.0 * np.log(np.log(nobs)) / nobs) * free_params,
+    }
+
+def select_var_lag_batched(train_levels, maxlags=8) -> tuple[np.ndarray, pd.DataFrame]:
+    """
+    `select_var_lag` for N aligned level systems at once: BIC over lags
+    0..maxlags on the differenced data, every lag estimated on the same
+    sample (the first maxlags - p diffs are skipped). Returns the selected
+    lag per system and the (N, maxlags + 1) BIC table.
+    """
+    diffs = np.diff(_as_panel(train_levels), axis=1)
+    bic = pd.DataFrame(
+        {p: fit_var_batched(diffs, p, offset=maxlags - p)["bic"] for p in range(maxlags + 1)}
+    )
+    return bic.to_numpy().argmin(axis=1), bic
+
+def forecast_var_batched(
+    pair_levels,
+    n_train: int,
+    lags: int,
+    target_pos: int = 0,
+    window: str | None = None,
+    window_size: int | None = None,
+) -> np.ndarray:
+    """
+    `forecast_var_recursive` (method="ols") for N aligned level systems
+    with the same lag: at every origin all systems are refitted with one
+    `fit_var_batched` call on their diffs up to the previous date (all of
+    them or the last `window_size` with window="rolling"). `pair_levels`
+    is (N, T, k) (or a list of N equally shaped frames) whose first
+    `n_train` rows are the training sample. Returns (T - n_train, N) level
+    forecasts of column `target_pos`.
+    """
+    window, window_size, _ = resolve_window(window, window_size)
+    if window == "exponential":
+        raise ValueError("forecast_var_batched has no observation weights; use forecast_var_recursive.")
+    levels = _as_panel(pair_levels)
+    diffs = np.diff(levels, axis=1)
+    n_test = levels.shape[1] - n_train
+    preds = np.empty((n_test, levels.shape[0]))
+    for t in range(n_test):
+        end = n_train + t - 1  # diffs of the levels up to the origin's previous date
+        start = window_start(end, window, window_size)
+        params = fit_var_batched(diffs[:, start:end], lags)["params"]
+        z = np.concatenate([np.ones((len(diffs), 1))] + [diffs[:, end - l] for l in range(1, lags + 1)], axis=1)
+        preds[t] = levels[:, end, target_pos] + np.einsum("nj,nj->n", z, params[:, :, target_pos])
+    return preds
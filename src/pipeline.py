@@ -1,165 +1,488 @@
 from __future__ import annotations
 
+import hashlib
+import importlib
 import json
+import time
 from pathlib import Path
 import pandas as pd
 import warnings
 
-from .report import build_report_from_outputs
-
-from .config import CFG
-from .io import load_excel, build_master, select_pair, train_test_split_index
+# model, plotting and report modules (sklearn, statsmodels, matplotlib,
+# jinja2) are imported inside the stages that use them, so a run that
+# only needs some models does not pay for the others at startup
+from .config import CFG, Config
+from .io import build_master, select_pair, train_test_split_index, required_columns, measure_load, data_fingerprint
 from .features import make_lag_features, split_features_target
 from .eval import reconstruct_levels_from_diffs, rmse
-from .plot import save_comparison_plot
+from .checkpoint import CheckpointDir
+from .stages import Stage, StageRunner
+from .fitcache import FIT_CACHE
+from .telemetry import TRACER
 
-from .models.nn import select_nn_params, forecast_nn_recursive
-from .models.arima import select_arima_order, forecast_arima_recursive
-from .models.var import select_var_lag, forecast_var_recursive
+warnings.filterwarnings("ignore", message=r".*instantiateVariableFont.*deprecated.*", category=UserWarning)
 
-from sklearn.exceptions import ConvergenceWarning
-from statsmodels.tools.sm_exceptions import ValueWarning
+MODELS = ("arima", "var", "nn")
 
-warnings.filterwarnings("ignore", category=ConvergenceWarning)
-warnings.filterwarnings("ignore", category=ValueWarning)
-warnings.filterwarnings("ignore", message=r".*instantiateVariableFont.*deprecated.*", category=UserWarning)
+def _ignore_warning(module: str, name: str) -> None:
+    """Silence a library warning class, importing the library only when its stage runs."""
+    warnings.filterwarnings("ignore", category=getattr(importlib.import_module(module), name))
+
+def ensure_outputs_dir(cfg: Config = CFG) -> Path:
+    cfg.outputs_dir.mkdir(parents=True, exist_ok=True)
+    return cfg.outputs_dir
+
+def _checkpoint_dir(cfg: Config, log_dir=None):
+    """
+    Where the backtests log finished origins (False = nowhere). A forecast
+    stage computed through the stage cache records them in its entry's
+    `log_dir` for `python -m src run --incremental`, and resumes from it
+    only with Config.backtest_checkpoint; without the stage cache they go
+    to outputs/checkpoints, and only with Config.backtest_checkpoint.
+    """
+    if log_dir is not None:
+        return CheckpointDir(Path(log_dir), resume=cfg.backtest_checkpoint)
+    return CheckpointDir(cfg.outputs_dir / "checkpoints") if cfg.backtest_checkpoint else False
+
+_WINDOW_FIELDS = ("window", "window_size", "window_halflife")
+
+def _window_kwargs(cfg: Config) -> dict:
+    """The estimation window policy every recursive forecaster follows."""
+    return {f: getattr(cfg, f) for f in _WINDOW_FIELDS}
+
+# ---------- Stages ----------
+
+def stage_data(cfg: Config) -> dict:
+    # only the configured target/predictor columns and rows up to analysis_end are read
+    (df_y, df_x), data_load = measure_load(
+        trace_memory=False,
+        path=cfg.data_path,
+        date_col=cfg.date_col,
+        use_cache=cfg.data_cache,
+        cache_dir=cfg.cache_dir,
+        columns=required_columns(cfg.target_col, cfg.x_col),
+        analysis_end=cfg.analysis_end,
+    )
+    df_master = build_master(df_y, df_x, cfg.date_col, cfg.target_col, cfg.analysis_end)
+    df_pair_level = select_pair(df_master, cfg.target_col, cfg.x_col)
+    split = train_test_split_index(df_pair_level, cfg.train_ratio)
+    return {"df_pair_level": df_pair_level, "split": split, "data_load": data_load}
+
+def stage_features(cfg: Config, data: dict) -> dict:
+    split = data["split"]
+    X_feat, y_target = make_lag_features(data["df_pair_level"], cfg.target_col, cfg.x_col, cfg.lags)
+    return split_features_target(
+        X_feat, y_target, cutoff_date=split["cutoff_date"], test_start=split["test_start"]
+    )
 
+def stage_nn_select(cfg: Config, features: dict) -> dict:
+    from .models.nn import search_nn_params
+    _ignore_warning("sklearn.exceptions", "ConvergenceWarning")
+    params, trace = search_nn_params(
+        features["X_train_init"], features["y_train_init"], random_state=cfg.random_state,
+        method=cfg.nn_search, grid=cfg.nn_search_grid, min_iter=cfg.nn_search_min_iter,
+        max_iter=cfg.nn_search_max_iter, factor=cfg.nn_search_factor, n_jobs=cfg.nn_search_n_jobs,
+    )
+    return {"params": params, "trace": trace}
+
+def stage_nn_forecast(cfg: Config, data: dict, features: dict, nn_select: dict, log_dir=None) -> dict:
+    from .models.nn import forecast_nn_ensemble, forecast_nn_recursive
+    _ignore_warning("sklearn.exceptions", "ConvergenceWarning")
+    df_pair_level = data["df_pair_level"]
+    nn_dates = features["X_test"].index
 
-def ensure_outputs_dir() -> Path:
-    CFG.outputs_dir.mkdir(parents=True, exist_ok=True)
-    return CFG.outputs_dir
+    if cfg.nn_ensemble_seeds > 1 and cfg.nn_mode != "refit":
+        raise ValueError("nn_ensemble_seeds > 1 needs nn_mode='refit'.")
 
-def run_all() -> dict:
-    outdir = ensure_outputs_dir()
+    def run_nn_mode(mode: str) -> dict:
+        start = time.perf_counter()
+        spread = None
+        if mode == "refit" and cfg.nn_ensemble_seeds > 1:
+            ensemble = forecast_nn_ensemble(
+                features["X_train_init"], features["y_train_init"], features["X_test"], features["y_test"],
+                nn_select["params"], seeds=range(cfg.random_state, cfg.random_state + cfg.nn_ensemble_seeds),
+                dtype=cfg.history_dtype, backend=cfg.nn_ensemble_backend, max_workers=cfg.nn_ensemble_workers,
+                **_window_kwargs(cfg),
+            )
+            # a level forecast is the last actual level plus the diff, so it has the diffs' spread
+            preds, spread = ensemble["mean"].to_numpy(), ensemble["std"]
+        else:
+            preds = forecast_nn_recursive(
+                features["X_train_init"], features["y_train_init"], features["X_test"], features["y_test"],
+                nn_select["params"], random_state=cfg.random_state, mode=mode,
+                warm_max_iter=cfg.nn_warm_max_iter, full_retrain_every=cfg.nn_full_retrain_every,
+                dtype=cfg.history_dtype, backend=cfg.backtest_backend, max_workers=cfg.backtest_workers,
+                checkpoint=_checkpoint_dir(cfg, log_dir), **_window_kwargs(cfg),
+            )
+        seconds = time.perf_counter() - start
+        level, actual = reconstruct_levels_from_diffs(df_pair_level, cfg.target_col, nn_dates, preds)
+        return {
+            "seconds": seconds,
+            "rmse": rmse(actual.values, level.values),
+            "forecast_level": level,
+            "forecast_spread": spread,
+            "actual_levels": actual,
+        }
 
-    # ---------- 0) Load data ----------
-    df_y, df_x = load_excel(CFG.data_path, CFG.date_col)
-    df_master = build_master(df_y, df_x)
-    df_pair_level = select_pair(df_master)
+    nn_runs = {cfg.nn_mode: run_nn_mode(cfg.nn_mode)}
+    if cfg.nn_compare_modes:
+        for mode in ("refit", "warm"):
+            if mode not in nn_runs:
+                nn_runs[mode] = run_nn_mode(mode)
 
-    split = train_test_split_index(df_pair_level)
-    cutoff_date = split["cutoff_date"]
-    test_start = split["test_start"]
-    test_end = split["test_end"]
-    test_idx = split["test_idx"]
+    nn_modes_meta = {}
+    for mode, run in nn_runs.items():
+        nn_modes_meta[mode] = {"seconds": run["seconds"], "rmse": run["rmse"]}
+        if "refit" in nn_runs:
+            nn_modes_meta[mode]["seconds_delta_vs_refit"] = run["seconds"] - nn_runs["refit"]["seconds"]
+            nn_modes_meta[mode]["rmse_delta_vs_refit"] = run["rmse"] - nn_runs["refit"]["rmse"]
 
-    # ---------- 1) Features for NN ----------
-    X_feat, y_target = make_lag_features(df_pair_level)
-    parts = split_features_target(X_feat, y_target, cutoff_date=cutoff_date, test_start=test_start)
+    chosen = nn_runs[cfg.nn_mode]
+    return {
+        "dates": nn_dates,
+        "forecast_level": chosen["forecast_level"],
+        "forecast_spread": chosen["forecast_spread"],
+        "actual_levels": chosen["actual_levels"],
+        "rmse": chosen["rmse"],
+        "modes": nn_modes_meta,
+    }
 
-    X_train_init = parts["X_train_init"]
-    y_train_init = parts["y_train_init"]
-    X_test = parts["X_test"]
-    y_test = parts["y_test"]
+def _arima_series(cfg: Config, data: dict) -> tuple[pd.Series, pd.Series]:
+    df_pair_level, split = data["df_pair_level"], data["split"]
+    train_y_level = df_pair_level.loc[:split["cutoff_date"], cfg.target_col]
+    test_y_level = df_pair_level.loc[split["test_start"]:, cfg.target_col]
+    return train_y_level, test_y_level
 
-    # ---------- 2) Neural Network ----------
-    best_params = select_nn_params(X_train_init, y_train_init, random_state=CFG.random_state)
-    preds_diff = forecast_nn_recursive(
-        X_train_init, y_train_init, X_test, y_test, best_params, random_state=CFG.random_state
+def stage_arima_select(cfg: Config, data: dict) -> dict:
+    from .models.arima import search_arima_order
+    _ignore_warning("statsmodels.tools.sm_exceptions", "ValueWarning")
+    train_y_level, _ = _arima_series(cfg, data)
+    order, ic_table = search_arima_order(
+        train_y_level, p_max=cfg.arima_p_max, q_max=cfg.arima_q_max, method=cfg.arima_search,
+        workers=cfg.arima_search_workers, timeout=cfg.arima_fit_timeout,
     )
+    return {"order": order, "ic_table": ic_table}
 
-    nn_dates = X_test.index
-    nn_forecast_level, actual_levels = reconstruct_levels_from_diffs(
-        df_pair_level, CFG.target_col, nn_dates, preds_diff
+def stage_arima_forecast(cfg: Config, data: dict, arima_select: dict, log_dir=None) -> dict:
+    from .models.arima import forecast_arima_recursive, arima_refit_tradeoff
+    _ignore_warning("statsmodels.tools.sm_exceptions", "ValueWarning")
+    train_y_level, test_y_level = _arima_series(cfg, data)
+    order = arima_select["order"]
+    arima_forecast = forecast_arima_recursive(
+        train_y_level, test_y_level, order, refit_every=cfg.arima_refit_every,
+        backend=cfg.backtest_backend, max_workers=cfg.backtest_workers, checkpoint=_checkpoint_dir(cfg, log_dir),
+        **_window_kwargs(cfg),
     )
-    rmse_nn = rmse(actual_levels.values, nn_forecast_level.values)
 
-    # ---------- 3) ARIMA benchmark ----------
-    train_y_level = df_pair_level.loc[:cutoff_date, CFG.target_col]
-    test_y_level = df_pair_level.loc[test_start:, CFG.target_col]
+    tradeoff = None
+    if cfg.arima_refit_tradeoff:
+        tradeoff = arima_refit_tradeoff(
+            train_y_level, test_y_level, order, refit_every=cfg.arima_refit_tradeoff,
+            backend=cfg.backtest_backend, max_workers=cfg.backtest_workers, checkpoint=_checkpoint_dir(cfg, log_dir),
+            **_window_kwargs(cfg),
+        )
 
-    best_order = select_arima_order(train_y_level, p_max=2, q_max=2)
-    arima_forecast = forecast_arima_recursive(train_y_level, test_y_level, best_order)
-    rmse_arima = rmse(test_y_level.values, arima_forecast.values)
+    return {
+        "forecast": arima_forecast,
+        "rmse": rmse(test_y_level.values, arima_forecast.values),
+        "mean_step_seconds": float(pd.Series(arima_forecast.attrs["step_seconds"]).mean()),
+        "tradeoff": tradeoff,
+    }
+
+def stage_var_select(cfg: Config, data: dict) -> int:
+    from .models.var import select_var_lag
+    _ignore_warning("statsmodels.tools.sm_exceptions", "ValueWarning")
+    train_pair = data["df_pair_level"].loc[:data["split"]["cutoff_date"]].dropna()
+    return select_var_lag(train_pair, maxlags=8)
 
-    # ---------- 4) VAR benchmark ----------
-    train_pair = df_pair_level.loc[:cutoff_date].dropna()
-    selected_lag = select_var_lag(train_pair, maxlags=8)
+def stage_var_forecast(cfg: Config, data: dict, var_select: int, log_dir=None) -> dict:
+    from .models.var import forecast_var_recursive
+    _ignore_warning("statsmodels.tools.sm_exceptions", "ValueWarning")
+    df_pair_level, split = data["df_pair_level"], data["split"]
     var_forecast = forecast_var_recursive(
         df_pair_level=df_pair_level,
-        train_end=cutoff_date,
-        test_idx=test_idx,
-        selected_lag=selected_lag,
-        target_col=CFG.target_col
+        train_end=split["cutoff_date"],
+        test_idx=split["test_idx"],
+        selected_lag=var_select,
+        target_col=cfg.target_col,
+        method=cfg.var_method,
+        backend=cfg.backtest_backend,
+        max_workers=cfg.backtest_workers,
+        checkpoint=_checkpoint_dir(cfg, log_dir),
+        **_window_kwargs(cfg),
     )
-    actual_var = df_pair_level.loc[test_idx, CFG.target_col]
-    rmse_var = rmse(actual_var.values, var_forecast.values)
+    actual_var = df_pair_level.loc[split["test_idx"], cfg.target_col]
+    return {"forecast": var_forecast, "rmse": rmse(actual_var.values, var_forecast.values)}
 
-    # ---------- 5) Save outputs ----------
-    # RMSE CSV
-    rmse_df = pd.DataFrame({
-        "Model": ["ARIMA", "VAR", "Neural Network"],
-        "RMSE": [rmse_arima, rmse_var, rmse_nn],
-    })
-    rmse_path = outdir / "rmse.csv"
-    rmse_df.to_csv(rmse_path, index=False)
-
-    # Forecasts CSV
-    pd.DataFrame({
-        "date": nn_dates,
-        "actual_level": actual_levels.values,
-        "nn_forecast": nn_forecast_level.values,
-        "arima_forecast": arima_forecast.reindex(nn_dates).values,
-        "var_forecast": var_forecast.reindex(nn_dates).values,
-    }).to_csv(outdir / "forecasts.csv", index=False)
+def stage_plot(
+    cfg: Config,
+    data: dict,
+    nn_forecast: dict | None = None,
+    arima_forecast: dict | None = None,
+    var_forecast: dict | None = None,
+) -> str:
+    from .plot import save_comparison_plot
 
-    # Plot
-    plot_path = outdir / "forecast_comparison.png"
+    dates = data["split"]["test_idx"]
+    plot_path = cfg.outputs_dir / "forecast_comparison.png"
     save_comparison_plot(
-        dates=nn_dates,
-        actual_levels=actual_levels,
-        arima_forecast=arima_forecast.reindex(nn_dates),
-        var_forecast=var_forecast.reindex(nn_dates),
-        nn_forecast=nn_forecast_level,
-        rmse_arima=rmse_arima,
-        rmse_var=rmse_var,
-        rmse_nn=rmse_nn,
+        dates=dates,
+        actual_levels=data["df_pair_level"].loc[dates, cfg.target_col],
+        arima_forecast=None if arima_forecast is None else arima_forecast["forecast"].reindex(dates),
+        var_forecast=None if var_forecast is None else var_forecast["forecast"].reindex(dates),
+        nn_forecast=None if nn_forecast is None else nn_forecast["forecast_level"].reindex(dates),
+        rmse_arima=None if arima_forecast is None else arima_forecast["rmse"],
+        rmse_var=None if var_forecast is None else var_forecast["rmse"],
+        rmse_nn=None if nn_forecast is None else nn_forecast["rmse"],
         outpath=plot_path
     )
+    return str(plot_path)
+
+def stage_report(cfg: Config, **upstream) -> str:
+    from .report import build_report_from_outputs
+
+    # reads metadata.json / rmse.csv / plot written earlier in run_all
+    print("Generating report from outputs...")
+    html_p, _ = build_report_from_outputs(cfg.outputs_dir)
+    return str(html_p)
+
+_DATA_FIELDS = ("data_path", "date_col", "target_col", "x_col", "analysis_end", "train_ratio")
+_NN_MODULES = ("src.models.nn", "src.scaling", "src.buffers", "src.eval")
+
+def build_stages(models=MODELS) -> list[Stage]:
+    """
+    Pipeline DAG: each stage lists its inputs so the cache key covers exactly
+    them. The plot and report depend on the forecasts of `models` only.
+    """
+    forecasts = tuple(f"{m}_forecast" for m in MODELS if m in models)
+    selects = tuple(f"{m}_select" for m in MODELS if m in models)
+    return [
+        Stage("data", stage_data, config_fields=_DATA_FIELDS, modules=("src.io",),
+              extra_key=(lambda cfg: data_fingerprint(cfg.data_path, cfg.cache_dir),)),
+        Stage("features", stage_features, deps=("data",), config_fields=("lags",),
+              modules=("src.features",)),
+        Stage("nn_select", stage_nn_select, deps=("features",),
+              config_fields=("random_state", "nn_search", "nn_search_grid", "nn_search_min_iter",
+                             "nn_search_max_iter", "nn_search_factor"),
+              modules=("src.models.nn", "src.scaling")),
+        Stage("nn_forecast", stage_nn_forecast, deps=("data", "features", "nn_select"),
+              config_fields=("random_state", "nn_mode", "nn_warm_max_iter", "nn_full_retrain_every",
+                             "nn_compare_modes", "history_dtype", "nn_ensemble_seeds") + _WINDOW_FIELDS,
+              modules=_NN_MODULES, log=True),
+        Stage("arima_select", stage_arima_select, deps=("data",),
+              config_fields=("arima_p_max", "arima_q_max", "arima_search", "arima_fit_timeout"),
+              modules=("src.models.arima",)),
+        Stage("arima_forecast", stage_arima_forecast, deps=("data", "arima_select"),
+              config_fields=("arima_refit_every", "arima_refit_tradeoff") + _WINDOW_FIELDS, modules=("src.models.arima",),
+              log=True),
+        Stage("var_select", stage_var_select, deps=("data",), modules=("src.models.var",)),
+        Stage("var_forecast", stage_var_forecast, deps=("data", "var_select"),
+              config_fields=("var_method",) + _WINDOW_FIELDS, modules=("src.models.var",), log=True),
+        Stage("plot", stage_plot, deps=("data",) + forecasts,
+              modules=("src.plot",), files=("forecast_comparison.png",)),
+        # the report renders metadata.json / timings.json of the current run: never cached
+        Stage("report", stage_report, deps=("data",) + selects + forecasts + ("plot",),
+              modules=("src.report",), cache=False),
+    ]
+
+# Config fields a fitted model depends on besides the data: those of the
+# selection stages (and their upstream stages) plus the ones used by the fit.
+# var_method is not one: the served RLS state equals the OLS fit on the same window.
+_FIT_FIELDS = {
+    "arima": _WINDOW_FIELDS,
+    "var": _WINDOW_FIELDS,
+    "nn": ("lags", "random_state", "nn_warm_max_iter") + _WINDOW_FIELDS,
+}
+
+def config_fields(models) -> tuple[str, ...]:
+    """Config fields that determine the selected and fitted models for `models`."""
+    stages = {s.name: s for s in build_stages(models)}
+    fields, todo = set(), [f"{m}_select" for m in models]
+    while todo:
+        stage = stages[todo.pop()]
+        fields.update(stage.config_fields)
+        todo.extend(stage.deps)
+    for m in models:
+        fields.update(_FIT_FIELDS[m])
+    return tuple(sorted(fields))
+
+def config_key(cfg: Config, models) -> str:
+    """Hash of `models` and their `config_fields` (the model registry and run snapshots are keyed on it)."""
+    config = {f: repr(getattr(cfg, f)) for f in config_fields(models)}
+    blob = json.dumps({"models": list(models), "config": config}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+_MODEL_LABELS = {"arima": "ARIMA", "var": "VAR", "nn": "Neural Network"}
+
+def parse_models(models) -> tuple[str, ...]:
+    """Normalise a model selection ("arima,var" or an iterable) to pipeline order."""
+    if isinstance(models, str):
+        models = [m.strip() for m in models.split(",") if m.strip()]
+    unknown = sorted(set(models) - set(MODELS))
+    if unknown or not models:
+        raise ValueError(f"Unknown or empty model selection {unknown or list(models)}; expected some of {MODELS}.")
+    return tuple(m for m in MODELS if m in models)
+
+def write_forecast_outputs(cfg: Config, data: dict, results: dict) -> None:
+    """rmse.csv and forecasts.csv for the models in `results` (model -> forecast stage output or None)."""
+    dates = data["split"]["test_idx"]
+    models = [m for m in MODELS if results.get(m) is not None]
+    pd.DataFrame({
+        "Model": [_MODEL_LABELS[m] for m in models],
+        "RMSE": [results[m]["rmse"] for m in models],
+    }).to_csv(cfg.outputs_dir / "rmse.csv", index=False)
+
+    forecasts = {"date": dates, "actual_level": data["df_pair_level"].loc[dates, cfg.target_col].values}
+    for m in ("nn", "arima", "var"):
+        if results.get(m) is not None:
+            series = results[m]["forecast_level" if m == "nn" else "forecast"]
+            forecasts[f"{m}_forecast"] = series.reindex(dates).values
+            if m == "nn" and results[m].get("forecast_spread") is not None:
+                forecasts["nn_spread"] = results[m]["forecast_spread"].reindex(dates).values
+    pd.DataFrame(forecasts).to_csv(cfg.outputs_dir / "forecasts.csv", index=False)
+
+def run_all(cfg: Config = CFG, models=MODELS, skip_report: bool = False) -> dict:
+    """
+    Run the pipeline for `models` (any of "arima", "var", "nn"); only their
+    stages run and only their libraries are imported. `skip_report` leaves
+    out the plot and the HTML report (and matplotlib/jinja2 with them).
+    """
+    models = parse_models(models)
+    outdir = ensure_outputs_dir(cfg)
+    TRACER.reset()
+    runner = StageRunner(
+        build_stages(models), cfg,
+        cache_dir=cfg.cache_dir / "stages", outputs_dir=outdir, enabled=cfg.stage_cache,
+        profile=cfg.profile_stages, profiler=cfg.profiler,
+    )
+
+    # ---------- 0-4) Data, features, models ----------
+    data = runner.run("data")
+    split = data["split"]
+    nn_search = nn = arima_search = arima = selected_lag = var = None
+    if "nn" in models:
+        nn_search = runner.run("nn_select")
+        nn = runner.run("nn_forecast")
+    if "arima" in models:
+        arima_search = runner.run("arima_select")
+        arima = runner.run("arima_forecast")
+    if "var" in models:
+        selected_lag = runner.run("var_select")
+        var = runner.run("var_forecast")
+    results = {"arima": arima, "var": var, "nn": nn}
+
+    # ---------- 5) Save outputs ----------
+    write_forecast_outputs(cfg, data, results)
+
+    ic_path = outdir / "arima_ic_table.csv"
+    if arima is not None:
+        arima_search["ic_table"].to_csv(ic_path, index=False)
+        if arima["tradeoff"] is not None:
+            arima["tradeoff"].to_csv(outdir / "arima_refit_tradeoff.csv", index=False)
+    else:
+        # the report would otherwise show the table of an earlier run
+        ic_path.unlink(missing_ok=True)
+
+    # Plot
+    if not skip_report:
+        runner.run("plot")
 
     # ---------- 6) Write metadata.json ----------
     meta_out = {
-        "data_path": str(CFG.data_path),
+        "data_path": str(cfg.data_path),
         "n_total": split["n_total"],
         "n_train": split["n_train"],
-        "cutoff_date": str(cutoff_date.date()),
-        "test_start": str(test_start.date()),
-        "test_end": str(test_end.date()),
-        "target_col": CFG.target_col,
-        "x_col": CFG.x_col,
-        "analysis_end": str(CFG.analysis_end.date()),
-        "lags": CFG.lags,
-        "nn_best_params": best_params,
-        "arima_best_order": list(best_order),
+        "cutoff_date": str(split["cutoff_date"].date()),
+        "test_start": str(split["test_start"].date()),
+        "test_end": str(split["test_end"].date()),
+        "target_col": cfg.target_col,
+        "x_col": cfg.x_col,
+        "analysis_end": str(cfg.analysis_end.date()),
+        "lags": cfg.lags,
+        "data_load": data["data_load"],
+        "models": list(models),
+        "nn_best_params": None if nn is None else nn_search["params"],
+        "nn_search": None if nn is None else {
+            "method": cfg.nn_search,
+            "grid": cfg.nn_search_grid,
+            "min_iter": cfg.nn_search_min_iter,
+            "max_iter": cfg.nn_search_max_iter,
+            "factor": cfg.nn_search_factor,
+            "n_jobs": cfg.nn_search_n_jobs,
+            "trace": nn_search["trace"].to_dict(orient="records"),
+        },
+        "nn_mode": cfg.nn_mode,
+        "nn_modes": None if nn is None else nn["modes"],
+        "arima_best_order": None if arima is None else list(arima_search["order"]),
+        "arima_search": None if arima is None else {
+            "method": cfg.arima_search,
+            "p_max": cfg.arima_p_max,
+            "q_max": cfg.arima_q_max,
+            "workers": cfg.arima_search_workers,
+            "timeout": cfg.arima_fit_timeout,
+        },
+        "arima_refit_every": cfg.arima_refit_every,
+        "arima_mean_step_seconds": None if arima is None else arima["mean_step_seconds"],
+        "arima_refit_tradeoff": (
+            arima["tradeoff"].to_dict(orient="records")
+            if arima is not None and arima["tradeoff"] is not None else None
+        ),
         "var_selected_lag": selected_lag,
+        "var_method": cfg.var_method,
+        "stages": runner.status,
+        "fit_cache": FIT_CACHE.stats(),
         "outputs": {
             "rmse_csv": "outputs/rmse.csv",
             "forecast_csv": "outputs/forecasts.csv",
-            "plot_png": "outputs/forecast_comparison.png",
-            "report_html": "outputs/report.html",  # expected output
+            "plot_png": None if skip_report else "outputs/forecast_comparison.png",
+            "arima_ic_table_csv": None if arima is None else "outputs/arima_ic_table.csv",
+            "report_html": None if skip_report else "outputs/report.html",  # expected output
+            "timings_json": "outputs/timings.json",
+            "trace_json": "outputs/trace.json",
         },
     }
 
-    (outdir / "metadata.json").write_text(json.dumps(meta_out, indent=2), encoding="utf-8")
+    meta_path = outdir / "metadata.json"
+    meta_path.write_text(json.dumps(meta_out, indent=2), encoding="utf-8")
+    # the report renders the stage timings so far; rewritten below with the report stage
+    TRACER.write(outdir)
 
     # ---------- 7) Generate report ----------
-    print("Generating report from outputs...")
-    html_p, _ = build_report_from_outputs(outdir)
-    report_html_path = Path(html_p)
+    if not skip_report:
+        report_html_path = Path(runner.run("report"))
 
-    # If something went wrong, be explicit
-    if not report_html_path.exists():
-        print("[report] report.html was not generated (unexpected).")
-        meta_out["outputs"]["report_html"] = None
+        # If something went wrong, be explicit
+        if not report_html_path.exists():
+            print("[report] report.html was not generated (unexpected).")
+            meta_out["outputs"]["report_html"] = None
+
+        # record the report stage status and timing as well
+        meta_path.write_text(json.dumps(meta_out, indent=2), encoding="utf-8")
+        TRACER.write(outdir)
+
+    # snapshot of the data and selections for `python -m src run --incremental`
+    from .incremental import save_snapshot
+    unkeyed_logs = cfg.outputs_dir / "checkpoints" if cfg.backtest_checkpoint else None
+    save_snapshot(cfg, data, models, {
+        "arima_order": None if arima is None else list(arima_search["order"]),
+        "var_lag": selected_lag,
+        "nn_params": None if nn is None else nn_search["params"],
+    }, logs={m: runner.log_dir(f"{m}_forecast") or unkeyed_logs for m in models})
 
     # ---------- 8) Standard output summary ----------
+    hits = [name for name, status in runner.status.items() if status == "hit"]
+    print(f"Stages: {len(hits)} cached, {len(runner.status) - len(hits)} computed")
+    slowest = max(TRACER.summary("stage"), key=lambda row: row["wall_seconds"])
+    print(f"Slowest stage: {slowest['name']} ({slowest['wall_seconds']:.2f}s, {slowest['fits']} fits)")
     print("Outputs written to: outputs/")
     print("- rmse.csv")
     print("- forecasts.csv")
-    print("- forecast_comparison.png")
+    if not skip_report:
+        print("- forecast_comparison.png")
+    print("- timings.json / trace.json")
     if meta_out["outputs"]["report_html"] is not None:
         print("- report.html")
-    else:
+    elif not skip_report:
         print("- report.html (not generated)")
 
     return meta_out
@@ -167,4 +490,4 @@ def run_all() -> dict:
 
 if __name__ == "__main__":
     meta = run_all()
-    print("Pipeline finished.")
\ No newline at end of file
+    print("Pipeline finished.")
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import pickle
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .config import CFG, Config
+from .io import data_fingerprint
+from .pipeline import MODELS, config_fields, config_key, parse_models, stage_data
+from .serve import ForecastState
+
+class ModelRegistry:
+    """
+    Fitted ForecastStates on disk, one directory per entry under `root`
+    (default `cfg.outputs_dir / "models"`): `manifest.json` (models, the
+    state's settings, config, data fingerprint, last date), the data and
+    model arrays as `.npy` files loaded memory-mapped, and the pickled MLP
+    for NN. States are written and rebuilt through
+    `ForecastState.export_state` / `from_state`.
+
+    An entry is keyed by the models, the config fields they depend on and
+    the data fingerprint; `pipeline.config_key` (without the fingerprint)
+    groups the entries a newer data vintage can be updated from.
+    """
+
+    def __init__(self, cfg: Config = CFG, root=None):
+        self.cfg = cfg
+        self.root = Path(cfg.outputs_dir / "models" if root is None else root)
+
+    def key(self, cfg: Config, models, fingerprint: str) -> str:
+        return f"{config_key(cfg, models)}-{fingerprint[:16]}"
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def manifests(self, config_key: str | None = None) -> list[dict]:
+        """Manifests of the complete entries (optionally of one config), newest data first."""
+        out = []
+        for manifest_path in self.root.glob("*/manifest.json"):
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if config_key is None or manifest["config_key"] == config_key:
+                out.append(manifest)
+        return sorted(out, key=lambda m: m["last_date"], reverse=True)
+
+    def save(self, state: ForecastState, cfg: Config, fingerprint: str) -> Path:
+        """Write `state` as the entry for (cfg, models, fingerprint); replaces an existing one."""
+        key = self.key(cfg, state.models, fingerprint)
+        entry = self.path(key)
+        tmp = self.root / f".tmp-{key}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        settings, arrays, mlp = state.export_state()
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(array))
+        if mlp is not None:
+            with (tmp / "nn_model.pkl").open("wb") as fh:
+                pickle.dump(mlp, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+        manifest = {
+            "key": key,
+            "config_key": config_key(cfg, state.models),
+            "data_fingerprint": fingerprint,
+            "models": list(state.models),
+            "state": settings,
+            "config": {f: repr(getattr(cfg, f)) for f in config_fields(state.models)},
+            "first_date": str(state.levels.index[0].date()),
+            "last_date": str(state.last_date.date()),
+            "n_obs": len(state.levels),
+            "created_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+        }
+        # manifest last: an entry without one is incomplete and ignored
+        (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        shutil.rmtree(entry, ignore_errors=True)
+        tmp.replace(entry)
+        return entry
+
+    def load(self, key: str, mmap: bool = True) -> ForecastState | None:
+        """Restore the entry `key` (None if absent); arrays are memory-mapped unless mmap=False."""
+        entry = self.path(key)
+        if not (entry / "manifest.json").exists():
+            return None
+        manifest = json.loads((entry / "manifest.json").read_text(encoding="utf-8"))
+        if "state" not in manifest:
+            return None  # written before states exported their own settings
+
+        arrays = {p.stem: np.load(p, mmap_mode="r" if mmap else None) for p in entry.glob("*.npy")}
+        mlp = None
+        if (entry / "nn_model.pkl").exists():
+            with (entry / "nn_model.pkl").open("rb") as fh:
+                mlp = pickle.load(fh)
+        return ForecastState.from_state(manifest["state"], arrays, mlp, date_col=self.cfg.date_col)
+
+def load_or_fit(cfg: Config = CFG, models=MODELS, registry: ModelRegistry | None = None) -> tuple[ForecastState, str]:
+    """
+    The ForecastState for the current data and config, and how it was obtained:
+
+    - "hit": registered for exactly this data fingerprint;
+    - "updated": an entry of the same config whose history is a prefix of
+      the current data was updated with the new periods (`observe`, no
+      re-estimation) and registered for the new fingerprint;
+    - "fitted": fitted from scratch (selection through the stage cache) and registered.
+    """
+    models = parse_models(models)
+    registry = ModelRegistry(cfg) if registry is None else registry
+    fingerprint = data_fingerprint(cfg.data_path, cfg.cache_dir)
+
+    state = registry.load(registry.key(cfg, models, fingerprint))
+    if state is not None:
+        return state, "hit"
+
+    levels = stage_data(cfg)["df_pair_level"][[cfg.target_col, cfg.x_col]].astype(float)
+    for manifest in registry.manifests(config_key(cfg, models)):
+        old = registry.load(manifest["key"])
+        if old is None:
+            continue
+        n_old = len(old.levels)
+        if n_old <= len(levels) and old.levels.equals(levels.iloc[:n_old]):
+            for date, row in levels.iloc[n_old:].iterrows():
+                old.observe(date, row.iloc[0], row.iloc[1])
+            registry.save(old, cfg, fingerprint)
+            return old, "updated"
+
+    state = ForecastState.from_config(cfg, models)
+    registry.save(state, cfg, fingerprint)
+    return state, "fitted"
+
+def forecast_from_registry(cfg: Config = CFG, models=MODELS, registry: ModelRegistry | None = None) -> dict:
+    """1-step-ahead level forecasts from the registered models (see `load_or_fit`)."""
+    state, source = load_or_fit(cfg, models, registry)
+    next_date = state.next_date()
+    return {
+        "source": source,
+        "last_date": str(state.last_date.date()),
+        "date": None if next_date is None else str(next_date.date()),
+        "forecasts": state.forecast(),
+    }
@@ -64,6 +64,18 @@ HTML_TEMPLATE = r"""
   <h2>RMSE comparison</h2>
   {{ rmse_table | safe }}
 
+  {% if arima_ic_table %}
+  <h2>ARIMA order search</h2>
+  {{ arima_ic_table | safe }}
+  <p class="small">BIC per candidate ARIMA(p,1,q) with fit time; timed-out / unvisited candidates have no BIC.</p>
+  {% endif %}
+
+  {% if timing_table %}
+  <h2>Stage timings</h2>
+  {{ timing_table | safe }}
+  <p class="small">Wall/CPU seconds, peak RSS and model fits per pipeline stage for the run that produced this report ("hit" = loaded from the stage cache). Full spans: <code>timings.json</code>, <code>trace.json</code>.</p>
+  {% endif %}
+
   <div class="figure">
     <h2>Forecast comparison plot</h2>
     <img src="{{ plot_filename }}" alt="Forecast comparison plot">
@@ -77,13 +89,13 @@ HTML_TEMPLATE = r"""
   <ul>
     <li>Transform: first difference on target (dy), predictor kept in levels.</li>
     <li>Features: 4 lags of dy and 4 lags of x.</li>
-    <li>Hyperparameters: grid search with time-series cross-validation on training set.</li>
+    <li>Hyperparameters: grid or successive-halving search with time-series cross-validation on training set.</li>
     <li>Forecasting: recursive 1-step ahead with re-estimation each step (no peeking).</li>
   </ul>
 
   <h3>Benchmarks</h3>
   <ul>
-    <li>ARIMA: ARIMA(p,1,q) selected by BIC over a small grid; recursive 1-step forecasts.</li>
+    <li>ARIMA: ARIMA(p,1,q) selected by BIC over a grid (or stepwise); recursive 1-step forecasts.</li>
     <li>VAR: estimated on differenced (target, predictor); lag selected by BIC; recursive 1-step forecasts.</li>
   </ul>
 
@@ -99,11 +111,26 @@ def write_html_report(
     out_html: Path,
     rmse_df: pd.DataFrame,
     plot_filename: str,
-    meta: dict
+    meta: dict,
+    arima_ic_df: pd.DataFrame | None = None,
+    timing_df: pd.DataFrame | None = None,
 ) -> None:
     rmse_table = rmse_df.to_html(index=False, float_format=lambda x: f"{x:.4f}")
+    arima_ic_table = None
+    if arima_ic_df is not None:
+        arima_ic_table = arima_ic_df[["p", "d", "q", "bic", "seconds", "status"]].to_html(
+            index=False, float_format=lambda x: f"{x:.4f}", na_rep=""
+        )
+    timing_table = None
+    if timing_df is not None and not timing_df.empty:
+        cols = [c for c in ("name", "cache", "wall_seconds", "cpu_seconds", "peak_rss_mb", "fits") if c in timing_df]
+        timing_table = timing_df[cols].rename(columns={"name": "stage"}).to_html(
+            index=False, float_format=lambda x: f"{x:.2f}", na_rep=""
+        )
     html = Template(HTML_TEMPLATE).render(
         rmse_table=rmse_table,
+        arima_ic_table=arima_ic_table,
+        timing_table=timing_table,
         plot_filename=plot_filename,
         **meta
     )
@@ -121,8 +148,15 @@ def build_report_from_outputs(outputs_dir: Path) -> tuple[Path, None]:
     rmse_path = outputs_dir / "rmse.csv"
     plot_path = outputs_dir / "forecast_comparison.png"
 
+    ic_path = outputs_dir / "arima_ic_table.csv"
+    timings_path = outputs_dir / "timings.json"
+
     meta = json.loads(meta_path.read_text(encoding="utf-8"))
     rmse_df = pd.read_csv(rmse_path)
+    arima_ic_df = pd.read_csv(ic_path) if ic_path.exists() else None
+    timing_df = None
+    if timings_path.exists():
+        timing_df = pd.DataFrame(json.loads(timings_path.read_text(encoding="utf-8"))["stages"])
 
     tpl_meta = {
         "target_col": meta.get("target_col", "import_clv_qna_sa"),
@@ -140,7 +174,7 @@ def build_report_from_outputs(outputs_dir: Path) -> tuple[Path, None]:
     }
 
     out_html = outputs_dir / "report.html"
-    write_html_report(out_html, rmse_df, plot_path.name, tpl_meta)
+    write_html_report(out_html, rmse_df, plot_path.name, tpl_meta, arima_ic_df, timing_df)
 
     return out_html, None
 
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+
+class StreamingStandardizer(TransformerMixin, BaseEstimator):
+    """
+    Standardizer with the same transform as sklearn's StandardScaler
+    (population variance, near-constant features left unscaled) whose
+    statistics are updated incrementally: `update` adds one row in
+    O(features) with Welford's algorithm (`downdate` removes one again),
+    `partial_fit` merges a batch with Chan's parallel formula. Recursive
+    forecasters keep one instance and advance it as the history grows
+    instead of refitting on every step.
+    """
+
+    def _reset(self) -> None:
+        for attr in ("mean_", "var_", "scale_", "n_samples_seen_", "_m2"):
+            if hasattr(self, attr):
+                delattr(self, attr)
+
+    def fit(self, X, y=None):
+        self._reset()
+        return self.partial_fit(X)
+
+    def partial_fit(self, X, y=None):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_b = X.shape[0]
+        if n_b == 0:
+            return self
+        mean_b = X.mean(axis=0)
+        m2_b = ((X - mean_b) ** 2).sum(axis=0)
+
+        if not hasattr(self, "mean_"):
+            self.n_samples_seen_ = n_b
+            self.mean_ = mean_b
+            self._m2 = m2_b
+        else:
+            n_a = self.n_samples_seen_
+            n = n_a + n_b
+            delta = mean_b - self.mean_
+            self.mean_ = self.mean_ + delta * (n_b / n)
+            self._m2 = self._m2 + m2_b + delta**2 * (n_a * n_b / n)
+            self.n_samples_seen_ = n
+
+        self._finalize()
+        return self
+
+    def update(self, x_row) -> "StreamingStandardizer":
+        """Add one observation (Welford's update)."""
+        x_row = np.asarray(x_row, dtype=np.float64).ravel()
+        if not hasattr(self, "mean_"):
+            return self.partial_fit(x_row)
+
+        self.n_samples_seen_ += 1
+        delta = x_row - self.mean_
+        self.mean_ = self.mean_ + delta / self.n_samples_seen_
+        self._m2 = self._m2 + delta * (x_row - self.mean_)
+        self._finalize()
+        return self
+
+    def downdate(self, x_row) -> "StreamingStandardizer":
+        """Remove one previously added observation (Welford's update in reverse), for rolling windows."""
+        x_row = np.asarray(x_row, dtype=np.float64).ravel()
+        n = self.n_samples_seen_ - 1
+        if n < 1:
+            raise ValueError("Cannot remove the last remaining observation.")
+        mean = (self.mean_ * self.n_samples_seen_ - x_row) / n
+        self._m2 = np.maximum(self._m2 - (x_row - mean) * (x_row - self.mean_), 0.0)
+        self.mean_, self.n_samples_seen_ = mean, n
+        self._finalize()
+        return self
+
+    def _finalize(self) -> None:
+        n = self.n_samples_seen_
+        self.var_ = self._m2 / n
+        # same near-constant rule as StandardScaler (Chan, Golub & LeVeque bound)
+        eps = np.finfo(np.float64).eps
+        constant = self.var_ <= n * eps * self.var_ + (n * self.mean_ * eps) ** 2
+        scale = np.sqrt(self.var_)
+        scale[constant] = 1.0
+        self.scale_ = scale
+
+    def transform(self, X):
+        X = np.asarray(X)
+        return (X - self.mean_) / self.scale_
+
+    def inverse_transform(self, X):
+        return np.asarray(X) * self.scale_ + self.mean_
+
+    def export_state(self) -> dict:
+        """Running statistics that `restore_state` resumes from (e.g. to save the scaler)."""
+        return {"n_samples_seen": int(self.n_samples_seen_), "mean": self.mean_, "m2": self._m2}
+
+    def restore_state(self, state: dict) -> "StreamingStandardizer":
+        """Resume from `export_state()` output; later updates continue exactly where it left off."""
+        self.n_samples_seen_ = int(state["n_samples_seen"])
+        self.mean_ = np.array(state["mean"], dtype=np.float64)
+        self._m2 = np.array(state["m2"], dtype=np.float64)
+        self._finalize()
+        return self
+
+    def snapshot(self) -> "StreamingStandardizer":
+        """Frozen copy of the current statistics (e.g. to hand to a worker task)."""
+        snap = StreamingStandardizer()
+        snap.n_samples_seen_ = self.n_samples_seen_
+        snap.mean_ = self.mean_.copy()
+        snap._m2 = self._m2.copy()
+        snap.var_ = self.var_.copy()
+        snap.scale_ = self.scale_.copy()
+        return snap
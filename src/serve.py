@@ -0,0 +1,540 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+import pandas as pd
+
+from .backtest import exponential_weights, forgetting_factor, resolve_window, window_start
+from .config import CFG, Config
+from .pipeline import MODELS, _window_kwargs, build_stages, parse_models
+from .stages import StageRunner
+
+# ---------- Resident models ----------
+
+class ForecastState:
+    """
+    The selected models fitted once on the full history of one target/x
+    pair and kept in memory. `observe()` appends a period and updates each
+    model in place, without re-estimating anything from scratch:
+
+    - ARIMA: the fitted state space is extended by one Kalman step;
+    - VAR: RecursiveVAR takes one rank-one (RLS) update;
+    - NN: the new feature row joins the history and the MLP is warm-started
+      for `nn_warm_max_iter` epochs (the pipeline's "warm" mode).
+
+    The window policy (`window`, `window_size`, `window_halflife`, as in
+    Config) applies as in the backtests: ARIMA is estimated on the last
+    `window_size` levels (the effective size for "exponential") and later
+    periods extend its filter; the VAR keeps a rolling window or a
+    forgetting factor; the NN trains on the last `window_size` rows or
+    with exponentially decaying sample weights.
+
+    `forecast()` is then a cheap 1-step prediction from the current state.
+    `export_state()` / `from_state()` turn a state into settings, arrays
+    and the MLP and back (`registry.ModelRegistry` stores them); a restored
+    NN history is only read (from its memory map) on the first observe.
+    Not thread-safe: the server runs every call on a single worker thread.
+    """
+
+    def __init__(
+        self,
+        df_pair_level: pd.DataFrame,
+        target_col: str,
+        x_col: str,
+        models=MODELS,
+        arima_order=None,
+        var_lag: int | None = None,
+        nn_params: dict | None = None,
+        lags: int = CFG.lags,
+        random_state: int = CFG.random_state,
+        nn_warm_max_iter: int = CFG.nn_warm_max_iter,
+        window: str = "expanding",
+        window_size: int = CFG.window_size,
+        window_halflife: float = CFG.window_halflife,
+    ):
+        self._configure({
+            "models": list(parse_models(models)), "target_col": target_col, "x_col": x_col, "lags": lags,
+            "random_state": random_state, "nn_warm_max_iter": nn_warm_max_iter,
+            "window": window, "window_size": window_size, "window_halflife": window_halflife,
+        })
+        self.levels = df_pair_level[[target_col, x_col]].astype(float)
+
+        if "arima" in self.models:
+            from .models.arima import fit_arima
+            y = self.levels[target_col].to_numpy()
+            self._arima_start = self._arima_window_start(len(y))
+            self._arima = fit_arima(y[self._arima_start:], tuple(arima_order))
+        if "var" in self.models:
+            self._var = self._new_var(var_lag).fit(np.diff(self.levels.to_numpy(), axis=0))
+        if "nn" in self.models:
+            self._fit_nn(nn_params)
+
+    def _configure(self, settings: dict) -> None:
+        self.models = tuple(settings["models"])
+        self.target_col, self.x_col = settings["target_col"], settings["x_col"]
+        self.lags = settings["lags"]
+        self.random_state = settings["random_state"]
+        self.nn_warm_max_iter = settings["nn_warm_max_iter"]
+        self.window, self.window_size, self.window_halflife = resolve_window(
+            settings["window"], settings["window_size"], settings["window_halflife"]
+        )
+        self.version = 0
+
+    @classmethod
+    def from_config(cls, cfg: Config = CFG, models=MODELS) -> "ForecastState":
+        """Load the data and the selected orders/lag/params through the (cached) pipeline stages."""
+        models = parse_models(models)
+        runner = StageRunner(build_stages(models), cfg, cache_dir=cfg.cache_dir / "stages",
+                             outputs_dir=cfg.outputs_dir, enabled=cfg.stage_cache)
+        data = runner.run("data")
+        return cls(
+            data["df_pair_level"], cfg.target_col, cfg.x_col, models=models,
+            arima_order=runner.run("arima_select")["order"] if "arima" in models else None,
+            var_lag=runner.run("var_select") if "var" in models else None,
+            nn_params=runner.run("nn_select")["params"] if "nn" in models else None,
+            lags=cfg.lags, random_state=cfg.random_state, nn_warm_max_iter=cfg.nn_warm_max_iter,
+            **_window_kwargs(cfg),
+        )
+
+    def export_state(self) -> tuple[dict, dict[str, np.ndarray], object]:
+        """
+        What `from_state` rebuilds this state from: JSON-serializable
+        settings, the data and model arrays, and the fitted MLPRegressor
+        (None without NN).
+        """
+        settings = {
+            "models": list(self.models), "target_col": self.target_col, "x_col": self.x_col,
+            "lags": self.lags, "random_state": self.random_state, "nn_warm_max_iter": self.nn_warm_max_iter,
+            "window": self.window, "window_size": self.window_size, "window_halflife": self.window_halflife,
+        }
+        arrays = {"levels": self.levels.to_numpy(), "dates": self.levels.index.to_numpy(dtype="datetime64[ns]")}
+        mlp = None
+        if "arima" in self.models:
+            settings.update(arima_order=list(self._arima.model.order), arima_start=self._arima_start)
+            arrays["arima_params"] = np.asarray(self._arima.params)
+        if "var" in self.models:
+            settings["var_lag"] = self._var.lags
+            arrays.update({f"var_{name}": a for name, a in self._var.export_state().items()})
+        if "nn" in self.models:
+            history = self._nn_history if self._nn_history is not None else self._nn_history_loader()
+            scaler = self._nn_scaler.export_state()
+            settings["nn_scaler_n"] = scaler["n_samples_seen"]
+            arrays.update(nn_history_X=history.X, nn_history_y=history.y, nn_recent=self._recent,
+                          nn_scaler_mean=scaler["mean"], nn_scaler_m2=scaler["m2"])
+            mlp = self._nn
+        return settings, arrays, mlp
+
+    @classmethod
+    def from_state(cls, settings: dict, arrays: dict, mlp=None, date_col: str = CFG.date_col) -> "ForecastState":
+        """Rebuild an `export_state()` result without fitting; arrays may be memory maps."""
+        state = cls.__new__(cls)
+        state._configure(settings)
+        state.levels = pd.DataFrame(np.array(arrays["levels"]), index=pd.DatetimeIndex(arrays["dates"], name=date_col),
+                                    columns=[state.target_col, state.x_col])
+
+        if "arima" in state.models:
+            from statsmodels.tsa.arima.model import ARIMA
+            # one Kalman filter pass with the stored parameters, no MLE
+            state._arima_start = settings["arima_start"]
+            y = state.levels[state.target_col].to_numpy()[state._arima_start:]
+            state._arima = ARIMA(y, order=tuple(settings["arima_order"])).filter(np.array(arrays["arima_params"]))
+        if "var" in state.models:
+            var_state = {name[len("var_"):]: a for name, a in arrays.items() if name.startswith("var_")}
+            state._var = state._new_var(settings["var_lag"]).restore_state(var_state)
+        if "nn" in state.models:
+            from .buffers import HistoryBuffer
+            from .scaling import StreamingStandardizer
+
+            state._nn = mlp
+            state._nn_scaler = StreamingStandardizer().restore_state({
+                "n_samples_seen": settings["nn_scaler_n"],
+                "mean": arrays["nn_scaler_mean"], "m2": arrays["nn_scaler_m2"],
+            })
+            state._recent = np.array(arrays["nn_recent"])
+            # the training history is only needed to update the model
+            X, y = arrays["nn_history_X"], arrays["nn_history_y"]
+            state._nn_history = None
+
+            def history_loader():
+                buf = HistoryBuffer(X.shape[1], capacity=2 * len(X), dtype="float64")
+                buf.extend(X, y)
+                return buf
+
+            state._nn_history_loader = history_loader
+        return state
+
+    def _arima_window_start(self, n: int) -> int:
+        from .models.arima import estimation_window
+        window, size = estimation_window(self.window, self.window_size, self.window_halflife)
+        return window_start(n, window, size)
+
+    def _new_var(self, lag: int):
+        from .models.var import RecursiveVAR
+        if self.window == "rolling":
+            # a window of window_size diffs holds window_size - lags design rows, as in forecast_var_recursive
+            return RecursiveVAR(lag, window=self.window_size - lag)
+        forgetting = forgetting_factor(self.window_halflife) if self.window == "exponential" else 1.0
+        return RecursiveVAR(lag, forgetting=forgetting)
+
+    # NN features at t are lags 1..L of (dy, x), as in features.make_lag_features
+    def _transformed(self) -> np.ndarray:
+        y = self.levels[self.target_col].to_numpy()
+        return np.column_stack([np.diff(y), self.levels[self.x_col].to_numpy()[1:]])
+
+    def _next_features(self) -> np.ndarray:
+        return self._recent[::-1].ravel()
+
+    def _nn_training_rows(self):
+        """History rows (views) and sample weights the MLP trains on under the window policy."""
+        n = len(self._nn_history)
+        start = window_start(n, self.window, self.window_size)
+        weights = exponential_weights(n, self.window_halflife) if self.window == "exponential" else None
+        return self._nn_history.X[start:], self._nn_history.y[start:], weights
+
+    def _fit_nn(self, params: dict) -> None:
+        from sklearn.neural_network import MLPRegressor
+        from .buffers import HistoryBuffer
+        from .features import lag_matrix
+        from .scaling import StreamingStandardizer
+
+        trans = self._transformed()
+        X = lag_matrix(trans, self.lags)
+        self._nn_history = HistoryBuffer(X.shape[1], capacity=2 * len(X), dtype="float64")
+        self._nn_history.extend(X, trans[self.lags:, 0])
+        X_fit, y_fit, weights = self._nn_training_rows()
+        self._nn_scaler = StreamingStandardizer().fit(X_fit)
+        self._nn = MLPRegressor(**params, max_iter=5000, random_state=self.random_state)
+        self._nn.fit(self._nn_scaler.transform(X_fit), y_fit, sample_weight=weights)
+        self._recent = trans[-self.lags:]
+        self._nn_history_loader = None
+
+    @property
+    def last_date(self) -> pd.Timestamp:
+        return self.levels.index[-1]
+
+    def next_date(self) -> pd.Timestamp | None:
+        """Date of the period being forecast (None if the index has no regular frequency)."""
+        freq = self.levels.index.freq or pd.infer_freq(self.levels.index[-8:])
+        return None if freq is None else self.last_date + pd.tseries.frequencies.to_offset(freq)
+
+    def forecast(self, models=None) -> dict[str, float]:
+        """1-step-ahead level forecast of the target for each of `models` (default: all loaded)."""
+        models = self.models if models is None else models
+        prev = float(self.levels[self.target_col].iloc[-1])
+        out = {}
+        if "arima" in models:
+            out["arima"] = float(self._arima.forecast()[0])
+        if "var" in models:
+            out["var"] = prev + float(self._var.forecast()[0])
+        if "nn" in models:
+            x_next = self._nn_scaler.transform(self._next_features()[None, :])
+            out["nn"] = prev + float(self._nn.predict(x_next)[0])
+        return out
+
+    def observe(self, date, target: float, x: float) -> None:
+        """Append the realized levels of one new period and update every model."""
+        self.observe_many([(date, target, x)])
+
+    def observe_many(self, rows) -> None:
+        """
+        Append several `(date, target, x)` periods. Every row is checked first
+        (dates increasing past the last date, finite values), so an invalid
+        row raises ValueError before any model has been updated.
+        """
+        checked, last = [], self.last_date
+        for date, target, x in rows:
+            date = pd.Timestamp(date)
+            if date <= last:
+                raise ValueError(f"Observation date {date.date()} is not after the last date {last.date()}.")
+            row = np.array([target, x], dtype=float)
+            if not np.isfinite(row).all():
+                raise ValueError(f"Observation for {date.date()} has non-finite values {row.tolist()}.")
+            checked.append((date, row))
+            last = date
+        for date, row in checked:
+            self._apply(date, row)
+
+    def _apply(self, date: pd.Timestamp, row: np.ndarray) -> None:
+        # every model is updated on a copy and the copies are assigned together,
+        # so an exception (e.g. from the MLP fit) leaves the state as it was
+        diff = row - self.levels.iloc[-1].to_numpy()
+        updated = {}
+        if "arima" in self.models:
+            updated["_arima"] = self._arima.extend(row[:1])  # a new results object
+        if "var" in self.models:
+            updated["_var"] = copy.deepcopy(self._var)
+            updated["_var"].update(diff)
+        if "nn" in self.models:
+            if self._nn_history is None:
+                self._nn_history = self._nn_history_loader()
+            x_row = self._next_features()
+            # the history is appended in place (the fit trains on views of it) and truncated on failure
+            n_before = len(self._nn_history)
+            self._nn_history.append(x_row, diff[0], date)
+            try:
+                scaler = copy.deepcopy(self._nn_scaler).update(x_row)
+                n = len(self._nn_history)
+                if self.window == "rolling" and n > self.window_size:
+                    scaler.downdate(self._nn_history.X[n - self.window_size - 1])
+                X_fit, y_fit, weights = self._nn_training_rows()
+                nn = copy.deepcopy(self._nn).set_params(warm_start=True, max_iter=self.nn_warm_max_iter)
+                nn.fit(scaler.transform(X_fit), y_fit, sample_weight=weights)
+            except BaseException:
+                self._nn_history.truncate(n_before)
+                raise
+            updated.update(_nn=nn, _nn_scaler=scaler, _recent=np.vstack([self._recent[1:], [diff[0], row[1]]]))
+
+        for name, value in updated.items():
+            setattr(self, name, value)
+        self.levels.loc[date] = row
+        self.version += 1
+
+# ---------- Request coalescing ----------
+
+class Coalescer:
+    """
+    Collect concurrent calls for up to `window` seconds and serve them with
+    one call of `batch_fn(items) -> results` on `executor`; each caller gets
+    its own result. A burst of N requests therefore costs one prediction.
+    """
+
+    def __init__(self, batch_fn, executor, window: float):
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.window = window
+        self._pending: list[tuple[object, asyncio.Future]] = []
+        self._flush = None
+        self.calls = 0
+        self.batches = 0
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut))
+        self.calls += 1
+        if self._flush is None:
+            self._flush = loop.create_task(self._run_batch())
+        return await fut
+
+    async def _run_batch(self) -> None:
+        await asyncio.sleep(self.window)
+        batch, self._pending, self._flush = self._pending, [], None
+        self.batches += 1
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.batch_fn, [item for item, _ in batch]
+            )
+        except Exception as exc:
+            for _, fut in batch:
+                fut.set_exception(exc)
+            return
+        for (_, fut), result in zip(batch, results):
+            fut.set_result(result)
+
+# ---------- HTTP service ----------
+
+class ForecastServer:
+    """
+    Minimal asyncio HTTP/1.1 JSON service around a ForecastState:
+
+    - GET  /forecast[?models=arima,var]  1-step-ahead level forecasts
+    - POST /observe  {"date": ..., "target": ..., "x": ...} (or a list of them)
+    - GET  /health, GET /stats
+
+    All model work runs on one worker thread, so observations and
+    forecasts never interleave; forecasts arriving within `coalesce_ms`
+    of each other are computed in one batch.
+    """
+
+    def __init__(self, state: ForecastState, coalesce_ms: float = CFG.serve_coalesce_ms):
+        self.state = state
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forecast")
+        self.forecasts = Coalescer(self._forecast_batch, self.executor, coalesce_ms / 1000)
+        self.observations = 0
+        self._server = None
+
+    def _forecast_batch(self, requested: list[tuple[str, ...]]) -> list[dict]:
+        wanted = tuple(m for m in self.state.models if any(m in r for r in requested))
+        values = self.state.forecast(wanted)
+        next_date = self.state.next_date()
+        common = {"version": self.state.version, "last_date": str(self.state.last_date.date()),
+                  "date": None if next_date is None else str(next_date.date())}
+        return [{**common, "forecasts": {m: values[m] for m in r}} for r in requested]
+
+    def _observe(self, rows: list[dict]) -> dict:
+        # all-or-nothing: observe_many rejects the whole list before applying any row
+        self.state.observe_many([(row["date"], float(row["target"]), float(row["x"])) for row in rows])
+        return self._health()
+
+    def _health(self) -> dict:
+        return {"status": "ok", "models": list(self.state.models), "version": self.state.version,
+                "last_date": str(self.state.last_date.date())}
+
+    async def handle(self, method: str, target: str, body: bytes) -> tuple[int, dict]:
+        url = urlsplit(target)
+        loop = asyncio.get_running_loop()
+        if url.path == "/forecast" and method == "GET":
+            query = parse_qs(url.query).get("models")
+            models = self.state.models if query is None else parse_models(query[0])
+            missing = set(models) - set(self.state.models)
+            if missing:
+                return 400, {"error": f"models not loaded: {sorted(missing)}"}
+            return 200, await self.forecasts.submit(models)
+        if url.path == "/observe" and method == "POST":
+            rows = json.loads(body or b"null")
+            rows = [rows] if isinstance(rows, dict) else rows
+            if not isinstance(rows, list) or not rows:
+                return 400, {"error": "expected an observation object or a list of them"}
+            health = await loop.run_in_executor(self.executor, self._observe, rows)
+            self.observations += len(rows)
+            return 200, health
+        if url.path == "/health" and method == "GET":
+            return 200, self._health()
+        if url.path == "/stats" and method == "GET":
+            return 200, {**self._health(), "forecast_requests": self.forecasts.calls,
+                         "forecast_batches": self.forecasts.batches, "observations": self.observations}
+        return 404, {"error": f"no route for {method} {url.path}"}
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                close = headers.get("connection", "").lower() == "close"
+
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    # the request cannot be framed, so answer and drop the connection
+                    status, payload, close = 400, {"error": "malformed request"}, True
+                else:
+                    body = await reader.readexactly(length)
+                    try:
+                        status, payload = await self.handle(method, target, body)
+                    except (ValueError, KeyError, TypeError) as exc:
+                        status, payload = 400, {"error": str(exc)}
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = CFG.serve_host, port: int = CFG.serve_port) -> tuple[str, int]:
+        """Start listening; returns the bound (host, port) (port=0 picks a free one)."""
+        self._server = await asyncio.start_server(self._connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+
+# ---------- Local client ----------
+
+class ForecastClient:
+    """Keep-alive JSON client for one connection to a ForecastServer."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self._reader = self._writer = None
+
+    async def __aenter__(self) -> "ForecastClient":
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def request(self, method: str, path: str, payload=None) -> tuple[int, dict]:
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self._writer.drain()
+        status = int((await self._reader.readline()).split()[1])
+        headers = {}
+        while (line := await self._reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, json.loads(await self._reader.readexactly(int(headers["content-length"])))
+
+async def load_test(host: str, port: int, requests: int = 1000, concurrency: int = 32,
+                    path: str = "/forecast") -> dict:
+    """
+    Send `requests` GETs to `path` over `concurrency` keep-alive connections
+    and report throughput and latency percentiles (milliseconds).
+    """
+    latencies = []
+    per_client = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+
+    async def worker(n: int) -> None:
+        async with ForecastClient(host, port) as client:
+            for _ in range(n):
+                start = time.perf_counter()
+                status, _ = await client.request("GET", path)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    raise RuntimeError(f"{path} returned HTTP {status}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in per_client if n))
+    elapsed = time.perf_counter() - start
+    ms = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies), "concurrency": concurrency, "seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)), "max_ms": float(ms.max()),
+    }
+
+async def _serve(cfg: Config, models, host: str, port: int, coalesce_ms: float) -> None:
+    from .registry import load_or_fit
+
+    start = time.perf_counter()
+    state, source = load_or_fit(cfg, models)
+    server = ForecastServer(state, coalesce_ms=coalesce_ms)
+    host, port = await server.start(host, port)
+    print(f"Loaded {', '.join(state.models)} up to {state.last_date.date()} "
+          f"({source} in the model registry) in {time.perf_counter() - start:.1f}s")
+    print(f"Serving on http://{host}:{port} (GET /forecast, POST /observe, GET /health, GET /stats)")
+    await server.serve_forever()
+
+def serve(cfg: Config = CFG, models=MODELS, host: str | None = None, port: int | None = None,
+          coalesce_ms: float | None = None) -> None:
+    """Run the forecast service until interrupted."""
+    try:
+        asyncio.run(_serve(
+            cfg, models,
+            cfg.serve_host if host is None else host,
+            cfg.serve_port if port is None else port,
+            cfg.serve_coalesce_ms if coalesce_ms is None else coalesce_ms,
+        ))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,186 @@
+from __future__ import annotations
+import ast
+import hashlib
+import importlib.util
+import inspect
+import pickle
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from .telemetry import TRACER, profiled
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    fn(cfg, **deps) computes the stage from the outputs of `deps`. The cache
+    key hashes the keys of its deps, the values of `config_fields`, the
+    source of `fn` and of the listed `modules` (and of the package modules
+    they import), plus any `extra_key` callables (e.g. the data
+    fingerprint). `files` are output files (relative to the outputs dir)
+    the stage writes; a copy is kept per key and restored on a hit, so
+    they always match the cached output. A stage with `log` set also gets
+    `log_dir=`, a directory kept with its cache entry (see StageRunner.log_dir).
+    """
+    name: str
+    fn: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+    config_fields: tuple[str, ...] = ()
+    modules: tuple[str, ...] = ()
+    extra_key: tuple[Callable[[Any], str], ...] = ()
+    files: tuple[str, ...] = ()
+    cache: bool = True
+    log: bool = False
+
+# their values enter the keys through `config_fields`; telemetry does not change results
+_UNKEYED_MODULES = ("src.config", "src.telemetry")
+
+def _local_imports(module_name: str, source: bytes) -> set[str]:
+    """Modules of the same top-level package that `source` imports (absolute or relative)."""
+    top = module_name.split(".")[0]
+    package = module_name.rpartition(".")[0]
+    found = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = importlib.util.resolve_name("." * node.level + (node.module or ""), package) if node.level \
+                else node.module
+            # `from . import x` / `from .pkg import mod` may name submodules
+            names = [base] + [f"{base}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        for name in names:
+            if name.split(".")[0] == top and name not in _UNKEYED_MODULES:
+                try:
+                    if importlib.util.find_spec(name) is not None:
+                        found.add(name)
+                except ModuleNotFoundError:
+                    pass
+    return found
+
+def _module_closure(module_name: str) -> dict[str, bytes]:
+    """Source of the module and of every module of its package it imports, transitively."""
+    sources, todo = {}, [module_name]
+    while todo:
+        name = todo.pop()
+        if name in sources:
+            continue
+        sources[name] = Path(importlib.util.find_spec(name).origin).read_bytes()
+        todo.extend(_local_imports(name, sources[name]) - sources.keys())
+    return sources
+
+def _module_source_hash(module_name: str) -> str:
+    # the sources are located and parsed, not imported: a cache hit must not
+    # pay for importing sklearn/statsmodels/matplotlib behind a model module.
+    # Hashing the imported package modules too means an edit to e.g.
+    # src.backtest invalidates the stages of every model built on it.
+    h = hashlib.sha256()
+    for name, source in sorted(_module_closure(module_name).items()):
+        h.update(name.encode() + hashlib.sha256(source).digest())
+    return h.hexdigest()
+
+class StageRunner:
+    """
+    Run a DAG of stages, storing each output under `cache_dir/<stage>/<key>.pkl`
+    (and the files it writes under `<key>.files/`).
+    A stage is recomputed only when its key changes, so editing e.g. the
+    report template reruns the report and nothing upstream.
+    `status` records "hit" / "miss" per stage ("uncached" when caching is off).
+
+    Every stage runs in a telemetry span; computed stages named in
+    `profile` (or all of them with "*") are also profiled with `profiler`
+    into `outputs_dir/profiles/`.
+    """
+
+    def __init__(
+        self,
+        stages: list[Stage],
+        cfg,
+        cache_dir,
+        outputs_dir,
+        enabled: bool = True,
+        profile: tuple[str, ...] = (),
+        profiler: str = "cprofile",
+    ):
+        self.stages = {s.name: s for s in stages}
+        self.cfg = cfg
+        self.cache_dir = Path(cache_dir)
+        self.outputs_dir = Path(outputs_dir)
+        self.enabled = enabled
+        self.keys: dict[str, str] = {}
+        self.outputs: dict[str, Any] = {}
+        self.status: dict[str, str] = {}
+        self.profile = tuple(profile)
+        self.profiler = profiler
+
+    def key(self, name: str) -> str:
+        if name not in self.keys:
+            stage = self.stages[name]
+            h = hashlib.sha256()
+            h.update(name.encode())
+            for dep in stage.deps:
+                h.update(self.key(dep).encode())
+            for field in stage.config_fields:
+                h.update(f"{field}={getattr(self.cfg, field)!r}".encode())
+            h.update(inspect.getsource(stage.fn).encode())
+            for module_name in stage.modules:
+                h.update(_module_source_hash(module_name).encode())
+            for extra in stage.extra_key:
+                h.update(extra(self.cfg).encode())
+            self.keys[name] = h.hexdigest()[:20]
+        return self.keys[name]
+
+    def _path(self, name: str) -> Path:
+        return self.cache_dir / name / f"{self.key(name)}.pkl"
+
+    def log_dir(self, name: str) -> Path | None:
+        """Per-key directory for records a `log` stage writes while computing (None without caching)."""
+        stage = self.stages[name]
+        return self._path(name).with_suffix(".log") if self.enabled and stage.cache and stage.log else None
+
+    def run(self, name: str) -> Any:
+        """Compute (or load) `name` and everything it depends on."""
+        if name in self.outputs:
+            return self.outputs[name]
+
+        stage = self.stages[name]
+        deps = {dep: self.run(dep) for dep in stage.deps}
+
+        use_cache = self.enabled and stage.cache
+        path = self._path(name) if use_cache else None
+        stored = path.with_suffix(".files") if use_cache else None
+        files_ok = use_cache and all((stored / f).exists() for f in stage.files)
+
+        with TRACER.span(name, cat="stage") as span:
+            if use_cache and path.exists() and files_ok:
+                with path.open("rb") as fh:
+                    out = pickle.load(fh)
+                for f in stage.files:
+                    (self.outputs_dir / f).parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(stored / f, self.outputs_dir / f)
+                self.status[name] = "hit"
+            else:
+                wanted = "*" in self.profile or name in self.profile
+                with profiled(name, self.profiler if wanted else None, self.outputs_dir / "profiles"):
+                    extra = {"log_dir": self.log_dir(name)} if stage.log else {}
+                    if extra.get("log_dir") is not None:
+                        extra["log_dir"].mkdir(parents=True, exist_ok=True)
+                    out = stage.fn(self.cfg, **deps, **extra)
+                if use_cache:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    for f in stage.files:
+                        (stored / f).parent.mkdir(parents=True, exist_ok=True)
+                        shutil.copyfile(self.outputs_dir / f, stored / f)
+                    tmp = path.with_suffix(".tmp")
+                    with tmp.open("wb") as fh:
+                        pickle.dump(out, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                    tmp.replace(path)
+                self.status[name] = "miss" if use_cache else "uncached"
+            span["args"]["cache"] = self.status[name]
+
+        self.outputs[name] = out
+        return out
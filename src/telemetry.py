@@ -0,0 +1,183 @@
+from __future__ import annotations
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+class Tracer:
+    """
+    Collects nested timing spans. Each span records wall and CPU seconds,
+    the process' peak RSS when it closed and event counters (e.g. model
+    fits) bumped with `count()` while it was open; counters roll up into
+    the enclosing span. Spans from worker threads/processes are recorded
+    with `capture()` and handed back to the parent with `adopt()`.
+    """
+
+    def __init__(self):
+        self.spans: list[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+
+    def _stack(self) -> list[dict]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _record(self, span: dict) -> None:
+        sink = getattr(self._local, "sink", None)
+        if sink is not None:
+            sink.append(span)
+        else:
+            with self._lock:
+                self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, cat: str = "stage", **args):
+        """Time the enclosed block; yields the span dict so callers can add `args`."""
+        stack = self._stack()
+        span = {
+            "name": name, "cat": cat, "ts": time.time(),
+            "pid": os.getpid(), "tid": threading.get_ident(),
+            "depth": len(stack), "counts": Counter(), "args": dict(args),
+        }
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span["wall_seconds"] = time.perf_counter() - wall0
+            span["cpu_seconds"] = time.process_time() - cpu0
+            span["peak_rss_mb"] = peak_rss_mb()
+            if stack:
+                stack[-1]["counts"].update(span["counts"])
+            span["counts"] = dict(span["counts"])
+            self._record(span)
+
+    def count(self, key: str, n: int = 1) -> None:
+        """Add `n` to counter `key` of the innermost open span (no-op outside spans)."""
+        stack = self._stack()
+        if stack:
+            stack[-1]["counts"][key] += n
+
+    @contextmanager
+    def capture(self):
+        """Record spans opened in this block into the yielded list instead of `spans`."""
+        saved = (getattr(self._local, "stack", None), getattr(self._local, "sink", None))
+        self._local.stack, self._local.sink = [], []
+        try:
+            yield self._local.sink
+        finally:
+            self._local.stack, self._local.sink = saved
+            if saved[0] is None:
+                del self._local.stack
+
+    def adopt(self, spans: list[dict]) -> None:
+        """Attach captured spans below the innermost open span and roll up their counters."""
+        stack = self._stack()
+        for span in spans:
+            span = {**span, "depth": span["depth"] + len(stack)}
+            if stack and span["depth"] == len(stack):
+                stack[-1]["counts"].update(span["counts"])
+            self._record(span)
+
+    def summary(self, cat: str = "stage") -> list[dict]:
+        """One row per span of category `cat`, in completion order."""
+        return [
+            {
+                "name": s["name"],
+                "wall_seconds": s["wall_seconds"],
+                "cpu_seconds": s["cpu_seconds"],
+                "peak_rss_mb": s["peak_rss_mb"],
+                "fits": s["counts"].get("fits", 0),
+                **s["args"],
+            }
+            for s in self.spans
+            if s["cat"] == cat
+        ]
+
+    def chrome_trace(self) -> dict:
+        """The spans as Chrome trace-event JSON (load in chrome://tracing or Perfetto)."""
+        events = [
+            {
+                "name": s["name"], "cat": s["cat"], "ph": "X",
+                "ts": s["ts"] * 1e6, "dur": s["wall_seconds"] * 1e6,
+                "pid": s["pid"], "tid": s["tid"],
+                "args": {**s["args"], **s["counts"], "cpu_seconds": s["cpu_seconds"],
+                         "peak_rss_mb": s["peak_rss_mb"]},
+            }
+            for s in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, outputs_dir) -> tuple[Path, Path]:
+        """Write timings.json (stage summary + all spans) and trace.json (Chrome trace format)."""
+        outputs_dir = Path(outputs_dir)
+        timings_path = outputs_dir / "timings.json"
+        trace_path = outputs_dir / "trace.json"
+        timings = {"stages": self.summary("stage"), "spans": self.spans}
+        timings_path.write_text(json.dumps(timings, indent=2, default=str), encoding="utf-8")
+        trace_path.write_text(json.dumps(self.chrome_trace(), default=str), encoding="utf-8")
+        return timings_path, trace_path
+
+TRACER = Tracer()
+
+@contextmanager
+def profiled(name: str, profiler: str | None, outdir):
+    """
+    Profile the enclosed block with cProfile (`<name>.prof`, readable with
+    pstats/snakeviz) or pyinstrument (`<name>.html`, optional dependency)
+    under `outdir`; profiler=None does nothing.
+    """
+    if profiler is None:
+        yield
+        return
+
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    if profiler == "cprofile":
+        import cProfile
+
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(outdir / f"{name}.prof")
+    elif profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as exc:
+            raise ImportError("profiler='pyinstrument' requires the pyinstrument package.") from exc
+
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            (outdir / f"{name}.html").write_text(prof.output_html(), encoding="utf-8")
+    else:
+        raise ValueError(f"Unknown profiler {profiler!r}; expected 'cprofile' or 'pyinstrument'.")
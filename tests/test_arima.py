@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.arima.model import ARIMA
+
+from src.models.arima import (
+    arima_refit_tradeoff, fit_arima_batched, forecast_arima_batched, forecast_arima_recursive,
+    search_arima_order, search_arima_order_batched, select_arima_order,
+)
+
+def _random_walk(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2000-01-01", periods=n, freq="QS")
+    return pd.Series(100 + np.cumsum(rng.normal(size=n)), index=idx)
+
+def test_filter_only_mode_matches_append_forecasts():
+    y = _random_walk()
+    train, test = y.iloc[:50], y.iloc[50:]
+
+    fc = forecast_arima_recursive(train, test, (1, 1, 0), refit_every=0, backend="serial")
+
+    res = ARIMA(train.values, order=(1, 1, 0)).fit()
+    expected = [float(res.append(test.values[:t]).forecast()[0]) if t else float(res.forecast()[0])
+                for t in range(len(test))]
+    np.testing.assert_allclose(fc.values, expected, rtol=1e-8)
+    assert len(fc.attrs["step_seconds"]) == len(test)
+
+def test_refit_tradeoff_reports_zero_drift_for_full_refit():
+    y = _random_walk()
+    table = arima_refit_tradeoff(y.iloc[:50], y.iloc[50:], (0, 1, 0), refit_every=(3, 0))
+    assert list(table["refit_every"]) == [1, 3, 0]
+    assert table.loc[0, "rmse_drift"] == 0.0
+    assert (table["mean_step_seconds"] > 0).all()
+
+def test_order_search_strategies_agree_and_report_every_candidate():
+    y = _random_walk(n=50, seed=1)
+    full_order, full = search_arima_order(y, p_max=1, q_max=1)
+    step_order, step = search_arima_order(y, p_max=1, q_max=1, method="stepwise")
+
+    assert full_order == step_order == select_arima_order(y, p_max=1, q_max=1)
+    for table in (full, step):
+        assert len(table) == 4
+        assert {"bic", "seconds", "status"} <= set(table.columns)
+    assert (full["status"] == "ok").all()
+
+@pytest.mark.filterwarnings("ignore:Non-:UserWarning")
+def test_stepwise_search_can_stop_at_a_local_minimum():
+    # the differences follow an AR(3) with only a lag-3 term: no small order nor
+    # any neighbour of the first stepwise best is close to ARIMA(3,1,0)
+    rng = np.random.default_rng(0)
+    e, d = rng.normal(size=63), np.zeros(63)
+    for t in range(3, 63):
+        d[t] = 0.6 * d[t - 3] + e[t]
+    y = pd.Series(100 + np.cumsum(d[3:]), index=pd.date_range("2000-01-01", periods=60, freq="QS"))
+
+    full_order, full = search_arima_order(y, p_max=3, q_max=3)
+    step_order, step = search_arima_order(y, p_max=3, q_max=3, method="stepwise")
+    assert full_order == (3, 1, 0) and step_order == (1, 1, 1)
+    assert step.set_index(["p", "q"]).loc[(3, 0), "status"] == "not_visited"
+    assert full["bic"].min() < step["bic"].min()
+
+def test_batched_fit_matches_statsmodels_per_series():
+    panel = pd.DataFrame({f"s{i}": _random_walk(n=60, seed=i) for i in range(4)})
+    for order in [(1, 1, 0), (0, 1, 1), (1, 1, 1)]:
+        fit = fit_arima_batched(panel, order)
+        for col in panel:
+            res = ARIMA(panel[col].values, order=order).fit()
+            np.testing.assert_allclose(fit.loc[col, res.param_names], res.params, atol=2e-3)
+            np.testing.assert_allclose(fit.loc[col, "llf"], res.llf, atol=1e-3)
+
+    orders, table = search_arima_order_batched(panel, p_max=1, q_max=1)
+    assert len(table) == 4 * len(panel.columns)
+    for col in panel:
+        assert orders[col] == select_arima_order(panel[col], p_max=1, q_max=1)
+
+def test_rolling_window_refits_on_the_last_observations():
+    y = _random_walk()
+    train, test = y.iloc[:50], y.iloc[50:]
+
+    fc = forecast_arima_recursive(train, test, (1, 1, 0), refit_every=1, backend="serial",
+                                  window="rolling", window_size=30)
+
+    expected = [float(ARIMA(y.values[50 + t - 30 : 50 + t], order=(1, 1, 0)).fit().forecast()[0])
+                for t in range(len(test))]
+    np.testing.assert_allclose(fc.values, expected, rtol=1e-8)
+
+def test_batched_recursive_forecasts_track_statsmodels():
+    panel = pd.DataFrame({f"s{i}": _random_walk(n=60, seed=i) for i in range(3)})
+    fc = forecast_arima_batched(panel, 50, (1, 1, 0), refit_every=1)
+    assert list(fc.columns) == list(panel.columns) and fc.index.equals(panel.index[50:])
+    for col in panel:
+        expected = forecast_arima_recursive(panel[col].iloc[:50], panel[col].iloc[50:], (1, 1, 0),
+                                            refit_every=1, backend="serial")
+        np.testing.assert_allclose(fc[col], expected, rtol=1e-4)
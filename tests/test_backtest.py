@@ -0,0 +1,67 @@
+import pytest
+
+from src.backtest import run_backtest
+from src.io import load_excel, build_master, select_pair, train_test_split_index
+from src.models.var import forecast_var_recursive
+from src.config import CFG
+
+def _square(x):
+    return x * x
+
+CALLS = []
+
+def _flaky_square(x):
+    CALLS.append(x)
+    if x == 3 and CALLS.count(3) == 1:
+        raise MemoryError("preempted")
+    return x * x
+
+@pytest.mark.parametrize("backend", ["serial", "thread", "process"])
+def test_run_backtest_preserves_task_order(backend):
+    assert run_backtest(_square, range(10), backend=backend, max_workers=2) == [x * x for x in range(10)]
+
+def test_run_backtest_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        run_backtest(_square, [1, 2], backend="gpu")
+
+def test_var_forecast_thread_backend_matches_serial():
+    df_y, df_x = load_excel(CFG.data_path, CFG.date_col)
+    pair = select_pair(build_master(df_y, df_x))
+    split = train_test_split_index(pair)
+
+    kwargs = dict(
+        df_pair_level=pair,
+        train_end=split["cutoff_date"],
+        test_idx=split["test_idx"],
+        selected_lag=2,
+        target_col=CFG.target_col,
+    )
+    serial = forecast_var_recursive(**kwargs, backend="serial")
+    threaded = forecast_var_recursive(**kwargs, backend="thread", max_workers=2)
+    assert serial.index.equals(threaded.index)
+    assert (serial.values == threaded.values).all()
+
+def test_checkpoint_resumes_from_first_missing_origin(tmp_path):
+    CALLS.clear()
+    with pytest.raises(MemoryError):
+        run_backtest(_flaky_square, range(6), backend="serial", checkpoint=tmp_path)
+    assert CALLS == [0, 1, 2, 3]
+
+    assert run_backtest(_flaky_square, range(6), backend="serial", checkpoint=tmp_path) == [x * x for x in range(6)]
+    assert CALLS[4:] == [3, 4, 5]
+
+    # changed inputs are refitted, unchanged ones come from the log
+    assert run_backtest(_flaky_square, [0, 1, 7], backend="serial", checkpoint=tmp_path) == [0, 1, 49]
+    assert CALLS[7:] == [7]
+    assert len(list(tmp_path.glob("flaky_square-*.jsonl"))) == 1
+
+def test_stale_checkpoint_logs_survive_until_a_run_completes(tmp_path):
+    stale = tmp_path / "flaky_square-0000000000000000.jsonl"
+    stale.write_text("")
+    CALLS.clear()
+    with pytest.raises(MemoryError):
+        run_backtest(_flaky_square, range(6), backend="serial", checkpoint=tmp_path)
+    assert stale.exists()
+
+    run_backtest(_flaky_square, range(6), backend="serial", checkpoint=tmp_path)
+    assert not stale.exists() and len(list(tmp_path.glob("flaky_square-*.jsonl"))) == 1
@@ -0,0 +1,54 @@
+import json
+from dataclasses import replace
+
+import pandas as pd
+import pytest
+
+from src.batch import pair_dirname, run_batch
+from src.io import read_columnar
+from src.config import CFG
+
+def test_batch_runs_spec_pairs_and_writes_consolidated_outputs(tmp_path):
+    spec = tmp_path / "pairs.csv"
+    pd.DataFrame({
+        "target_col": [CFG.target_col, CFG.target_col, CFG.target_col],
+        "x_col": [CFG.x_col, "b1g_66_clv_qna_sa", "not_a_column"],
+    }).to_csv(spec, index=False)
+
+    cfg = replace(CFG, outputs_dir=tmp_path / "outputs", backtest_checkpoint=True)
+    table = run_batch(spec, models=("arima", "var"), cfg=cfg, backend="serial")
+    assert not (cfg.outputs_dir / "checkpoints").exists()
+
+    ok = table[table["status"] == "ok"]
+    assert set(ok["x_col"]) == {CFG.x_col, "b1g_66_clv_qna_sa"}
+    assert set(ok["model"]) == {"ARIMA", "VAR"}
+    assert (table.loc[table["x_col"] == "not_a_column", "status"] == "failed").all()
+
+    written = pd.read_csv(tmp_path / "outputs" / "batch" / "rmse.csv")
+    assert len(written) == len(table)
+
+    fc_dir = tmp_path / "outputs" / "batch" / "forecasts" / pair_dirname(CFG.target_col, CFG.x_col)
+    fc = read_columnar(fc_dir)
+    assert {"date", "actual_level", "arima_forecast", "var_forecast"} <= set(fc.columns)
+    assert fc["arima_forecast"].notna().all()
+    meta = json.loads((fc_dir / "schema.json").read_text(encoding="utf-8"))["meta"]
+    assert meta == {"target_col": CFG.target_col, "x_col": CFG.x_col}
+
+def test_pair_dirnames_are_path_safe_and_distinct():
+    names = [pair_dirname("gdp", x) for x in ("a/b", "a b", "A b", "../..", "a_b")]
+    assert len(set(names)) == len(names)
+    assert all(n.startswith("gdp__") and "/" not in n and " " not in n and ".." not in n for n in names)
+
+def test_vectorized_batch_matches_pair_by_pair(tmp_path):
+    spec = tmp_path / "pairs.csv"
+    pd.DataFrame({"x_col": [CFG.x_col, "b1g_66_clv_qna_sa", "b1g_lmn_hsifim_clv_qna_sa"]}).to_csv(spec, index=False)
+    tables = {}
+    for vectorized in (False, True):
+        cfg = replace(CFG, outputs_dir=tmp_path / str(vectorized))
+        tables[vectorized] = run_batch(spec, models=("arima", "var"), cfg=cfg, backend="serial", vectorized=vectorized)
+
+    merged = tables[False].merge(tables[True], on=["x_col", "model"])
+    assert len(merged) == 6
+    assert merged["rmse_y"].to_numpy() == pytest.approx(merged["rmse_x"].to_numpy(), rel=1e-10)
+    fc = read_columnar(tmp_path / "True" / "batch" / "forecasts" / pair_dirname(CFG.target_col, "b1g_66_clv_qna_sa"))
+    assert fc["var_forecast"].notna().all()
@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.bench import BASELINE_PATH, compare_results, run_suite
+from benchmarks.synthetic import synthetic_levels
+
+def test_synthetic_levels_shape_and_suite_output(tmp_path):
+    levels = synthetic_levels(300, width=3)
+    assert levels.shape == (300, 3)
+    assert list(levels.columns) == ["y", "x1", "x2"]
+    assert levels.index.is_monotonic_increasing
+
+    result = run_suite(sizes=(200,), stages=["make_lag_features", "forecast_var_recursive_rls"],
+                       repeat=1, workdir=tmp_path)
+    assert {r["stage"] for r in result["results"]} == {"make_lag_features", "forecast_var_recursive_rls"}
+    assert all(r["seconds"] > 0 for r in result["results"])
+
+    slower = {"results": [{**r, "seconds": r["seconds"] * 2 + 1.0} for r in result["results"]]}
+    assert compare_results(result, slower)["regressed"].all()
+    assert not compare_results(result, result)["regressed"].any()
+
+@pytest.mark.benchmark
+def test_no_stage_regresses_against_baseline(tmp_path):
+    # timings are machine-local, so no baseline is committed: an opted-in run without one is an error
+    if not BASELINE_PATH.exists():
+        pytest.fail(f"no benchmark baseline at {BASELINE_PATH}; record one on this machine with "
+                    "`python -m benchmarks.bench run --save-baseline`, then rerun `pytest -m benchmark`")
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    params = baseline["meta"]["params"]
+
+    current = run_suite(**params, workdir=tmp_path)
+    table = compare_results(baseline, current, threshold=float(os.environ.get("BENCH_THRESHOLD", "0.25")))
+    assert not table["regressed"].any(), "\n" + table[table["regressed"]].to_string(index=False)
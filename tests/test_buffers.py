@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from src.buffers import HistoryBuffer
+
+def test_history_buffer_grows_and_returns_views():
+    buf = HistoryBuffer(n_features=2, capacity=2)
+    for i in range(5):
+        buf.append([i, 10 * i], float(i), date=pd.Timestamp("2000-01-01") + pd.DateOffset(months=3 * i))
+
+    assert len(buf) == 5
+    assert buf.capacity == 8
+    assert np.shares_memory(buf.X, buf._X)
+    np.testing.assert_array_equal(buf.X[:, 1], [0, 10, 20, 30, 40])
+    np.testing.assert_array_equal(buf.y, [0, 1, 2, 3, 4])
+
+def test_earlier_view_survives_growth():
+    buf = HistoryBuffer(n_features=1, capacity=1)
+    buf.append([1.0], 1.0)
+    view = buf.X
+    buf.extend([[2.0], [3.0], [4.0]], [2.0, 3.0, 4.0])
+    np.testing.assert_array_equal(view, [[1.0]])
+    np.testing.assert_array_equal(buf.X.ravel(), [1.0, 2.0, 3.0, 4.0])
+
+def test_from_frame_round_trip_and_dtype():
+    idx = pd.date_range("2010-01-01", periods=3, freq="QS")
+    X = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [4.0, 5.0, 6.0]}, index=idx)
+    y = pd.Series([7.0, 8.0, 9.0], index=idx)
+
+    buf = HistoryBuffer.from_frame(X, y, dtype="float32")
+    assert buf.X.dtype == np.float32
+
+    X_back, y_back = buf.to_frame(columns=X.columns)
+    pd.testing.assert_frame_equal(X_back, X.astype("float32"), check_freq=False)
+    pd.testing.assert_series_equal(y_back, y.astype("float32"), check_freq=False)
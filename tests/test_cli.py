@@ -0,0 +1,42 @@
+import subprocess
+import sys
+from dataclasses import replace
+
+import pandas as pd
+import pytest
+
+from src.cli import apply_overrides, parse_override
+from src.config import CFG
+from src.pipeline import run_all
+
+def test_overrides_are_parsed_to_the_config_field_types():
+    cfg = apply_overrides(CFG, [
+        "var_method=rls", "backtest_workers=none", "arima_refit_tradeoff=1,4,0",
+        "analysis_end=2024-01-01", "stage_cache=false", "train_ratio=0.7",
+    ])
+    assert cfg.var_method == "rls"
+    assert cfg.backtest_workers is None
+    assert cfg.arima_refit_tradeoff == (1, 4, 0)
+    assert cfg.analysis_end == pd.Timestamp("2024-01-01")
+    assert cfg.stage_cache is False
+    assert cfg.train_ratio == 0.7
+
+    with pytest.raises(ValueError):
+        parse_override("not_a_field=1")
+    with pytest.raises(ValueError):
+        parse_override("lags=four")
+
+def test_single_model_run_skips_other_models_and_report(tmp_path):
+    cfg = replace(CFG, outputs_dir=tmp_path, cache_dir=tmp_path / ".cache")
+    meta = run_all(cfg, models="var", skip_report=True)
+
+    assert set(meta["stages"]) == {"data", "var_select", "var_forecast"}
+    assert meta["outputs"]["report_html"] is None
+    assert list(pd.read_csv(tmp_path / "rmse.csv")["Model"]) == ["VAR"]
+    assert list(pd.read_csv(tmp_path / "forecasts.csv").columns) == ["date", "actual_level", "var_forecast"]
+    assert not (tmp_path / "report.html").exists()
+
+def test_cli_import_does_not_load_model_libraries():
+    code = "import sys, src.cli, src.pipeline; print(sorted({'sklearn', 'statsmodels', 'matplotlib', 'jinja2'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
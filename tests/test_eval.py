@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.eval import reconstruct_levels_from_diffs
+
+def _levels():
+    idx = pd.date_range("2010-01-01", periods=6, freq="QS")
+    return pd.DataFrame({"y": [10.0, 12.0, 11.0, 15.0, 14.0, 18.0], "x": 0.0}, index=idx)
+
+def test_reconstruct_levels_one_path():
+    df = _levels()
+    dates = df.index[3:]
+    pred, actual = reconstruct_levels_from_diffs(df, "y", dates, [1.0, -1.0, 2.0])
+    np.testing.assert_allclose(pred.values, [12.0, 14.0, 16.0])
+    np.testing.assert_allclose(actual.values, [15.0, 14.0, 18.0])
+    assert pred.index.equals(dates)
+
+def test_reconstruct_levels_matrix_of_paths():
+    df = _levels()
+    dates = df.index[3:]
+    diffs = np.array([[1.0, 0.0], [-1.0, 0.0], [2.0, 0.0]])
+    pred, _ = reconstruct_levels_from_diffs(df, "y", dates, diffs, columns=["nn", "zero"])
+    np.testing.assert_allclose(pred["nn"].values, [12.0, 14.0, 16.0])
+    np.testing.assert_allclose(pred["zero"].values, [11.0, 15.0, 14.0])
+
+def test_reconstruct_levels_rejects_unknown_dates():
+    df = _levels()
+    with pytest.raises(KeyError):
+        reconstruct_levels_from_diffs(df, "y", pd.DatetimeIndex(["1999-01-01"]), [0.0])
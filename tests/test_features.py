@@ -1,3 +1,6 @@
+import numpy as np
+import pandas as pd
+
 from src.io import load_excel, build_master, select_pair
 from src.features import make_lag_features
 from src.config import CFG
@@ -14,3 +17,40 @@ def test_make_lag_features_shape_and_na():
 
     # Expect 2*lags columns: dy_lag1..L and x_lag1..L
     assert X.shape[1] == 2 * CFG.lags
+
+def _shift_loop_reference(trans, lags):
+    # previous implementation: one shift + column insertion per lag and column, then dropna
+    data = {"target_diff": trans["dy"]}
+    for l in range(1, lags + 1):
+        for c in trans.columns:
+            data[f"{c}_lag{l}"] = trans[c].shift(l)
+    data = pd.DataFrame(data).dropna()
+    return data.drop(columns=["target_diff"]), data["target_diff"]
+
+def test_make_lag_features_matches_shift_loop():
+    df_y, df_x = load_excel(CFG.data_path, CFG.date_col)
+    pair = select_pair(build_master(df_y, df_x))
+    trans = pd.DataFrame({"dy": pair[CFG.target_col].diff(), "x": pair[CFG.x_col]}).dropna()
+
+    X_ref, y_ref = _shift_loop_reference(trans, CFG.lags)
+    X, y = make_lag_features(pair)
+    pd.testing.assert_frame_equal(X, X_ref)
+    pd.testing.assert_series_equal(y, y_ref)
+
+def test_bonus_features_matches_shift_loop_with_gaps():
+    from src.models.bonus_nn import bonus_features
+
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2000-01-01", periods=30, freq="QS")
+    df_b = pd.DataFrame({
+        "y": 1000 + rng.normal(size=30).cumsum(),
+        "big": 500 + rng.normal(size=30).cumsum(),
+        "small": rng.normal(size=30),
+    }, index=idx)
+    df_b.iloc[12, 2] = np.nan  # interior gap is dropped like dropna()
+
+    trans = pd.DataFrame({"dy": df_b["y"].diff(), "big": df_b["big"].diff(), "small": df_b["small"]})
+    X_ref, y_ref = _shift_loop_reference(trans, 3)
+    X, y = bonus_features(df_b, "y", ["big", "small"], lags=3)
+    pd.testing.assert_frame_equal(X, X_ref)
+    pd.testing.assert_series_equal(y, y_ref)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from src.fitcache import FitCache, FIT_CACHE
+from src.models.arima import forecast_arima_recursive, search_arima_order, select_arima_order
+
+def test_lru_eviction_and_counters():
+    cache = FitCache(maxsize=2)
+    calls = []
+
+    def fit(tag):
+        return lambda: calls.append(tag) or tag
+
+    data = np.arange(5.0)
+    assert cache.get_or_fit(data, "M", 1, fit("a")) == "a"
+    assert cache.get_or_fit(data, "M", 2, fit("b")) == "b"
+    assert cache.get_or_fit(data, "M", 1, fit("a2")) == "a"  # hit refreshes "a"
+    cache.get_or_fit(data, "M", 3, fit("c"))                 # evicts "b"
+    assert cache.get_or_fit(data, "M", 2, fit("b2")) == "b2"
+    assert calls == ["a", "b", "c", "b2"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 4
+
+def test_persisted_fits_are_reused_by_a_new_cache(tmp_path):
+    FitCache(persist_dir=tmp_path).get_or_fit([1.0, 2.0], "M", (1, 0), lambda: {"fit": 1})
+    fresh = FitCache(persist_dir=tmp_path)
+    assert fresh.get_or_fit([1.0, 2.0], "M", (1, 0), lambda: {"fit": 2}) == {"fit": 1}
+    assert fresh.hits == 1 and fresh.misses == 0
+
+def test_arima_selection_fit_is_reused_by_first_forecast_origin():
+    rng = np.random.default_rng(3)
+    y = pd.Series(100 + np.cumsum(rng.normal(size=45)))
+    train, test = y.iloc[:40], y.iloc[40:]
+
+    FIT_CACHE.clear()
+    order = select_arima_order(train, p_max=1, q_max=0)
+    misses = FIT_CACHE.misses
+    forecast_arima_recursive(train, test, order, refit_every=0, backend="serial")
+    assert FIT_CACHE.hits == 1
+    assert FIT_CACHE.misses == misses
+
+def test_parallel_arima_search_fits_are_reused_by_the_parent():
+    rng = np.random.default_rng(3)
+    y = pd.Series(100 + np.cumsum(rng.normal(size=45)))
+    train, test = y.iloc[:40], y.iloc[40:]
+
+    FIT_CACHE.clear()
+    order, _ = search_arima_order(train, p_max=1, q_max=0, workers=2)
+    forecast_arima_recursive(train, test, order, refit_every=0, backend="serial")
+    assert FIT_CACHE.hits == 1
+    assert FIT_CACHE.misses == 0
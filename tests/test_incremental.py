@@ -0,0 +1,71 @@
+from dataclasses import replace
+
+import shutil
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_levels, write_workbook
+from src.config import CFG
+from src.incremental import diff_levels, load_snapshot, pinned_split, run_incremental
+from src.models.var import forecast_var_recursive
+from src.pipeline import run_all
+
+def test_diff_levels_finds_appended_revised_and_removed_dates():
+    old = synthetic_levels(10)
+    new = synthetic_levels(12)
+    new.iloc[6, 1] += 1.0
+
+    diff = diff_levels(old, new)
+    assert diff["appended"] == list(new.index[10:])
+    assert diff["revised"] == [new.index[6]]
+    assert diff["removed"] == []
+    assert diff["first_changed"] == new.index[6]
+    assert diff_levels(old, old.iloc[:-1])["removed"] == [old.index[-1]]
+
+def test_incremental_run_only_forecasts_new_and_revised_origins(tmp_path):
+    levels = synthetic_levels(60, seed=1)
+    # default checkpoint setting: the forecast stages only record their origins in the stage cache
+    cfg = replace(CFG, data_path=tmp_path / "data.xlsx", outputs_dir=tmp_path / "out",
+                  cache_dir=tmp_path / "out" / ".cache", target_col="y", x_col="x1",
+                  arima_p_max=1, arima_q_max=0)
+    write_workbook(levels.iloc[:-2], cfg.data_path)
+    run_all(cfg, models="arima,var", skip_report=True)
+    first = pd.read_csv(cfg.outputs_dir / "forecasts.csv")
+
+    # two new periods plus a revision two periods before the old end
+    revised = levels.copy()
+    revised.iloc[-5, 0] += 5.0
+    write_workbook(revised, cfg.data_path)
+    summary = run_incremental(cfg, models="var")
+
+    assert summary["mode"] == "incremental" and set(summary["models"]) == {"arima", "var"}
+    assert len(summary["appended"]) == 2 and len(summary["revised"]) == 1
+    n_origins = summary["models"]["var"]["origins"]
+    assert n_origins == len(first) + 2
+    # origins up to the revised date only saw unchanged history
+    assert summary["models"]["var"]["reused"] == n_origins - 4
+
+    out = pd.read_csv(cfg.outputs_dir / "forecasts.csv")
+    meta, _ = load_snapshot(cfg)
+    split = pinned_split(revised, meta["cutoff_date"])
+    expected = forecast_var_recursive(revised, split["cutoff_date"], split["test_idx"], meta["selections"]["var_lag"],
+                                      "y", method="ols", backend="serial", checkpoint=False)
+    assert out["var_forecast"].to_numpy() == pytest.approx(expected.to_numpy(), rel=1e-12)
+    assert out["arima_forecast"].notna().all()
+    assert list(pd.read_csv(cfg.outputs_dir / "rmse.csv")["Model"]) == ["ARIMA", "VAR"]
+
+    # without the per-origin logs nothing can be reused: full rerun
+    meta, _ = load_snapshot(cfg)
+    for log_dir in meta["logs"].values():
+        shutil.rmtree(log_dir)
+    revised.iloc[-1, 0] += 1.0
+    write_workbook(revised, cfg.data_path)
+    assert run_incremental(cfg, models="var")["mode"] == "full"
+    assert "arima_forecast" in pd.read_csv(cfg.outputs_dir / "forecasts.csv")
+    assert not (cfg.outputs_dir / "checkpoints").exists()
+
+    # a revision inside the training range changes the selections: full rerun
+    revised.iloc[3, 0] += 5.0
+    write_workbook(revised, cfg.data_path)
+    assert run_incremental(cfg, models="var")["mode"] == "full"
@@ -1,4 +1,6 @@
-from src.io import load_excel, build_master, select_pair
+from concurrent.futures import ProcessPoolExecutor
+
+from src.io import _entries_dir, load_excel, build_master, select_pair, read_columnar, warm_cache
 from src.config import CFG
 
 def test_load_and_select_pair_smoke():
@@ -13,3 +15,73 @@ def test_load_and_select_pair_smoke():
     assert CFG.target_col in pair.columns
     assert CFG.x_col in pair.columns
     assert len(pair) > 10  # sanity
+
+def test_columnar_cache_matches_excel_and_invalidates(tmp_path):
+    import os
+    import shutil
+    import pandas as pd
+
+    workbook = tmp_path / "data.xlsx"
+    shutil.copy(CFG.data_path, workbook)
+    cache_dir = tmp_path / "cache"
+
+    raw = load_excel(workbook, CFG.date_col, use_cache=False)
+    cached = load_excel(workbook, CFG.date_col, use_cache=True, cache_dir=cache_dir)
+    for a, b in zip(raw, cached):
+        pd.testing.assert_frame_equal(a, b)
+
+    entries = _entries_dir(workbook, cache_dir)
+    first = {p.name for p in entries.iterdir() if p.is_dir()}
+    assert len(first) == 1
+
+    # touching the workbook produces a new key and drops the stale entry
+    st = workbook.stat()
+    os.utime(workbook, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    load_excel(workbook, CFG.date_col, use_cache=True, cache_dir=cache_dir)
+    second = {p.name for p in entries.iterdir() if p.is_dir()}
+    assert len(second) == 1 and second != first
+
+def test_projection_pushdown_matches_full_load():
+    import pandas as pd
+    from src.io import required_columns
+
+    full = select_pair(build_master(*load_excel(CFG.data_path, CFG.date_col)))
+    df_y, df_x = load_excel(
+        CFG.data_path, CFG.date_col, columns=required_columns(), analysis_end=CFG.analysis_end
+    )
+    assert set(df_y.columns) | set(df_x.columns) == {CFG.date_col, CFG.target_col, CFG.x_col}
+    assert df_y[CFG.date_col].max() <= CFG.analysis_end
+
+    pd.testing.assert_frame_equal(select_pair(build_master(df_y, df_x)), full)
+
+def test_concurrent_warm_cache_and_same_named_workbooks(tmp_path):
+    import shutil
+    import numpy as np
+
+    workbooks = [tmp_path / name / "data.xlsx" for name in ("a", "b")]
+    for workbook in workbooks:
+        workbook.parent.mkdir()
+        shutil.copy(CFG.data_path, workbook)
+    cache_dir = tmp_path / "cache"
+
+    with ProcessPoolExecutor(max_workers=4) as ex:
+        entries = list(ex.map(warm_cache, [workbooks[0]] * 4, [CFG.date_col] * 4, [cache_dir] * 4))
+    assert len(set(entries)) == 1 and (entries[0] / "complete").exists()
+    assert not list(_entries_dir(workbooks[0], cache_dir).glob(".tmp-*"))
+
+    # a workbook of the same name elsewhere gets its own entries and keeps the first one
+    warm_cache(workbooks[1], CFG.date_col, cache_dir)
+    assert (entries[0] / "complete").exists()
+
+    # numeric columns stay backed by the memory map
+    base = read_columnar(entries[0] / "data_y").iloc[:, 1].to_numpy()
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+
+def test_pipeline_load_is_not_traced():
+    import tracemalloc
+    from src.pipeline import stage_data
+
+    assert stage_data(CFG)["data_load"]["peak_mb"] is None
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from src.models.nn import PARAM_GRIDS, forecast_nn_ensemble, forecast_nn_recursive, search_nn_params
+
+PARAMS = {"hidden_layer_sizes": (3,), "activation": "tanh", "alpha": 0.01, "learning_rate_init": 0.01}
+
+def _toy_features(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2000-01-01", periods=n, freq="QS")
+    X = pd.DataFrame(rng.normal(size=(n, 4)), index=idx, columns=[f"f{i}" for i in range(4)])
+    y = pd.Series(X.values @ np.array([0.5, -0.2, 0.1, 0.0]) + rng.normal(scale=0.1, size=n), index=idx)
+    return X.iloc[:40], y.iloc[:40], X.iloc[40:], y.iloc[40:]
+
+def test_warm_mode_with_full_retrain_every_step_matches_refit():
+    X_tr, y_tr, X_te, y_te = _toy_features()
+    refit = forecast_nn_recursive(X_tr, y_tr, X_te, y_te, PARAMS, random_state=0, mode="refit", backend="serial")
+    warm = forecast_nn_recursive(X_tr, y_tr, X_te, y_te, PARAMS, random_state=0, mode="warm", full_retrain_every=1)
+    np.testing.assert_allclose(warm, refit)
+
+def test_warm_mode_returns_one_prediction_per_origin():
+    X_tr, y_tr, X_te, y_te = _toy_features()
+    warm = forecast_nn_recursive(X_tr, y_tr, X_te, y_te, PARAMS, random_state=0, mode="warm", warm_max_iter=20)
+    assert len(warm) == len(X_te)
+    assert np.isfinite(warm).all()
+
+def test_halving_search_returns_grid_params_and_trace():
+    X_tr, y_tr, _, _ = _toy_features()
+    params, trace = search_nn_params(
+        X_tr, y_tr, random_state=0, method="halving", min_iter=20, max_iter=80, n_jobs=1
+    )
+    grid = PARAM_GRIDS["default"]
+    assert set(params) == set(grid)
+    assert all(params[k] in grid[k] for k in grid)
+
+    per_round = trace.groupby("round")["max_iter"].first()
+    assert per_round.iloc[-1] == 80
+    assert per_round.is_monotonic_increasing
+    assert trace.groupby("round").size().is_monotonic_decreasing
+
+def test_window_policies_bound_or_weight_the_history():
+    X_tr, y_tr, X_te, y_te = _toy_features()
+    kwargs = dict(random_state=0, window_size=20, window_halflife=5.0)
+    for window in ("rolling", "exponential"):
+        refit = forecast_nn_recursive(X_tr, y_tr, X_te, y_te, PARAMS, mode="refit", backend="serial",
+                                      window=window, **kwargs)
+        warm = forecast_nn_recursive(X_tr, y_tr, X_te, y_te, PARAMS, mode="warm", full_retrain_every=1,
+                                     window=window, **kwargs)
+        np.testing.assert_allclose(warm, refit)
+
+    # a rolling origin only sees its last window_size rows
+    last = forecast_nn_recursive(X_tr, y_tr, X_te.iloc[:1], y_te.iloc[:1], PARAMS, mode="refit", backend="serial",
+                                 window="rolling", **kwargs)
+    short = forecast_nn_recursive(X_tr.iloc[-20:], y_tr.iloc[-20:], X_te.iloc[:1], y_te.iloc[:1], PARAMS,
+                                  mode="refit", backend="serial", **kwargs)
+    np.testing.assert_allclose(last, short)
+
+def test_ensemble_workers_read_shared_history_and_match_single_seeds():
+    X_tr, y_tr, X_te, y_te = _toy_features()
+    serial = forecast_nn_ensemble(X_tr, y_tr, X_te, y_te, PARAMS, seeds=[0, 1], backend="serial")
+    parallel = forecast_nn_ensemble(X_tr, y_tr, X_te, y_te, PARAMS, seeds=[0, 1], backend="process", max_workers=2)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+    for seed in (0, 1):
+        single = forecast_nn_recursive(X_tr, y_tr, X_te, y_te, PARAMS, random_state=seed, mode="refit",
+                                       backend="serial")
+        np.testing.assert_allclose(serial[f"seed_{seed}"], single)
+    np.testing.assert_allclose(serial["mean"], serial[["seed_0", "seed_1"]].mean(axis=1))
+    np.testing.assert_allclose(serial["std"], serial[["seed_0", "seed_1"]].std(axis=1))
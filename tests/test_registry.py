@@ -0,0 +1,74 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from src.config import CFG
+from src.io import data_fingerprint
+from src.pipeline import stage_data
+from src.registry import ModelRegistry, load_or_fit
+from src.serve import ForecastState
+
+NN_PARAMS = {"hidden_layer_sizes": (5,), "activation": "relu", "alpha": 0.01, "learning_rate_init": 0.01}
+
+def _levels():
+    return stage_data(CFG)["df_pair_level"][[CFG.target_col, CFG.x_col]]
+
+def test_saved_state_restores_forecasts_and_updates(tmp_path):
+    levels = _levels()
+    state = ForecastState(levels.iloc[:-2], CFG.target_col, CFG.x_col, arima_order=(1, 1, 1),
+                          var_lag=1, nn_params=NN_PARAMS)
+    registry = ModelRegistry(root=tmp_path)
+    registry.save(state, CFG, "vintage-1")
+    restored = registry.load(registry.key(CFG, state.models, "vintage-1"))
+
+    assert isinstance(np.load(tmp_path / registry.key(CFG, state.models, "vintage-1") / "nn_history_X.npy",
+                              mmap_mode="r"), np.memmap)
+    assert restored.forecast() == pytest.approx(state.forecast(), rel=1e-9)
+
+    # the restored models (incl. the MLP's optimizer state) keep updating identically
+    for date, row in levels.iloc[-2:].iterrows():
+        state.observe(date, row.iloc[0], row.iloc[1])
+        restored.observe(date, row.iloc[0], row.iloc[1])
+    assert restored.forecast() == pytest.approx(state.forecast(), rel=1e-9)
+
+def test_load_or_fit_updates_an_older_vintage_instead_of_refitting(tmp_path):
+    levels = _levels()
+    registry = ModelRegistry(root=tmp_path)
+    old = ForecastState(levels.iloc[:-3], CFG.target_col, CFG.x_col, models=("var",), var_lag=2)
+    registry.save(old, CFG, "older-vintage")
+
+    state, source = load_or_fit(CFG, models="var", registry=registry)
+    assert source == "updated"
+    assert state.last_date == levels.index[-1]
+    full = ForecastState(levels, CFG.target_col, CFG.x_col, models=("var",), var_lag=2)
+    assert state.forecast()["var"] == pytest.approx(full.forecast()["var"], rel=1e-9)
+
+    _, source = load_or_fit(CFG, models="var", registry=registry)
+    assert source == "hit"
+    assert (tmp_path / registry.key(CFG, ("var",), data_fingerprint(CFG.data_path, CFG.cache_dir))).is_dir()
+
+def test_default_registry_lives_under_the_config_outputs_dir(tmp_path):
+    cfg = replace(CFG, outputs_dir=tmp_path)
+    assert ModelRegistry(cfg).root == tmp_path / "models"
+    _, source = load_or_fit(cfg, models="var")
+    assert source == "fitted" and len(ModelRegistry(cfg).manifests()) == 1
+
+def test_windowed_state_round_trips_with_its_window(tmp_path):
+    levels = _levels()
+    state = ForecastState(levels.iloc[:-3], CFG.target_col, CFG.x_col, arima_order=(1, 1, 0), var_lag=2,
+                          nn_params=NN_PARAMS, window="rolling", window_size=30)
+    registry = ModelRegistry(root=tmp_path)
+    registry.save(state, CFG, "vintage-1")
+    restored = registry.load(registry.key(CFG, state.models, "vintage-1"))
+    assert (restored.window, restored.window_size) == ("rolling", 30) and restored._var.window == 28
+
+    for date, row in levels.iloc[-3:].iterrows():
+        state.observe(date, row.iloc[0], row.iloc[1])
+        restored.observe(date, row.iloc[0], row.iloc[1])
+    assert restored.forecast() == pytest.approx(state.forecast(), rel=1e-9)
+
+    # the rolling VAR matches a fresh fit on the last window
+    fresh = ForecastState(levels.iloc[-31:], CFG.target_col, CFG.x_col, models=("var",), var_lag=2,
+                          window="rolling", window_size=30)
+    assert restored.forecast()["var"] == pytest.approx(fresh.forecast()["var"], rel=1e-8)
@@ -0,0 +1,48 @@
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from src.scaling import StreamingStandardizer
+
+def test_streaming_updates_match_standard_scaler():
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=1000.0, scale=50.0, size=(120, 5))
+    X[:, 3] = 7.0  # constant feature stays unscaled
+
+    scaler = StreamingStandardizer().fit(X[:40])
+    for row in X[40:]:
+        scaler.update(row)
+
+    ref = StandardScaler().fit(X)
+    np.testing.assert_allclose(scaler.mean_, ref.mean_, rtol=1e-12)
+    np.testing.assert_allclose(scaler.var_, ref.var_, rtol=1e-10)
+    np.testing.assert_allclose(scaler.scale_, ref.scale_, rtol=1e-10)
+    np.testing.assert_allclose(scaler.transform(X), ref.transform(X), rtol=1e-9, atol=1e-9)
+
+def test_partial_fit_batches_and_snapshot_is_frozen():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(60, 3))
+
+    scaler = StreamingStandardizer()
+    for chunk in np.array_split(X, 4):
+        scaler.partial_fit(chunk)
+    np.testing.assert_allclose(scaler.transform(X), StandardScaler().fit_transform(X), atol=1e-12)
+
+    snap = scaler.snapshot()
+    scaler.update(np.full(3, 100.0))
+    np.testing.assert_allclose(snap.mean_, X.mean(axis=0), atol=1e-12)
+    assert snap.n_samples_seen_ == 60
+
+def test_downdate_keeps_a_rolling_window():
+    rng = np.random.default_rng(2)
+    X = rng.normal(loc=50.0, size=(100, 4))
+    window = 25
+
+    scaler = StreamingStandardizer().fit(X[:window])
+    for t in range(window, len(X)):
+        scaler.update(X[t])
+        scaler.downdate(X[t - window])
+
+    ref = StandardScaler().fit(X[-window:])
+    np.testing.assert_allclose(scaler.mean_, ref.mean_, rtol=1e-12)
+    np.testing.assert_allclose(scaler.var_, ref.var_, rtol=1e-8)
+    assert scaler.n_samples_seen_ == window
@@ -0,0 +1,120 @@
+import asyncio
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from src.config import CFG
+from src.models.var import RecursiveVAR
+from src.pipeline import config_key, stage_data
+from src.serve import ForecastClient, ForecastServer, ForecastState, load_test
+
+def _levels():
+    return stage_data(CFG)["df_pair_level"][[CFG.target_col, CFG.x_col]]
+
+def test_observe_updates_models_incrementally():
+    levels = _levels()
+    state = ForecastState(levels.iloc[:-3], CFG.target_col, CFG.x_col, models=("arima", "var"),
+                          arima_order=(1, 1, 1), var_lag=1)
+    for date, row in levels.iloc[-3:].iterrows():
+        state.observe(date, row.iloc[0], row.iloc[1])
+
+    # three RLS updates land exactly on the OLS fit over the full history
+    full = RecursiveVAR(1).fit(np.diff(levels.to_numpy(), axis=0))
+    expected_var = levels.iloc[-1, 0] + full.forecast()[0]
+    assert state.version == 3
+    assert state.forecast()["var"] == pytest.approx(expected_var, rel=1e-9)
+    assert np.isfinite(state.forecast()["arima"])
+
+    with pytest.raises(ValueError):
+        state.observe(levels.index[-1], 1.0, 1.0)
+
+def test_server_coalesces_concurrent_forecasts():
+    levels = _levels()
+    state = ForecastState(levels.iloc[:-1], CFG.target_col, CFG.x_col, models=("var",), var_lag=1)
+
+    async def scenario():
+        server = ForecastServer(state, coalesce_ms=5)
+        host, port = await server.start("127.0.0.1", 0)
+        try:
+            report = await load_test(host, port, requests=200, concurrency=20)
+            async with ForecastClient(host, port) as client:
+                _, before = await client.request("GET", "/forecast")
+                status, _ = await client.request("POST", "/observe", {
+                    "date": str(levels.index[-1].date()),
+                    "target": float(levels.iloc[-1, 0]), "x": float(levels.iloc[-1, 1]),
+                })
+                _, after = await client.request("GET", "/forecast?models=var")
+                bad, _ = await client.request("GET", "/forecast?models=nn")
+                _, stats = await client.request("GET", "/stats")
+        finally:
+            await server.close()
+        return report, before, status, after, bad, stats
+
+    report, before, status, after, bad, stats = asyncio.run(scenario())
+    assert report["requests"] == 200
+    assert stats["forecast_batches"] < stats["forecast_requests"]
+    assert status == 200 and bad == 400
+    assert (before["version"], after["version"]) == (0, 1)
+    assert after["last_date"] == str(levels.index[-1].date())
+    assert after["forecasts"]["var"] == pytest.approx(state.forecast()["var"])
+
+def test_observe_rejects_a_bad_batch_before_applying_any_row():
+    levels = _levels()
+    state = ForecastState(levels.iloc[:-2], CFG.target_col, CFG.x_col, models=("arima", "var"),
+                          arima_order=(1, 1, 0), var_lag=1)
+    before = state.forecast()
+    good = [str(levels.index[-2].date()), float(levels.iloc[-2, 0]), float(levels.iloc[-2, 1])]
+
+    async def scenario():
+        server = ForecastServer(state, coalesce_ms=1)
+        host, port = await server.start("127.0.0.1", 0)
+        try:
+            async with ForecastClient(host, port) as client:
+                statuses = [(await client.request("POST", "/observe", rows))[0] for rows in (
+                    [dict(zip(("date", "target", "x"), good)), {"date": good[0], "target": 1.0, "x": 1.0}],
+                    [dict(zip(("date", "target", "x"), good[:1] + [float("nan"), 1.0]))],
+                )]
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b"garbage\r\n\r\n")
+            await writer.drain()
+            bad_line = await reader.readline()
+            writer.close()
+        finally:
+            await server.close()
+        return statuses, bad_line
+
+    statuses, bad_line = asyncio.run(scenario())
+    assert statuses == [400, 400] and b" 400 " in bad_line
+    assert state.version == 0 and state.forecast() == before
+    assert state.last_date == levels.index[-3]
+
+def test_state_from_config_follows_the_window_policy(tmp_path):
+    cfg = replace(CFG, window="rolling", window_size=30, outputs_dir=tmp_path, cache_dir=tmp_path / ".cache")
+    state = ForecastState.from_config(cfg, models="var")
+    assert state.window == "rolling" and state.window_size == 30
+    assert state._var.window == 30 - state._var.lags
+    assert config_key(cfg, ("var",)) != config_key(CFG, ("var",))
+
+def test_failed_update_leaves_every_model_untouched(monkeypatch):
+    from sklearn.neural_network import MLPRegressor
+
+    levels = _levels()
+    state = ForecastState(levels.iloc[:-1], CFG.target_col, CFG.x_col, models=("arima", "var", "nn"),
+                          arima_order=(1, 1, 0), var_lag=1,
+                          nn_params={"hidden_layer_sizes": (5,), "alpha": 0.01, "learning_rate_init": 0.01})
+    before, n_history = state.forecast(), len(state._nn_history)
+
+    def fail(self, *args, **kwargs):
+        raise RuntimeError("fit failed")
+
+    monkeypatch.setattr(MLPRegressor, "fit", fail)
+    with pytest.raises(RuntimeError):
+        state.observe(levels.index[-1], levels.iloc[-1, 0], levels.iloc[-1, 1])
+    assert state.version == 0 and state.last_date == levels.index[-2]
+    assert len(state._nn_history) == n_history
+    assert state.forecast() == before
+
+    monkeypatch.undo()
+    state.observe(levels.index[-1], levels.iloc[-1, 0], levels.iloc[-1, 1])
+    assert state.version == 1 and len(state._nn_history) == n_history + 1
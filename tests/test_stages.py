@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+
+from src.stages import Stage, StageRunner
+
+@dataclass(frozen=True)
+class _Cfg:
+    a: int = 1
+    b: int = 10
+
+CALLS = []
+
+def _source(cfg):
+    CALLS.append("source")
+    return cfg.a
+
+def _left(cfg, source):
+    CALLS.append("left")
+    return source + cfg.b
+
+def _right(cfg, source):
+    CALLS.append("right")
+    return source * 2
+
+def _stages():
+    return [
+        Stage("source", _source, config_fields=("a",)),
+        Stage("left", _left, deps=("source",), config_fields=("b",)),
+        Stage("right", _right, deps=("source",)),
+    ]
+
+def _run(cfg, tmp_path):
+    runner = StageRunner(_stages(), cfg, cache_dir=tmp_path / "cache", outputs_dir=tmp_path)
+    out = (runner.run("left"), runner.run("right"))
+    return out, runner.status
+
+def test_stage_cache_recomputes_only_invalidated_stages(tmp_path):
+    CALLS.clear()
+    out, status = _run(_Cfg(), tmp_path)
+    assert out == (11, 2)
+    assert set(status.values()) == {"miss"}
+
+    CALLS.clear()
+    out, status = _run(_Cfg(), tmp_path)
+    assert out == (11, 2) and CALLS == []
+    assert set(status.values()) == {"hit"}
+
+    # a field only `left` reads invalidates `left` alone
+    CALLS.clear()
+    out, status = _run(_Cfg(b=20), tmp_path)
+    assert out == (21, 2) and CALLS == ["left"]
+    assert status == {"source": "hit", "left": "miss", "right": "hit"}
+
+    # an upstream change invalidates everything downstream
+    CALLS.clear()
+    out, status = _run(_Cfg(a=2, b=20), tmp_path)
+    assert out == (22, 4)
+    assert set(status.values()) == {"miss"}
+
+def test_module_hash_covers_the_package_modules_it_imports(tmp_path, monkeypatch):
+    import importlib
+
+    from src.stages import _module_closure, _module_source_hash
+
+    pkg = tmp_path / "stagepkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "model.py").write_text("from .helpers import fit\n")
+    (pkg / "helpers.py").write_text("from . import core\n\ndef fit():\n    return 1\n")
+    (pkg / "core.py").write_text("X = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    importlib.invalidate_caches()
+
+    before = _module_source_hash("stagepkg.model")
+    (pkg / "core.py").write_text("X = 2\n")
+    assert _module_source_hash("stagepkg.model") != before
+    assert "src.checkpoint" in _module_closure("src.models.arima")
+
+def test_cached_file_stages_restore_the_files_of_their_own_key(tmp_path):
+    from dataclasses import replace
+
+    import pandas as pd
+
+    from src.config import CFG
+    from src.pipeline import run_all
+
+    a = replace(CFG, outputs_dir=tmp_path, cache_dir=tmp_path / ".cache")
+    b = replace(a, window="rolling", window_size=30)
+    plots = {}
+    for cfg in (a, b, a):
+        meta = run_all(cfg, models="var")
+        plots.setdefault(cfg.window, (tmp_path / "forecast_comparison.png").read_bytes())
+        rmse = pd.read_csv(tmp_path / "rmse.csv")["RMSE"].iloc[0]
+        assert f"{rmse:.4f}" in (tmp_path / "report.html").read_text(encoding="utf-8")
+    assert meta["stages"]["plot"] == "hit" and meta["stages"]["report"] == "uncached"
+    assert (tmp_path / "forecast_comparison.png").read_bytes() == plots["expanding"]
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from src.backtest import run_backtest
+from src.stages import Stage, StageRunner
+from src.telemetry import TRACER
+
+def _counted_fit(x):
+    TRACER.count("fits")
+    return x + 1
+
+@pytest.mark.parametrize("backend", ["serial", "thread", "process"])
+def test_backtest_fit_spans_roll_up_into_caller_span(backend):
+    TRACER.reset()
+    with TRACER.span("stage", cat="stage") as outer:
+        assert run_backtest(_counted_fit, range(4), backend=backend, max_workers=2) == [1, 2, 3, 4]
+
+    fits = [s for s in TRACER.spans if s["cat"] == "fit"]
+    assert len(fits) == 4
+    assert all(s["name"] == "counted_fit" and s["depth"] == 1 for s in fits)
+    assert outer["counts"] == {"fits": 4}
+    assert TRACER.summary("stage")[0]["fits"] == 4
+
+def test_stage_runner_writes_spans_trace_and_profile(tmp_path):
+    TRACER.reset()
+    runner = StageRunner(
+        [Stage("one", lambda cfg: 1), Stage("two", lambda cfg, one: one + 1, deps=("one",))],
+        cfg=None, cache_dir=tmp_path / "cache", outputs_dir=tmp_path, profile=("two",),
+    )
+    assert runner.run("two") == 2
+
+    timings_path, trace_path = TRACER.write(tmp_path)
+    stages = json.loads(timings_path.read_text())["stages"]
+    assert [s["name"] for s in stages] == ["one", "two"]
+    assert all(s["wall_seconds"] >= 0 and s["cache"] == "miss" for s in stages)
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    assert {e["ph"] for e in events} == {"X"}
+    assert (tmp_path / "profiles" / "two.prof").exists()
+    assert not (tmp_path / "profiles" / "one.prof").exists()
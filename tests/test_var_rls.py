@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.api import VAR
+
+from src.io import load_excel, build_master, select_pair, train_test_split_index
+from src.fitcache import FIT_CACHE
+from src.models.var import (
+    RecursiveVAR, fit_var_batched, forecast_var_recursive, select_var_lag, select_var_lag_batched,
+)
+from src.config import CFG
+
+def _simulated_var(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    A = np.array([[0.5, 0.1], [0.2, 0.3]])
+    y = np.zeros((n, 2))
+    for t in range(1, n):
+        y[t] = 0.1 + A @ y[t - 1] + rng.normal(size=2)
+    return y
+
+def test_rls_updates_match_statsmodels_ols():
+    y = _simulated_var()
+    model = RecursiveVAR(lags=2).fit(y[:50])
+    for row in y[50:]:
+        model.update(row)
+
+    expected = VAR(y).fit(2).params
+    np.testing.assert_allclose(model.params_, expected, rtol=1e-7, atol=1e-9)
+
+def test_rolling_window_matches_statsmodels_on_last_window():
+    y = _simulated_var()
+    window = 80
+    model = RecursiveVAR(lags=3, window=window).fit(y[:120])
+    for row in y[120:]:
+        model.update(row)
+
+    expected = VAR(y[-(window + 3):]).fit(3).params
+    np.testing.assert_allclose(model.params_, expected, rtol=1e-7, atol=1e-9)
+
+def test_rls_forecasts_match_refit_forecasts():
+    df_y, df_x = load_excel(CFG.data_path, CFG.date_col)
+    pair = select_pair(build_master(df_y, df_x))
+    split = train_test_split_index(pair)
+
+    kwargs = dict(
+        df_pair_level=pair,
+        train_end=split["cutoff_date"],
+        test_idx=split["test_idx"],
+        selected_lag=2,
+        target_col=CFG.target_col,
+    )
+    ols = forecast_var_recursive(**kwargs, method="ols", backend="serial")
+    rls = forecast_var_recursive(**kwargs, method="rls")
+    np.testing.assert_allclose(rls.values, ols.values, rtol=1e-8)
+
+def test_batched_var_matches_statsmodels_per_system():
+    levels = [np.cumsum(_simulated_var(n=80, seed=s), axis=0) for s in range(4)]
+    diffs = [np.diff(lv, axis=0) for lv in levels]
+
+    fit = fit_var_batched(diffs, 2)
+    for i, d in enumerate(diffs):
+        res = VAR(d).fit(2)
+        np.testing.assert_allclose(fit["params"][i], res.params, atol=1e-10)
+        np.testing.assert_allclose(fit["bic"][i], res.info_criteria["bic"])
+
+    lags, bic = select_var_lag_batched(levels, maxlags=4)
+    for i, d in enumerate(diffs):
+        sel = VAR(d).select_order(maxlags=4)
+        assert lags[i] == sel.selected_orders["bic"]
+        np.testing.assert_allclose(bic.iloc[i], sel.ics["bic"])
+
+def test_var_lag_selection_matches_statsmodels_through_the_fit_cache():
+    levels = pd.DataFrame(np.cumsum(_simulated_var(n=120), axis=0), columns=["y", "x"])
+    FIT_CACHE.clear()
+    lag = select_var_lag(levels, maxlags=4)
+    assert lag == VAR(levels.diff().dropna()).select_order(maxlags=4).selected_orders["bic"]
+    assert select_var_lag(levels, maxlags=4) == lag
+    assert FIT_CACHE.hits == 5 and FIT_CACHE.misses == 5
+
+def test_forgetting_factor_matches_weighted_least_squares():
+    y = _simulated_var()
+    lam = 0.97
+    model = RecursiveVAR(lags=2, forgetting=lam).fit(y[:60])
+    for row in y[60:]:
+        model.update(row)
+
+    Z = np.hstack([np.ones((len(y) - 2, 1)), y[1:-1], y[:-2]])
+    w = np.sqrt(lam ** np.arange(len(Z) - 1, -1, -1))
+    expected = np.linalg.lstsq(Z * w[:, None], y[2:] * w[:, None], rcond=None)[0]
+    np.testing.assert_allclose(model.params_, expected, rtol=1e-7, atol=1e-9)
+
+def test_window_policies_agree_between_ols_and_rls():
+    df_y, df_x = load_excel(CFG.data_path, CFG.date_col)
+    pair = select_pair(build_master(df_y, df_x))
+    split = train_test_split_index(pair)
+
+    kwargs = dict(df_pair_level=pair, train_end=split["cutoff_date"], test_idx=split["test_idx"],
+                  selected_lag=2, target_col=CFG.target_col, window_size=30, window_halflife=10.0)
+    for window in ("rolling", "exponential"):
+        ols = forecast_var_recursive(**kwargs, method="ols", backend="serial", window=window)
+        rls = forecast_var_recursive(**kwargs, method="rls", window=window)
+        np.testing.assert_allclose(rls.values, ols.values, rtol=1e-8)
+    expanding = forecast_var_recursive(**kwargs, method="rls", window="expanding")
+    assert not np.allclose(expanding.values, rls.values)
+
+def test_exported_state_resumes_updates():
+    y = _simulated_var()
+    for kwargs in ({}, {"window": 60}):
+        model = RecursiveVAR(lags=2, **kwargs).fit(y[:100])
+        restored = RecursiveVAR(lags=2, **kwargs).restore_state(model.export_state())
+        for row in y[100:]:
+            model.update(row)
+            restored.update(row)
+        np.testing.assert_allclose(restored.params_, model.params_, rtol=1e-12)
+        np.testing.assert_allclose(restored.forecast(), model.forecast(), rtol=1e-12)